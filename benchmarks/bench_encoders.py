@@ -0,0 +1,80 @@
+"""
+Benchmark sentence encoding throughput of the embedding backends.
+
+Encodes a synthetic corpus with the PyTorch (SentenceTransformer) and ONNX
+Runtime backends, with and without int8 dynamic quantization, over a range
+of intra-op thread counts, and reports sentences per second, the agreement
+of each configuration's similarities with the PyTorch float32 baseline, and
+the memory of the embeddings in each storage dtype.
+
+Configurations whose dependencies are missing (e.g. onnxruntime) are skipped.
+
+Usage:
+    python -m benchmarks.bench_encoders [--model all-MiniLM-L6-v2] [--sentences 512] [--threads 1 4]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from langswarm.synapse.embeddings.encoders import load_encoder
+from langswarm.synapse.embeddings.storage import EMBEDDING_DTYPES, cosine_similarity, to_storage
+
+WORDS = (
+    "energy solar wind grid storage battery policy cost demand supply carbon emission hydro nuclear "
+    "efficiency market price capacity network load forecast weather turbine panel investment subsidy"
+).split()
+
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60))) + "." for _ in range(count)]
+
+
+def measure(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--sentences", type=int, default=512)
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.sentences)
+    baseline = None
+
+    print(f"{'backend':>8} {'quantize':>8} {'threads':>7} {'sent/s':>10} {'max sim err':>12}")
+    for backend in ("torch", "onnx"):
+        for quantize in (False, True):
+            for threads in args.threads:
+                try:
+                    encoder = load_encoder(args.model, backend=backend, quantize=quantize, threads=threads)
+                except ImportError as e:
+                    print(f"{backend:>8} {str(quantize):>8} {threads:>7}  skipped: {e}")
+                    break
+                encoder.encode(corpus[:8])  # Warm up.
+                embeddings, elapsed = measure(lambda: encoder.encode(corpus), repeat=args.repeat)
+                similarities = cosine_similarity(embeddings, embeddings)
+                if baseline is None:
+                    baseline = similarities
+                error = np.abs(similarities - baseline).max()
+                print(f"{backend:>8} {str(quantize):>8} {threads:>7} {len(corpus) / elapsed:10.1f} {error:12.5f}")
+
+    if baseline is not None:
+        print()
+        for dtype in EMBEDDING_DTYPES:
+            stored = to_storage(embeddings, dtype)
+            error = np.abs(cosine_similarity(stored, stored) - cosine_similarity(embeddings, embeddings)).max()
+            print(f"{dtype:>8}: {stored.nbytes / 1024:10.1f} KB for {len(corpus)} embeddings, max sim err {error:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark ranged and streaming reads of large files.
+
+Generates a CSV-like file of the requested size (multi-GB sizes are supported,
+the file is written in blocks) and measures the FileReader operations used by
+FilesystemTool's read_range/head/tail/read_chunk actions against a full read.
+
+Usage:
+    python -m benchmarks.bench_file_reads [--size-mb 2048] [--path /tmp/bench.csv] [--skip-full-read]
+"""
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from langswarm.synapse.tools.files.reader import FileReader
+
+
+def generate(path, size_mb):
+    row = "".join(f"{i},sensor-{i % 97},{i * 0.5:.1f},ok\n" for i in range(10000)).encode()
+    target = size_mb * 1024 * 1024
+    with open(path, "wb") as f:
+        written = 0
+        while written < target:
+            f.write(row)
+            written += len(row)
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:>28}: {elapsed * 1000:10.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--path", default=None, help="Reuse an existing file instead of generating one.")
+    parser.add_argument("--skip-full-read", action="store_true", help="Skip the full read baseline.")
+    args = parser.parse_args()
+
+    path = args.path
+    cleanup = False
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "bench.csv")
+        timed(f"generate {args.size_mb} MB", lambda: generate(path, args.size_mb))
+        cleanup = True
+
+    reader = FileReader()
+    try:
+        print(f"file size: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+        timed("head (10 lines)", lambda: reader.head(path, 10), repeat=100)
+        timed("tail (10 lines)", lambda: reader.tail(path, 10), repeat=100)
+        timed("byte range (64 KB)", lambda: reader.read_bytes(path, 10**6, 10**6 + 65536), repeat=100)
+        index = timed("line index build", lambda: reader.line_index(path))
+        lines = len(index)
+        print(f"{'lines':>28}: {lines}")
+
+        def random_range():
+            start = random.randrange(max(lines - 100, 1))
+            return reader.read_lines(path, start, start + 100)
+
+        timed("random line range (100)", random_range, repeat=1000)
+
+        def iterate(limit=256):
+            offset, chunks = 0, 0
+            while offset is not None and chunks < limit:
+                _, offset, _ = reader.read_chunk(path, offset, 1024 * 1024)
+                chunks += 1
+            return chunks
+
+        timed("read_chunk x256 (1 MB)", iterate)
+
+        if not args.skip_full_read:
+            timed("full read (read_file)", lambda: len(open(path, encoding="utf-8").read()))
+
+        print(f"{'peak RSS':>28}: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    finally:
+        if cleanup:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
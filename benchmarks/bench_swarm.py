@@ -0,0 +1,251 @@
+"""
+End-to-end benchmark of the swarm workflows with deterministic fake clients.
+
+Runs LLMConsensus, LLMVoting, LLMAggregation, LLMBranching and LLMRouting
+over a matrix of agent counts and paragraph lengths, with fake clients that
+simulate latency and answer diversity (see `benchmarks/fakes.py`), and
+reports per case:
+
+- end-to-end latency (mean, p50, p95, max) and per-stage latency from the tracer,
+- throughput with `--concurrency` callers sharing one warm swarm,
+- peak RSS, measured in a forked process per case when available.
+
+The report is written as JSON and can be compared between commits with
+`python -m benchmarks.compare_reports old.json new.json`.
+
+Usage:
+    python -m benchmarks.bench_swarm [--agents 3 9 27] [--words 50 200] [--output report.json]
+    python -m benchmarks.bench_swarm --encoder all-MiniLM-L6-v2   # a real local model instead of the stub
+    python -m benchmarks.bench_swarm --concurrency 8 --embedding-service   # coalesce encodes across runs
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langswarm.synapse.embeddings.service import EmbeddingService
+from langswarm.synapse.swarm.aggregation import LLMAggregation
+from langswarm.synapse.swarm.branching import LLMBranching
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.routing import LLMRouting
+from langswarm.synapse.swarm.tracing import Tracer
+from langswarm.synapse.swarm.voting import LLMVoting
+
+from benchmarks.fakes import DIVERSITY_PROFILES, LATENCY_PROFILES, StubEncoder, make_agents
+
+WORKFLOWS = ("consensus", "voting", "aggregation", "branching", "routing")
+
+
+class StageSink:
+    """Sums span durations per stage name across a case."""
+
+    def __init__(self):
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        with self._lock:
+            self.totals[span.name] = self.totals.get(span.name, 0.0) + span.duration
+
+
+def build(workflow, agents, encoder, tracer, adaptive=False):
+    """Create a warm workflow instance, returns a callable running one query."""
+    if workflow == "routing":
+        # Route 1: branching, then a consensus swarm picks the best response.
+        routing = LLMRouting(route=1, bots=agents, main_bot=agents[0], query="", tracer=tracer, model=encoder)
+        return routing.run, routing.arun
+
+    cls = {"consensus": LLMConsensus, "voting": LLMVoting, "aggregation": LLMAggregation, "branching": LLMBranching}[workflow]
+    swarm = cls(query="benchmark", clients=agents, model=encoder, tracer=tracer, adaptive=adaptive, confidence=0.9)
+    return (lambda query: swarm.run(query=query)), (lambda query: swarm.arun(query=query))
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run_case(case, args, encoder):
+    rss_before = current_rss_mb()
+    sink = StageSink()
+    tracer = Tracer(sinks=[sink])
+    agents = make_agents(case["agents"], case["diversity"], case["words"], args.latency, args.latency_ms / 1000)
+    # Created here, worker threads do not survive the fork of isolated cases.
+    service = EmbeddingService(encoder, max_wait=args.batch_wait_ms / 1000) if args.embedding_service else None
+    run_sync, run_async = build(case["workflow"], agents, service or encoder, tracer, args.adaptive)
+    queries = [f"benchmark query {i}" for i in range(args.runs)]
+
+    for query in queries[:args.warmup]:
+        run_sync(query)
+    sink.totals.clear()
+    tracer.counters.clear()
+
+    latencies = []
+
+    def timed_sync(query):
+        start = time.perf_counter()
+        run_sync(query)
+        latencies.append(time.perf_counter() - start)
+
+    async def timed_async(query):
+        start = time.perf_counter()
+        await run_async(query)
+        latencies.append(time.perf_counter() - start)
+
+    async def run_all_async():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(query):
+            async with semaphore:
+                await timed_async(query)
+
+        await asyncio.gather(*(bounded(q) for q in queries))
+
+    wall_start = time.perf_counter()
+    if args.mode == "async":
+        asyncio.run(run_all_async())
+    elif args.concurrency > 1:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(timed_sync, queries))
+    else:
+        for query in queries:
+            timed_sync(query)
+    wall = time.perf_counter() - wall_start
+    if service is not None:
+        service.close()
+
+    return dict(
+        case,
+        runs=len(latencies),
+        latency={
+            "mean": statistics.fmean(latencies),
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "max": max(latencies),
+        },
+        throughput_rps=len(latencies) / wall,
+        agent_calls=tracer.counters.get("agent_calls", 0) / len(latencies),
+        stages={name: total / len(latencies) for name, total in sorted(sink.totals.items()) if name != "run"},
+        peak_rss_mb=peak_rss_mb(),
+        rss_before_mb=rss_before,
+        embedding_service=service.metrics.to_dict() if service is not None else None,
+    )
+
+
+def _run_case_in_child(connection, case, args, encoder):
+    try:
+        connection.send(run_case(case, args, encoder))
+    except Exception as e:
+        connection.send({"error": repr(e)})
+    finally:
+        connection.close()
+
+
+def run_isolated(case, args, encoder):
+    """Run a case in a forked process, so its peak RSS is not hidden by earlier cases."""
+    if args.no_fork or "fork" not in multiprocessing.get_all_start_methods():
+        return run_case(case, args, encoder)
+    context = multiprocessing.get_context("fork")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case_in_child, args=(child, case, args, encoder))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    if "error" in result:
+        raise RuntimeError(f"Case {case} failed: {result['error']}")
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", nargs="+", choices=WORKFLOWS, default=list(WORKFLOWS))
+    parser.add_argument("--agents", nargs="+", type=int, default=[3, 9, 27])
+    parser.add_argument("--words", nargs="+", type=int, default=[50, 200], help="Paragraph lengths in words.")
+    parser.add_argument("--diversity", nargs="+", choices=DIVERSITY_PROFILES, default=["majority"])
+    parser.add_argument("--latency", choices=LATENCY_PROFILES, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mean simulated latency per agent call.")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--encoder", default="stub", help="'stub' or the name of a local SentenceTransformer model.")
+    parser.add_argument("--adaptive", action="store_true", help="Adaptive agent sampling (consensus and voting).")
+    parser.add_argument("--embedding-service", action="store_true", help="Share a micro-batching EmbeddingService.")
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0, help="Max wait of the embedding service batches.")
+    parser.add_argument("--no-fork", action="store_true", help="Run all cases in this process.")
+    parser.add_argument("--output", default="swarm_benchmark.json")
+    args = parser.parse_args()
+
+    if args.encoder == "stub":
+        encoder = StubEncoder()
+    else:
+        from sentence_transformers import SentenceTransformer
+        encoder = SentenceTransformer(args.encoder)
+
+    results = []
+    for workflow in args.workflows:
+        for agents in args.agents:
+            for words in args.words:
+                for diversity in args.diversity:
+                    case = {"workflow": workflow, "agents": agents, "words": words, "diversity": diversity}
+                    result = run_isolated(case, args, encoder)
+                    results.append(result)
+                    latency = result["latency"]
+                    print(f"{workflow:>11} agents={agents:<3} words={words:<4} {diversity:<9} "
+                          f"p50={latency['p50'] * 1000:8.1f}ms p95={latency['p95'] * 1000:8.1f}ms "
+                          f"{result['throughput_rps']:7.1f} runs/s {result['agent_calls']:5.1f} calls/run  peak RSS {result['peak_rss_mb']:.0f} MB")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark for extracting tool calls from agent responses.
+
+Compares the streaming `ToolCallStreamParser`, fed the response in
+token-sized chunks, with parsing the complete response (regex over the
+`START>>> ... <<<END` blocks and `json.loads`). Reports parser throughput,
+and when the first call is available: after the whole response for the
+full-response parser, after its closing brace for the streaming parser.
+At `--tokens-per-second`, the difference is the time the first tool call
+can start earlier.
+
+Usage:
+    python -m benchmarks.bench_tool_call_parser [--responses 200] [--calls 5] [--prose 2000]
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from langswarm.synapse.tools.streaming import ToolCallStreamParser
+
+BLOCK = re.compile(r"START>>>(.*?)<<<END", re.DOTALL)
+CHARS_PER_TOKEN = 4
+
+
+def make_response(rng, calls, prose):
+    words = ["the", "file", "tool", "call", "we", "need", "to", "read", "update", "branch", "and", "then"]
+    text = " ".join(rng.choice(words) for _ in range(prose // 5))
+    block = {"calls": [
+        {
+            "type": "tools",
+            "method": "execute",
+            "instance_name": "filesystem_tool",
+            "action": "read_file",
+            "parameters": {"filename": f"src/module_{i}.py"},
+        }
+        for i in range(calls)
+    ]}
+    return f"{text}\n\nSTART>>>\n{json.dumps(block, indent=2)}\n<<<END\n\n{text}"
+
+
+def parse_full(response):
+    return [call for body in BLOCK.findall(response) for call in json.loads(body)["calls"]]
+
+
+def parse_streaming(response):
+    parser = ToolCallStreamParser()
+    calls, first_at = [], None
+    for i in range(0, len(response), CHARS_PER_TOKEN):
+        emitted = parser.feed(response[i:i + CHARS_PER_TOKEN])
+        if emitted and first_at is None:
+            first_at = i + CHARS_PER_TOKEN
+        calls.extend(emitted)
+    calls.extend(parser.close())
+    return calls, first_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=5, help="Tool calls per block.")
+    parser.add_argument("--prose", type=int, default=2000, help="Characters of text before and after the block.")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    responses = [make_response(rng, args.calls, args.prose) for _ in range(args.responses)]
+    total = sum(len(r) for r in responses)
+
+    started = time.perf_counter()
+    expected = [parse_full(r) for r in responses]
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    streamed = [parse_streaming(r) for r in responses]
+    stream_seconds = time.perf_counter() - started
+
+    assert [calls for calls, _ in streamed] == expected
+    first_fraction = sum(first_at / len(r) for (_, first_at), r in zip(streamed, responses)) / len(responses)
+    response_seconds = total / len(responses) / CHARS_PER_TOKEN / args.tokens_per_second
+
+    print(f"responses: {len(responses)}, {total / 1e6:.2f} MB, {args.calls} calls each")
+    print(f"     full: {total / full_seconds / 1e6:8.2f} MB/s, first call after 100% of the response")
+    print(f"streaming: {total / stream_seconds / 1e6:8.2f} MB/s, first call after {first_fraction:.0%} of the response")
+    print(f"at {args.tokens_per_second:g} tokens/s the first call starts {response_seconds * (1 - first_fraction):.2f}s earlier")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for the per-call dispatch overhead of LangSwarm tools.
+
+Compares the precompiled action table in `tools/base.py` with the previous
+approach, which rebuilt the action map and called `inspect.signature` on every
+invocation.
+
+Usage:
+    python -m benchmarks.bench_tool_dispatch [--calls 200000]
+"""
+import argparse
+import inspect
+import timeit
+
+from langswarm.synapse.tools.base import BaseTool, action
+
+
+class BenchTool(BaseTool):
+    def __init__(self):
+        super().__init__(name="BenchTool", description="Benchmark tool.", instruction="")
+
+    def run(self, payload={}, action="read_file"):
+        return self._dispatch(action, payload)
+
+    def run_legacy(self, payload={}, action="read_file"):
+        action_map = {
+            "help": self._help,
+            "read_file": self.read_file,
+            "update_file": self.update_file,
+            "delete_file": self.delete_file,
+            "list_files": self.list_files,
+        }
+        if action in action_map:
+            return self._legacy_safe_call(action_map[action], **payload)
+        return f"Unsupported action: {action}."
+
+    def _legacy_safe_call(self, func, *args, **kwargs):
+        accepted_args = inspect.signature(func).parameters.keys()
+        valid_kwargs = {k: v for k, v in kwargs.items() if k in accepted_args}
+        invalid_kwargs = {k: v for k, v in kwargs.items() if k not in accepted_args}
+        if invalid_kwargs:
+            return f"Error: Unexpected arguments {list(invalid_kwargs.keys())}. Expected: {list(accepted_args)}"
+        return func(*args, **valid_kwargs)
+
+    @action()
+    def read_file(self, filename):
+        return filename
+
+    @action()
+    def update_file(self, filename, content, append=True):
+        return filename
+
+    @action()
+    def delete_file(self, filename):
+        return filename
+
+    @action()
+    def list_files(self):
+        return []
+
+    @action("help")
+    def _help(self):
+        return self.instruction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    tool = BenchTool()
+    payload = {"filename": "notes.txt", "content": "hello", "append": False}
+
+    for label, func in (("legacy", tool.run_legacy), ("compiled", tool.run)):
+        seconds = min(timeit.repeat(lambda: func(payload, "update_file"), number=args.calls, repeat=3))
+        print(f"{label:>9}: {seconds / args.calls * 1e6:.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
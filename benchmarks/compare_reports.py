@@ -0,0 +1,75 @@
+"""
+Compare two benchmark reports written by `benchmarks.bench_swarm`.
+
+Cases are matched on (workflow, agents, words, diversity). A case regresses
+when its p50 or p95 latency grows, or its throughput drops, by more than
+`--threshold` percent. The exit status is 1 if any case regressed, so the
+script can gate a CI job.
+
+Usage:
+    python -m benchmarks.compare_reports baseline.json candidate.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+KEY = ("workflow", "agents", "words", "diversity")
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return {tuple(result[k] for k in KEY): result for result in report["results"]}
+
+
+def change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(baseline, candidate, threshold):
+    """
+    Compare matched cases.
+
+    :return: tuple - (list of row dicts, list of regressed case keys).
+    """
+    rows, regressions = [], []
+    for key in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[key], candidate[key]
+        row = {
+            "case": key,
+            "p50": change(old["latency"]["p50"], new["latency"]["p50"]),
+            "p95": change(old["latency"]["p95"], new["latency"]["p95"]),
+            "throughput": change(old["throughput_rps"], new["throughput_rps"]),
+            "peak_rss": change(old["peak_rss_mb"], new["peak_rss_mb"]),
+        }
+        row["regressed"] = row["p50"] > threshold or row["p95"] > threshold or row["throughput"] < -threshold
+        if row["regressed"]:
+            regressions.append(key)
+        rows.append(row)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed change in percent.")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    rows, regressions = compare(baseline, candidate, args.threshold)
+
+    print(f"{'case':<44} {'p50':>8} {'p95':>8} {'thrpt':>8} {'rss':>8}")
+    for row in rows:
+        case = " ".join(str(part) for part in row["case"])
+        flag = "  REGRESSED" if row["regressed"] else ""
+        print(f"{case:<44} {row['p50']:+7.1f}% {row['p95']:+7.1f}% {row['throughput']:+7.1f}% {row['peak_rss']:+7.1f}%{flag}")
+
+    for key in sorted(set(baseline) ^ set(candidate)):
+        print(f"{' '.join(str(part) for part in key):<44} only in {'baseline' if key in baseline else 'candidate'}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Deterministic fake LLM clients and a stub encoder for the swarm benchmarks.
+
+`FakeLLM` implements the client interface used by the swarm workflows
+(`chat`, `set_memory`, `add_response`, `remove`, `reset`) and simulates:
+
+- latency, drawn from a seeded distribution ("fixed", "uniform", "lognormal"),
+- answer diversity across agents ("unanimous", "majority", "split", "diverse"),
+- paragraph length, in words.
+
+Answers and latencies only depend on the client's index, the profile and
+the query, so two runs of a benchmark see exactly the same workload.
+
+`StubEncoder` is a deterministic stand-in for a SentenceTransformer: it
+embeds texts as normalized hashed bags of words, so identical answers get
+identical embeddings and paraphrases of one answer stay close.
+"""
+import math
+import random
+import time
+import zlib
+
+import numpy as np
+
+DIVERSITY_PROFILES = ("unanimous", "majority", "split", "diverse")
+LATENCY_PROFILES = ("fixed", "uniform", "lognormal")
+
+_WORDS = [
+    "energy", "solar", "wind", "grid", "storage", "battery", "policy", "cost", "demand", "supply",
+    "carbon", "emission", "hydro", "nuclear", "efficiency", "market", "price", "capacity", "network", "load",
+    "forecast", "weather", "turbine", "panel", "investment", "subsidy", "transition", "heat", "pump", "fuel",
+    "renewable", "output", "peak", "reserve", "balance", "frequency", "voltage", "transmission", "region", "plan",
+]
+# A vocabulary large enough that unrelated answers share few words.
+_VOCABULARY = [f"{word}{n}" for word in _WORDS for n in range(50)]
+
+
+def _seed(*parts):
+    return zlib.crc32("|".join(str(p) for p in parts).encode("utf-8"))
+
+
+def answer_id(index, agents, diversity):
+    """The answer an agent gives under a diversity profile, agents with the same id agree."""
+    if diversity == "unanimous":
+        return 0
+    if diversity == "majority":
+        majority = math.ceil(agents * 0.7)
+        return 0 if index < majority else index
+    if diversity == "split":
+        return index % 2
+    if diversity == "diverse":
+        return index
+    raise ValueError(f"Unknown diversity profile: {diversity}")
+
+
+def make_paragraph(answer, query, words, variant=0):
+    """A deterministic paragraph for an answer, `variant` rewords a few words (a paraphrase)."""
+    rng = random.Random(_seed("answer", answer, query))
+    tokens = [rng.choice(_VOCABULARY) for _ in range(words)]
+    if variant:
+        variant_rng = random.Random(_seed("variant", answer, query, variant))
+        for position in variant_rng.sample(range(words), k=max(1, words // 20)):
+            tokens[position] = variant_rng.choice(_VOCABULARY)
+    return f"Answer {answer}: " + " ".join(tokens) + "."
+
+
+class LatencyModel:
+    """
+    A seeded latency distribution, in seconds.
+
+    Attributes:
+        profile (str): "fixed", "uniform" or "lognormal".
+        mean (float): Mean latency in seconds.
+    """
+
+    def __init__(self, profile="lognormal", mean=0.005, seed=0):
+        if profile not in LATENCY_PROFILES:
+            raise ValueError(f"Unknown latency profile: {profile}")
+        self.profile = profile
+        self.mean = mean
+        self._rng = random.Random(seed)
+
+    def sample(self):
+        if self.mean <= 0:
+            return 0.0
+        if self.profile == "fixed":
+            return self.mean
+        if self.profile == "uniform":
+            return self._rng.uniform(0.5 * self.mean, 1.5 * self.mean)
+        # Heavy right tail, the mean of lognormal(mu, sigma) is exp(mu + sigma^2 / 2).
+        sigma = 0.6
+        return self._rng.lognormvariate(math.log(self.mean) - sigma ** 2 / 2, sigma)
+
+
+class FakeLLM:
+    """
+    A deterministic fake LLM client.
+
+    Attributes:
+        index (int): Position of the client in its swarm, drives its answer.
+        agents (int): Size of the swarm, used by the diversity profile.
+        diversity (str): The answer diversity profile.
+        paragraph_words (int): Length of the answers in words.
+        calls (int): Number of `chat` calls.
+    """
+
+    def __init__(self, index, agents, diversity="majority", paragraph_words=100, latency=None,
+                 provider="fake", model="fake-llm"):
+        self.index = index
+        self.agents = agents
+        self.diversity = diversity
+        self.paragraph_words = paragraph_words
+        self.latency = latency or LatencyModel(seed=index)
+        self.provider = provider
+        self.model = model
+        self.system_prompt = ""
+        self.in_memory = []
+        self.calls = 0
+
+    def chat(self, q="", reset=False, erase_query=False, **kwargs):
+        self.calls += 1
+        delay = self.latency.sample()
+        if delay:
+            time.sleep(delay)
+        if reset:
+            self.in_memory = []
+
+        answer = answer_id(self.index, self.agents, self.diversity)
+        # Agents sharing an answer word it slightly differently.
+        response = make_paragraph(answer, q, self.paragraph_words, variant=self.index)
+        if not erase_query:
+            self.in_memory.append({"role": "user", "content": q})
+        return response
+
+    def set_memory(self, memory):
+        self.in_memory = list(memory)
+
+    def add_response(self, response):
+        self.in_memory.append({"role": "assistant", "content": response})
+
+    def remove(self):
+        self.in_memory = self.in_memory[:-1]
+
+    def reset(self):
+        self.in_memory = []
+
+
+def make_agents(count, diversity="majority", paragraph_words=100, latency_profile="lognormal", latency_mean=0.005):
+    """Create `count` fake clients with seeded latencies."""
+    return [
+        FakeLLM(i, count, diversity=diversity, paragraph_words=paragraph_words,
+                latency=LatencyModel(latency_profile, latency_mean, seed=_seed("latency", i)))
+        for i in range(count)
+    ]
+
+
+class StubEncoder:
+    """
+    A deterministic, dependency-free stand-in for a SentenceTransformer.
+
+    Texts are embedded as L2-normalized hashed bags of words of dimension `dim`.
+
+    Attributes:
+        dim (int): The embedding dimension.
+        calls (int): Number of `encode` calls.
+        encoded (int): Number of texts encoded.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.calls = 0
+        self.encoded = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in text.lower().split():
+            bucket = zlib.crc32(token.encode("utf-8"))
+            vector[bucket % self.dim] += 1.0 if bucket & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, **kwargs):
+        self.calls += 1
+        if isinstance(sentences, str):
+            self.encoded += 1
+            return self._embed(sentences)
+        self.encoded += len(sentences)
+        if not len(sentences):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._embed(text) for text in sentences])
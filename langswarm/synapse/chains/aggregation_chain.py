@@ -47,6 +47,10 @@ class AggregationChain(Chain):
         """
         query = inputs["query"]
         hb = inputs.get("hb")
-        self.aggregation.query = query
-        result = self.aggregation.run(hb)
+        result = self.aggregation.run(hb, query=query)
+        return {"aggregated_result": result}
+
+    async def _acall(self, inputs):
+        """Processes the input query like `_call`, without blocking the event loop."""
+        result = await self.aggregation.arun(inputs.get("hb"), query=inputs["query"])
         return {"aggregated_result": result}
@@ -46,6 +46,10 @@ class BranchingChain(Chain):
         - dict: Dictionary containing the list of responses.
         """
         query = inputs["query"]
-        self.branching.query = query
-        responses = self.branching.run()
+        responses = self.branching.run(query=query)
+        return {"responses": responses}
+
+    async def _acall(self, inputs):
+        """Processes the input query like `_call`, without blocking the event loop."""
+        responses = await self.branching.arun(inputs["query"])
         return {"responses": responses}
@@ -46,6 +46,10 @@ class ConsensusChain(Chain):
         - dict: Dictionary containing the consensus result.
         """
         query = inputs["query"]
-        self.consensus.query = query
-        result = self.consensus.run()
+        result = self.consensus.run(query=query)
+        return {"consensus_result": result}
+
+    async def _acall(self, inputs):
+        """Processes the input query like `_call`, without blocking the event loop."""
+        result = await self.consensus.arun(inputs["query"])
         return {"consensus_result": result}
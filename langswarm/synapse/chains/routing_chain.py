@@ -48,6 +48,10 @@ class RoutingChain(Chain):
         - dict: Dictionary containing the routed result.
         """
         query = inputs["query"]
-        self.routing.query = query
-        result = self.routing.run()
+        result = self.routing.run(query=query)
+        return {"routed_result": result}
+
+    async def _acall(self, inputs):
+        """Processes the input query like `_call`, without blocking the event loop."""
+        result = await self.routing.arun(inputs["query"])
         return {"routed_result": result}
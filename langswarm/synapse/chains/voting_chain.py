@@ -46,7 +46,16 @@ class VotingChain(Chain):
         - dict: Dictionary containing the voting result, group size, and responses.
         """
         query = inputs["query"]
-        result, group_size, responses = self.voting.run()
+        result, group_size, responses = self.voting.run(query=query)
+        return {
+            "voting_result": result,
+            "group_size": group_size,
+            "responses": responses,
+        }
+
+    async def _acall(self, inputs):
+        """Processes the input query like `_call`, without blocking the event loop."""
+        result, group_size, responses = await self.voting.arun(inputs["query"])
         return {
             "voting_result": result,
             "group_size": group_size,
@@ -30,4 +30,6 @@ START>>>
   ]
 }
 <<<END
+
+Several calls can be listed in one block. Independent calls run at the same time, calls changing the same file, task or branch run in the order listed, and the results come back in that order.
 """
@@ -0,0 +1,187 @@
+import inspect
+import os
+import re
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+try:
+    import onnxruntime as ort
+except ImportError:  # Optional, only needed by OnnxEncoder.
+    ort = None
+
+BACKENDS = ("torch", "onnx")
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "langswarm", "onnx")
+
+
+def load_encoder(model='all-MiniLM-L6-v2', backend="torch", quantize=False, threads=None, cache_dir=None):
+    """
+    Load a sentence encoder.
+
+    Every encoder has an `encode(sentences)` method returning one float32
+    embedding for a string and a matrix for a list of strings.
+
+    :param model: str - Name or path of the SentenceTransformer model.
+    :param backend: str - "torch" for SentenceTransformer, "onnx" for ONNX Runtime.
+    :param quantize: bool - Use int8 dynamically quantized weights.
+    :param threads: int - Intra-op threads. Note that for the torch backend this is process-wide.
+    :param cache_dir: str - Where the ONNX exports are kept, onnx backend only.
+    :return: The encoder.
+    """
+    if backend == "torch":
+        encoder = SentenceTransformer(model)
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        if quantize:
+            import torch
+            encoder = torch.ao.quantization.quantize_dynamic(encoder, {torch.nn.Linear}, dtype=torch.qint8)
+        return encoder
+    if backend == "onnx":
+        return OnnxEncoder(model, quantize=quantize, threads=threads, cache_dir=cache_dir)
+    raise ValueError(f"Unknown encoder backend '{backend}', expected one of {BACKENDS}.")
+
+
+class OnnxEncoder:
+    """
+    A sentence encoder running on ONNX Runtime (CPU), requires the `onnxruntime` package.
+
+    The transformer is loaded from `model.onnx` in a local model directory,
+    from the `onnx/model.onnx` export published with the model on the Hub, or
+    exported from the PyTorch weights (requires the `onnx` package). With
+    `quantize`, the weights are dynamically quantized to int8 once and the
+    quantized model is cached next to the export.
+
+    Embeddings are mean-pooled over the tokens and L2-normalized, like
+    the default SentenceTransformer models.
+
+    Attributes:
+        model (str): The model name or path.
+        path (str): The ONNX model in use.
+        max_length (int): Inputs are truncated to this many tokens.
+        batch_size (int): Default number of sentences per inference call.
+    """
+
+    def __init__(self, model='all-MiniLM-L6-v2', quantize=False, threads=None, cache_dir=None,
+                 max_length=256, batch_size=32, normalize=True):
+        if ort is None:
+            raise ImportError("OnnxEncoder requires the 'onnxruntime' package.")
+        from transformers import AutoTokenizer
+
+        self.model = model
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self._repo = model if os.path.isdir(model) or "/" in model else f"sentence-transformers/{model}"
+        self._cache_dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, re.sub(r"[^\w.-]", "_", self._repo))
+        self.tokenizer = AutoTokenizer.from_pretrained(self._repo)
+
+        self.path = self._resolve_model()
+        if quantize:
+            self.path = self._quantize(self.path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = threads or 0
+        options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self.session.get_inputs()]
+        self._dim = None
+
+    def _resolve_model(self):
+        for path in (os.path.join(self._repo, "model.onnx"), os.path.join(self._repo, "onnx", "model.onnx"),
+                     os.path.join(self._cache_dir, "model.onnx")):
+            if os.path.isfile(path):
+                return path
+
+        if not os.path.isdir(self._repo):
+            try:
+                from huggingface_hub import hf_hub_download
+                return hf_hub_download(self._repo, "onnx/model.onnx")
+            except Exception:
+                pass  # No published export, build one.
+        return self._export(os.path.join(self._cache_dir, "model.onnx"))
+
+    def _export(self, path):
+        import torch
+        from transformers import AutoModel
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        model = AutoModel.from_pretrained(self._repo).eval()
+        sample = self.tokenizer(["a sample sentence"], return_tensors="pt")
+        names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        options = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            # torch >= 2.5 can export with dynamo, keep the TorchScript exporter the dynamic axes are written for.
+            options["dynamo"] = False
+        torch.onnx.export(
+            model,
+            (dict(sample),),
+            path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            **options,
+        )
+        return path
+
+    def _quantize(self, path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized = os.path.join(self._cache_dir, "model.int8.onnx")
+        if not os.path.isfile(quantized):
+            os.makedirs(self._cache_dir, exist_ok=True)
+            quantize_dynamic(path, quantized, weight_type=QuantType.QInt8)
+        return quantized
+
+    def get_sentence_embedding_dimension(self):
+        if self._dim is None:
+            self._dim = self.encode("dimension").shape[-1]
+        return self._dim
+
+    def _encode_batch(self, sentences):
+        tokens = self.tokenizer(sentences, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        mask = tokens["attention_mask"].astype(np.int64)
+        feed = {}
+        for name in self._input_names:
+            if name in tokens:
+                feed[name] = tokens[name].astype(np.int64)
+            elif name == "token_type_ids":
+                feed[name] = np.zeros_like(mask)
+        hidden = self.session.run(None, feed)[0]
+
+        weights = mask[:, :, None].astype(np.float32)
+        embeddings = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+    def encode(self, sentences, batch_size=None, **kwargs):
+        """
+        Encode sentences.
+
+        Sentences are sorted by length before batching, so batches carry little padding.
+
+        :param sentences: str or list - A sentence or a list of sentences.
+        :param batch_size: int - Sentences per inference call, defaults to `self.batch_size`.
+        :return: np.ndarray - A float32 vector for a string, a (len(sentences), dim) matrix for a list.
+        """
+        if isinstance(sentences, str):
+            return self._encode_batch([sentences])[0]
+        sentences = list(sentences)
+        if not sentences:
+            return np.zeros((0, self._dim or 0), dtype=np.float32)
+
+        batch_size = batch_size or self.batch_size
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i]))
+        batches = [
+            self._encode_batch([sentences[i] for i in order[start:start + batch_size]])
+            for start in range(0, len(order), batch_size)
+        ]
+        embeddings = np.empty((len(sentences), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        self._dim = embeddings.shape[1]
+        return embeddings
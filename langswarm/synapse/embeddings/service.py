@@ -0,0 +1,379 @@
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+from multiprocessing import resource_tracker, shared_memory
+
+
+def _collect(get, max_batch_size, max_wait):
+    """
+    Collect queued requests into one micro-batch.
+
+    Blocks for the first request, then takes more until the batch holds
+    `max_batch_size` sentences or `max_wait` seconds have passed since the
+    first one arrived. A None request (the stop signal) ends the batch.
+
+    :param get: callable - `get(timeout)` of a queue, raising queue.Empty on timeout.
+    :return: tuple - (list of (request_id, sentences) requests, bool stop).
+    """
+    first = get(None)
+    if first is None:
+        return [], True
+    batch, size = [first], len(first[1])
+    deadline = time.monotonic() + max_wait
+    while size < max_batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            request = get(remaining)
+        except queue.Empty:
+            break
+        if request is None:
+            return batch, True
+        batch.append(request)
+        size += len(request[1])
+    return batch, False
+
+
+def _encode_batch(encoder, batch):
+    """
+    Encode the sentences of a micro-batch once, duplicates included.
+
+    :return: tuple - (embedding matrix, list of row index arrays per request, number of unique sentences).
+    """
+    rows, unique = [], {}
+    for _, sentences in batch:
+        rows.append(np.array([unique.setdefault(s, len(unique)) for s in sentences], dtype=np.int64))
+    embeddings = np.asarray(encoder.encode(list(unique)), dtype=np.float32) if unique else np.zeros((0, 0), np.float32)
+    return embeddings, rows, len(unique)
+
+
+class EmbeddingServiceMetrics:
+    """
+    Batching statistics of an embedding service.
+
+    Attributes:
+        requests (int): Encode requests received.
+        sentences (int): Sentences received.
+        encoded (int): Sentences actually encoded, after removing duplicates within batches.
+        batches (int): Micro-batches encoded.
+        batch_sizes (Counter): Batch size in sentences -> number of batches.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.sentences = 0
+        self.encoded = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, batch, encoded):
+        size = sum(len(sentences) for _, sentences in batch)
+        with self._lock:
+            self.requests += len(batch)
+            self.sentences += size
+            self.encoded += encoded
+            self.batches += 1
+            self.batch_sizes[size] += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "sentences": self.sentences,
+                "encoded": self.encoded,
+                "batches": self.batches,
+                "mean_batch_size": self.sentences / self.batches if self.batches else 0.0,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            }
+
+
+class EmbeddingService:
+    """
+    Coalesces encode requests from concurrent callers into micro-batches.
+
+    Callers submit sentences and get a future; a worker thread drains the
+    queue into batches of up to `max_batch_size` sentences, waiting at most
+    `max_wait` seconds for a batch to fill, and encodes each batch with one
+    `encode` call. The service has an `encode` method, so it can be passed
+    as the `model` of a Swarm or as `embedding_model=service.encode` to a
+    ToolRegistry, and shared by all of them.
+
+    Attributes:
+        encoder: The underlying encoder.
+        max_batch_size (int): Sentences per batch before it is flushed.
+        max_wait (float): Seconds a batch waits for more requests.
+        metrics (EmbeddingServiceMetrics): Batching statistics.
+    """
+
+    def __init__(self, encoder, max_batch_size=64, max_wait=0.005):
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = EmbeddingServiceMetrics()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._serve, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def _serve(self):
+        stop = False
+        while not stop:
+            batch = []
+            try:
+                batch, stop = _collect(lambda timeout: self._queue.get(timeout=timeout), self.max_batch_size, self.max_wait)
+                if not batch:
+                    continue
+                embeddings, rows, encoded = _encode_batch(self.encoder, batch)
+                self.metrics.record(batch, encoded)
+                for (future, _), index in zip(batch, rows):
+                    future.set_result(embeddings[index])
+            except Exception as e:
+                # Every caller of the batch gets an answer, whatever failed.
+                for future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def submit(self, sentences):
+        """
+        Queue sentences for encoding.
+
+        :param sentences: str or list - A sentence or a list of sentences.
+        :return: Future - Resolves to a vector for a string, a matrix for a list.
+        """
+        if self._closed:
+            raise RuntimeError("The embedding service is closed.")
+        single = isinstance(sentences, str)
+        batch_future = Future()
+        self._queue.put((batch_future, [sentences] if single else list(sentences)))
+        if not single:
+            return batch_future
+
+        future = Future()
+        batch_future.add_done_callback(
+            lambda f: future.set_exception(f.exception()) if f.exception() else future.set_result(f.result()[0])
+        )
+        return future
+
+    def encode(self, sentences, **kwargs):
+        """Encode sentences, blocking until their batch is done. Encoder options are not supported per call."""
+        return self.submit(sentences).result()
+
+    async def aencode(self, sentences):
+        """Encode sentences without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(sentences))
+
+    def get_sentence_embedding_dimension(self):
+        return self.encoder.get_sentence_embedding_dimension()
+
+    def close(self):
+        """Stop the worker once the queued requests are done."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _serve_process(encoder_factory, encoder_kwargs, requests, responses, max_batch_size, max_wait):
+    """Entry point of the encoder process, answers with one shared memory block per batch."""
+    try:
+        if encoder_factory is None:
+            from .encoders import load_encoder
+            encoder_factory = load_encoder
+        encoder = encoder_factory(**encoder_kwargs)
+    except Exception as e:
+        responses.put(("error", repr(e)))
+        return
+    responses.put(("ready", None))
+
+    stop = False
+    while not stop:
+        batch, stop = _collect(lambda timeout: requests.get(timeout=timeout), max_batch_size, max_wait)
+        if not batch:
+            continue
+        try:
+            embeddings, rows, encoded = _encode_batch(encoder, batch)
+        except Exception as e:
+            responses.put(("failed", ([request_id for request_id, _ in batch], repr(e))))
+            continue
+
+        block = shared_memory.SharedMemory(create=True, size=max(embeddings.nbytes, 1))
+        # The block is unlinked by the parent once read, not by this process's tracker.
+        resource_tracker.unregister(block._name, "shared_memory")
+        np.ndarray(embeddings.shape, dtype=embeddings.dtype, buffer=block.buf)[:] = embeddings
+        responses.put(("batch", (block.name, embeddings.shape, [(request_id, index) for (request_id, _), index in zip(batch, rows)], encoded)))
+        block.close()
+
+
+class ProcessEmbeddingService:
+    """
+    An embedding service running its encoder in a separate process.
+
+    Requests are batched in the encoder process like in `EmbeddingService`;
+    each batch's embeddings are returned through a shared memory block, so
+    they are not pickled. Use it to keep encoding off the GIL of a busy
+    process, or to share one loaded model between the threads of a server.
+
+    If the encoder process dies, pending and later requests fail with a
+    RuntimeError instead of waiting forever.
+
+    Attributes:
+        max_batch_size (int): Sentences per batch before it is flushed.
+        max_wait (float): Seconds a batch waits for more requests.
+        metrics (EmbeddingServiceMetrics): Batching statistics.
+    """
+
+    # Seconds between checks that the encoder process is still alive.
+    poll_interval = 0.5
+
+    def __init__(self, model='all-MiniLM-L6-v2', backend="torch", quantize=False, threads=None,
+                 max_batch_size=64, max_wait=0.005, encoder_factory=None, start_method="spawn", **encoder_kwargs):
+        """
+        :param model, backend, quantize, threads: Passed to `load_encoder` in the encoder process.
+        :param encoder_factory: A picklable callable creating the encoder instead of `load_encoder`,
+                                called with `encoder_kwargs`.
+        :param start_method: The multiprocessing start method.
+        """
+        if encoder_factory is None:
+            encoder_kwargs = dict(encoder_kwargs, model=model, backend=backend, quantize=quantize, threads=threads)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.metrics = EmbeddingServiceMetrics()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error = None  # Set once the encoder process died.
+
+        context = multiprocessing.get_context(start_method)
+        self._requests = context.Queue()
+        self._responses = context.Queue()
+        self._process = context.Process(
+            target=_serve_process,
+            args=(encoder_factory, encoder_kwargs, self._requests, self._responses, max_batch_size, max_wait),
+            daemon=True,
+        )
+        self._process.start()
+        while True:
+            try:
+                status, error = self._responses.get(timeout=self.poll_interval)
+                break
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError(
+                        f"The encoder process exited with code {self._process.exitcode} before it was ready.") from None
+        if status == "error":
+            self._process.join()
+            raise RuntimeError(f"The encoder process failed to start: {error}")
+
+        self._receiver = threading.Thread(target=self._receive, name="embedding-service-receiver", daemon=True)
+        self._receiver.start()
+
+    def _fail_pending(self, error):
+        """Fail every pending request, and the ones submitted from now on."""
+        with self._lock:
+            self._error = error
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            future.set_exception(RuntimeError(error))
+
+    def _receive(self):
+        while True:
+            try:
+                message = self._responses.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                # Answers sent before the process exited are in the queue before this check.
+                try:
+                    message = self._responses.get_nowait()
+                except queue.Empty:
+                    self._fail_pending(f"The encoder process exited with code {self._process.exitcode}.")
+                    break
+            if message is None:
+                break
+            kind, payload = message
+            if kind == "failed":
+                request_ids, error = payload
+                for request_id in request_ids:
+                    with self._lock:
+                        future, _ = self._pending.pop(request_id)
+                    future.set_exception(RuntimeError(error))
+                continue
+
+            name, shape, rows, encoded = payload
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                embeddings = np.ndarray(shape, dtype=np.float32, buffer=block.buf).copy()
+            finally:
+                block.close()
+                block.unlink()
+            with self._lock:
+                requests = [(self._pending.pop(request_id), index) for request_id, index in rows]
+            self.metrics.record([(future, sentences) for (future, sentences), _ in requests], encoded)
+            for (future, _), index in requests:
+                future.set_result(embeddings[index])
+
+    def submit(self, sentences):
+        """
+        Queue sentences for encoding.
+
+        :param sentences: str or list - A sentence or a list of sentences.
+        :return: Future - Resolves to a vector for a string, a matrix for a list.
+        """
+        if self._closed:
+            raise RuntimeError("The embedding service is closed.")
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        request_id = next(self._ids)
+        batch_future = Future()
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError(self._error)
+            self._pending[request_id] = (batch_future, sentences)
+        self._requests.put((request_id, sentences))
+        if not single:
+            return batch_future
+
+        future = Future()
+        batch_future.add_done_callback(
+            lambda f: future.set_exception(f.exception()) if f.exception() else future.set_result(f.result()[0])
+        )
+        return future
+
+    def encode(self, sentences, **kwargs):
+        """Encode sentences, blocking until their batch is done. Encoder options are not supported per call."""
+        return self.submit(sentences).result()
+
+    async def aencode(self, sentences):
+        """Encode sentences without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(sentences))
+
+    def close(self):
+        """Stop the encoder process once the queued requests are done."""
+        if not self._closed:
+            self._closed = True
+            self._requests.put(None)
+            self._process.join()
+            self._responses.put(None)
+            self._receiver.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
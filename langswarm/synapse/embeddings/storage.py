@@ -0,0 +1,54 @@
+import numpy as np
+
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+
+
+def to_storage(embeddings, dtype="float32"):
+    """
+    Convert embeddings to their storage dtype.
+
+    float16 halves the memory of float32 embeddings. int8 quarters it: each
+    vector is scaled so its largest component maps to 127, the scale is not
+    kept since cosine similarity does not depend on the length of the vectors.
+    int8 embeddings are therefore only meant for `cosine_similarity`.
+
+    :param embeddings: array-like - One embedding or a matrix of embeddings.
+    :param dtype: str - One of "float32", "float16" and "int8".
+    :return: np.ndarray - The embeddings in the storage dtype.
+    """
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}.")
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if dtype == "float32":
+        return embeddings
+    if dtype == "float16":
+        return embeddings.astype(np.float16)
+
+    scale = np.abs(embeddings).max(axis=-1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    return np.round(embeddings / scale).astype(np.int8)
+
+
+def _as_matrix(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings[None, :] if embeddings.ndim == 1 else embeddings
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(a, b):
+    """
+    Cosine similarity between two sets of embeddings of any storage dtype.
+
+    :param a: array-like - One embedding or a matrix of embeddings.
+    :param b: array-like - One embedding or a matrix of embeddings.
+    :return: np.ndarray - A (len(a), len(b)) float32 matrix, a single embedding counts as one row.
+    """
+    a, b = _as_matrix(a), _as_matrix(b)
+    if not a.size or not b.size:
+        return np.zeros((a.shape[0] if a.size else 0, b.shape[0] if b.size else 0), dtype=np.float32)
+    return _normalize(a) @ _normalize(b).T
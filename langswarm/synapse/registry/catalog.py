@@ -0,0 +1,196 @@
+import threading
+
+import numpy as np
+
+from .tools import ToolRegistry
+
+
+class ToolCatalog(ToolRegistry):
+    """
+    A tool registry shared by agents, each agent seeing it through a `ToolView`.
+
+    The catalog owns the tools, their embedding matrix, the keyword index
+    and the query embedding cache; a view only keeps the names of the tools
+    its agent is allowed to use and a boolean mask over the catalog's rows.
+    Memory and startup therefore scale with the number of distinct tools,
+    not with agents x tools, and a single encoder is loaded.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rows = (None, {})
+
+    def view(self, tools=None):
+        """
+        A registry view for one agent.
+
+        :param tools: Iterable of tools or tool names the agent may use, registered in
+                      the catalog when missing. All tools of the catalog if None.
+        :return: ToolView - The view.
+        """
+        return ToolView(self, tools)
+
+    def _ensure(self, tools):
+        """
+        Register the tools missing from the catalog.
+
+        A tool given by name resolves to the catalog's instance. A tool object
+        with the name and description of a catalog tool reuses its embedding
+        but stays the caller's instance, so an agent never gets the tool,
+        credentials or state of another agent.
+
+        :return: dict - The tools by name.
+        :raises ValueError: If a name is unknown or used by tools with different descriptions.
+        """
+        resolved, missing = {}, []
+        with self._lock:
+            for tool in tools:
+                if isinstance(tool, str):
+                    if tool not in self.tools:
+                        raise ValueError(f"Tool '{tool}' is not registered.")
+                    tool = self.tools[tool]
+                name = tool.identifier
+                if resolved.get(name, tool) is not tool:
+                    raise ValueError(f"Tool '{name}' is given twice.")
+                registered = self.tools.get(name)
+                if registered is None:
+                    if name not in resolved:
+                        missing.append(tool)
+                elif registered is not tool and registered.description != getattr(tool, "description", None):
+                    raise ValueError(f"Another tool '{name}' is already registered.")
+                resolved[name] = tool
+            if missing:
+                self.register_tools(missing)
+        return resolved
+
+    def _mask(self, allowed):
+        """Names of the catalog's matrix rows, with the mask of the allowed rows."""
+        with self._lock:
+            names, _ = self._search_matrix()
+            if self._rows[0] is not names:
+                self._rows = (names, {name: i for i, name in enumerate(names)})
+            rows = self._rows[1]
+        mask = np.zeros(len(names), dtype=bool)
+        indices = [rows[name] for name in allowed if name in rows]
+        mask[indices] = True
+        return names, mask
+
+
+class ToolView:
+    """
+    An agent's registry over a shared `ToolCatalog`, restricted to an allow-list.
+
+    Offers the `ToolRegistry` interface. Registering a tool adds it to the
+    catalog if needed and to the allow-list, removing it only takes it off
+    the allow-list. Searches run over the catalog's matrix with the rows of
+    other tools masked out. The view returns the tool instances it was
+    given, the catalog only shares their embeddings.
+
+    Attributes:
+        catalog (ToolCatalog): The shared catalog.
+    """
+
+    def __init__(self, catalog, tools=None):
+        self.catalog = catalog
+        self._all = tools is None
+        self._allowed = catalog._ensure(tools) if tools is not None else {}
+        self._mask = (None, None)
+        self._lock = threading.Lock()
+
+    def _names(self):
+        if self._all:
+            return list(self.catalog.tools)
+        return [name for name in self._allowed if name in self.catalog.tools]
+
+    @property
+    def tools(self):
+        if self._all:
+            return dict(self.catalog.tools)
+        return {name: self._allowed[name] for name in self._names()}
+
+    def register_tool(self, tool):
+        """
+        Allow a tool, registering it in the catalog when missing.
+
+        :param tool: A tool with an `identifier` and a `description` attribute.
+        :raises ValueError: If the tool is already allowed, lacks a description or
+                            conflicts with a different catalog tool of the same name.
+        """
+        self.register_tools([tool])
+
+    def register_tools(self, tools):
+        """Allow several tools, the ones missing from the catalog are embedded in one batch."""
+        tools = list(tools)
+        for tool in tools:
+            if tool.identifier in self._allowed or (self._all and tool.identifier in self.catalog.tools):
+                raise ValueError(f"Tool '{tool.identifier}' is already registered.")
+        resolved = self.catalog._ensure(tools)
+        if not self._all:
+            with self._lock:
+                self._allowed.update(resolved)
+                self._mask = (None, None)
+
+    def remove_tool(self, tool_name: str):
+        """
+        Take a tool off the allow-list, the catalog keeps it for other agents.
+
+        :raises ValueError: If the tool is not allowed.
+        """
+        with self._lock:
+            if self._all:
+                self._allowed = dict(self.catalog.tools)
+                self._all = False
+            if tool_name not in self._allowed:
+                raise ValueError(f"Tool '{tool_name}' is not registered.")
+            del self._allowed[tool_name]
+            self._mask = (None, None)
+
+    def get_tool(self, tool_name: str):
+        if self._all:
+            return self.catalog.get_tool(tool_name)
+        if tool_name not in self.catalog.tools:
+            return None
+        return self._allowed.get(tool_name)
+
+    def count_tools(self):
+        return len(self._names())
+
+    def list_tools(self):
+        return [f"{name} - {tool.brief}" for name, tool in self.tools.items()]
+
+    def _scope(self, names):
+        """The allowed tools and their mask over the catalog rows `names`, see `ToolRegistry._search`."""
+        with self._lock:
+            mask_of, mask = self._mask
+            if mask_of is not names:
+                _, mask = self.catalog._mask(self._allowed)
+                self._mask = (names, mask)
+            tools = {name: tool for name, tool in self._allowed.items() if name in self.catalog.tools}
+        return tools, mask
+
+    def search_tools(self, query: str, top_k: int = 5):
+        """
+        Search the allowed tools, see `ToolRegistry.search_tools`.
+
+        :param query: A string to match against tool descriptions.
+        :param top_k: Number of top results to return.
+        :return: A list of matching tools, sorted by relevance.
+        """
+        if self._all:
+            return self.catalog.search_tools(query, top_k)
+        return self.catalog._search(query, top_k, scope=self._scope)
+
+
+_default_catalog = None
+_default_catalog_guard = threading.Lock()
+
+
+def default_tool_catalog(**kwargs):
+    """
+    The process-wide catalog, created with `kwargs` (see `ToolRegistry`) on first use.
+    """
+    global _default_catalog
+    with _default_catalog_guard:
+        if _default_catalog is None:
+            _default_catalog = ToolCatalog(**kwargs)
+        return _default_catalog
@@ -0,0 +1,108 @@
+import math
+import re
+from collections import Counter
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it of on or that the this to use using want what with".split()
+)
+
+
+def tokenize(text):
+    """Lowercase alphanumeric terms of a text, identifiers like 'github_tool' are split, stopwords dropped."""
+    return [term for term in re.findall(r"[a-z0-9]+", str(text).lower()) if term not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse rankings by reciprocal rank fusion, each item scores sum(1 / (k + rank)).
+
+    :param rankings: Iterable of lists of ids, best first.
+    :param k: int - Damping constant, 60 is the usual choice.
+    :return: list - (id, score) tuples, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    """
+    An inverted index scoring documents with Okapi BM25.
+
+    Documents are added and removed incrementally, a search only visits the
+    postings of the query terms.
+
+    Attributes:
+        k1 (float): Term frequency saturation.
+        b (float): Document length normalization.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._lengths = {}
+        self._terms = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._lengths
+
+    def add(self, doc_id, text):
+        """Index a document, replacing a document with the same id."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        terms = Counter(tokenize(text))
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._terms[doc_id] = terms
+        self._lengths[doc_id] = sum(terms.values())
+        self._total_length += self._lengths[doc_id]
+
+    def remove(self, doc_id):
+        for term in self._terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id, 0)
+
+    def idf(self, term):
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1.0 + (len(self._lengths) - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, query, top_k=None):
+        """
+        Score the documents containing at least one query term.
+
+        :param query: str - The query.
+        :param top_k: int - Number of results, all matches if None.
+        :return: list - (doc_id, score, matched_terms) tuples, best first.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._lengths:
+            return []
+        average_length = self._total_length / len(self._lengths) or 1.0
+        scores, matched = {}, {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if top_k is not None:
+            ranked = ranked[:top_k]
+        return [(doc_id, score, matched[doc_id]) for doc_id, score in ranked]
+
+    def query_terms(self, query):
+        """Number of distinct terms of a query the index scores on."""
+        return len(set(tokenize(query)))
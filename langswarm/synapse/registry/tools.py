@@ -1,24 +1,91 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from collections import OrderedDict
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+
+from ..embeddings.encoders import load_encoder
+from ..embeddings.storage import cosine_similarity, to_storage
+from ..utils.files import write_atomic
+from .lexical import BM25Index, reciprocal_rank_fusion
+
+logger = logging.getLogger("langswarm.synapse.registry")
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EMBEDDINGS = "embeddings.npy"
+SNAPSHOT_MANIFEST = "manifest.json"
+# Semantic matches fused with the keyword matches.
+FUSION_DEPTH = 50
+
+
+def _description_hash(description):
+    return hashlib.sha256(str(description).encode("utf-8")).hexdigest()
+
+
+def _matrix_checksum(matrix):
+    return hashlib.sha256(np.ascontiguousarray(matrix).tobytes()).hexdigest()
 
 
 class ToolRegistry:
     """
     A registry for managing agent-specific tools with semantic search support.
     Stores tools in a dictionary and uses embeddings for similarity-based queries.
+
+    The embeddings can be saved to a snapshot and loaded back memory-mapped,
+    so a process only embeds the tools that changed since the snapshot.
+
+    Searches are hybrid: a BM25 index over tool names, briefs and
+    descriptions is fused with the semantic ranking by reciprocal rank
+    fusion, and a confident keyword match skips the query embedding.
     """
 
-    def __init__(self, embedding_model=None):
+    def __init__(self, embedding_model=None, encoder_backend="torch", quantize=False, encoder_threads=None,
+                 embedding_dtype="float32", model_name=None, lexical_margin=1.5, query_cache_size=256,
+                 batch_embeddings=None):
         """
         Initialize the ToolRegistry.
 
         :param embedding_model: A callable that generates embeddings for a given text.
-                                Defaults to SentenceTransformer's 'all-MiniLM-L6-v2'.
+                                Defaults to the encoder of 'all-MiniLM-L6-v2'.
+        :param encoder_backend: "torch" or "onnx", backend of the default encoder.
+        :param quantize: Use int8 dynamically quantized weights in the default encoder.
+        :param encoder_threads: Intra-op threads of the default encoder.
+        :param embedding_dtype: Storage dtype of the embeddings, "float32", "float16" or "int8".
+        :param model_name: Name of the embedding model, snapshots of another model are not reused.
+                           Defaults to the default encoder's name, required to snapshot a custom model.
+        :param lexical_margin: A search is answered from the keyword index alone when its best tool
+                               matches every query term and scores this many times the runner-up.
+                               None always runs the semantic search.
+        :param query_cache_size: Query embeddings kept in an LRU cache, 0 disables the cache.
+        :param batch_embeddings: `embedding_model` also takes a list of texts and returns a row per text,
+                                 so tools are embedded in one call. Defaults to True for the default
+                                 encoder, False for a custom model, which is called once per text.
         """
-        self.embedding_model = embedding_model or SentenceTransformer('all-MiniLM-L6-v2').encode
+        if embedding_model is None:
+            if model_name is None:
+                model_name = f"all-MiniLM-L6-v2:{encoder_backend}" + (":quantized" if quantize else "")
+            if batch_embeddings is None:
+                batch_embeddings = True
+        self.batch_embeddings = bool(batch_embeddings)
+        self.embedding_model = embedding_model or load_encoder(
+            'all-MiniLM-L6-v2', backend=encoder_backend, quantize=quantize, threads=encoder_threads
+        ).encode
+        self.model_name = model_name
+        self.embedding_dtype = embedding_dtype
+        self.lexical_margin = lexical_margin
+        self.query_cache_size = query_cache_size
         self.tools = {}
         self.embeddings = {}
+        self.stats = {"searches": 0, "lexical_only": 0, "cache_hits": 0, "cache_misses": 0}
+        self._matrix = None
+        self._lexical = BM25Index()
+        self._query_cache = OrderedDict()
+        self._lock = threading.RLock()
+        self._cache_lock = threading.Lock()
 
     def register_tool(self, tool):
         """
@@ -29,14 +96,151 @@ class ToolRegistry:
                            It must have a `description` attribute.
         :raises ValueError: If the tool is already registered or lacks a description.
         """
-        tool_name = tool.identifier
-        if tool_name in self.tools:
-            raise ValueError(f"Tool '{tool_name}' is already registered.")
-        if not hasattr(tool, "description"):
-            raise ValueError(f"Tool '{tool_name}' must have a 'description' attribute.")
-        
-        self.tools[tool_name] = tool
-        self.embeddings[tool_name] = self.embedding_model(tool.description)
+        self.register_tools([tool])
+
+    def _check_new_tools(self, tools):
+        names = set()
+        for tool in tools:
+            tool_name = tool.identifier
+            if tool_name in self.tools or tool_name in names:
+                raise ValueError(f"Tool '{tool_name}' is already registered.")
+            if not hasattr(tool, "description"):
+                raise ValueError(f"Tool '{tool_name}' must have a 'description' attribute.")
+            names.add(tool_name)
+
+    def _embed(self, tools):
+        """Embed the descriptions of tools, in one batch if the model takes batches, returns a row per tool."""
+        if not tools:
+            return []
+        if self.batch_embeddings:
+            embeddings = np.asarray(self.embedding_model([tool.description for tool in tools]))
+        else:
+            embeddings = np.stack([np.asarray(self.embedding_model(tool.description)).ravel() for tool in tools])
+        return list(to_storage(embeddings.reshape(len(tools), -1), self.embedding_dtype))
+
+    def _require_model_name(self):
+        if self.model_name is None:
+            raise ValueError("Snapshots of a custom embedding model need a `model_name`.")
+
+    def register_tools(self, tools):
+        """
+        Register several tools, embedding all their descriptions in one batch.
+
+        Nothing is registered if one of the tools is invalid.
+
+        :param tools: Iterable of tools, each with an `identifier` and a `description`.
+        :raises ValueError: If a tool is already registered or lacks a description.
+        """
+        tools = list(tools)
+        with self._lock:
+            self._check_new_tools(tools)
+            for tool, embedding in zip(tools, self._embed(tools)):
+                self._add(tool, embedding)
+            self._matrix = None
+
+    def _add(self, tool, embedding):
+        self.tools[tool.identifier] = tool
+        self.embeddings[tool.identifier] = embedding
+        brief = getattr(tool, "brief", "")
+        self._lexical.add(tool.identifier, " ".join([tool.identifier, brief if isinstance(brief, str) else "", str(tool.description)]))
+
+    def save(self, path):
+        """
+        Save the embeddings to a snapshot directory.
+
+        The snapshot is an `embeddings.npy` matrix, one row per tool, and a
+        `manifest.json` with the model name, the dtype, the dimensions and
+        checksum of the matrix and, per row, the tool name and the hash of
+        its description. The manifest is written last and its checksum must
+        match the matrix, so a crash between the two writes leaves an
+        unusable snapshot rather than a wrong one.
+
+        :param path: Directory of the snapshot, created if missing.
+        :raises ValueError: If a custom embedding model has no `model_name`.
+        """
+        self._require_model_name()
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            names = list(self.tools)
+            matrix = self._embedding_matrix(names)
+            hashes = [_description_hash(self.tools[name].description) for name in names]
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "model": self.model_name,
+            "dtype": self.embedding_dtype,
+            "dimensions": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "checksum": _matrix_checksum(matrix),
+            "tools": [{"name": name, "description_hash": digest} for name, digest in zip(names, hashes)],
+        }
+        write_atomic(os.path.join(path, SNAPSHOT_EMBEDDINGS), lambda f: np.save(f, matrix, allow_pickle=False))
+        write_atomic(os.path.join(path, SNAPSHOT_MANIFEST), lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+
+    def _read_snapshot(self, path):
+        """Return (manifest, memory-mapped embeddings) of a usable snapshot, or (None, None)."""
+        try:
+            with open(os.path.join(path, SNAPSHOT_MANIFEST), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            matrix = np.load(os.path.join(path, SNAPSHOT_EMBEDDINGS), mmap_mode="r", allow_pickle=False)
+        except (OSError, ValueError) as e:
+            logger.info("No usable tool snapshot at %s: %s", path, e)
+            return None, None
+        if manifest.get("version") != SNAPSHOT_VERSION or manifest.get("model") != self.model_name \
+                or manifest.get("dtype") != self.embedding_dtype:
+            logger.info("Tool snapshot at %s was made with another model, version or dtype, not reused.", path)
+            return None, None
+        dimensions = int(matrix.shape[1]) if matrix.ndim == 2 else 0
+        registered = next(iter(self.embeddings.values()), None)
+        if len(manifest.get("tools", [])) != len(matrix) or manifest.get("dimensions") != dimensions \
+                or (registered is not None and len(registered) != dimensions) \
+                or manifest.get("checksum") != _matrix_checksum(matrix):
+            logger.info("Tool snapshot at %s does not match its manifest or the registry, not reused.", path)
+            return None, None
+        return manifest, matrix
+
+    def load(self, path, tools):
+        """
+        Register tools, reusing the embeddings of a snapshot made by `save`.
+
+        The snapshot is memory-mapped. Tools whose description hash matches
+        the snapshot reuse its row, the other tools are embedded in one batch.
+        A snapshot of another model or dtype, or whose matrix does not match
+        its manifest, is ignored.
+
+        :param path: Directory of the snapshot.
+        :param tools: Iterable of the tools to register.
+        :return: int - Number of tools that had to be embedded.
+        :raises ValueError: If a tool is already registered or lacks a description,
+                            or a custom embedding model has no `model_name`.
+        """
+        self._require_model_name()
+        tools = list(tools)
+        with self._lock:
+            self._check_new_tools(tools)
+            manifest, matrix = self._read_snapshot(path)
+            rows = {}
+            if manifest is not None:
+                rows = {(entry["name"], entry["description_hash"]): i for i, entry in enumerate(manifest["tools"])}
+
+            reused, changed = [], []
+            for tool in tools:
+                row = rows.get((tool.identifier, _description_hash(tool.description)))
+                (changed if row is None else reused).append((tool, row))
+
+            embedded = self._embed([tool for tool, _ in changed])
+            if embedded and reused and len(embedded[0]) != matrix.shape[1]:
+                logger.warning("Tool snapshot at %s has other dimensions than the model, not reused.", path)
+                changed = [(tool, None) for tool in tools]
+                embedded, reused = self._embed(tools), []
+            for tool, row in reused:
+                self._add(tool, matrix[row])
+            for (tool, _), embedding in zip(changed, embedded):
+                self._add(tool, embedding)
+
+            self._matrix = None
+            if matrix is not None and not changed and len(self.tools) == len(tools) and [row for _, row in reused] == list(range(len(matrix))):
+                # The registry is exactly the snapshot, search straight on the memory map.
+                self._matrix = (list(self.tools), matrix)
+            return len(changed)
 
     def get_tool(self, tool_name: str):
         """
@@ -70,39 +274,119 @@ class ToolRegistry:
         :param tool_name: Name of the tool to remove.
         :raises ValueError: If the tool does not exist.
         """
-        if tool_name not in self.tools:
-            raise ValueError(f"Tool '{tool_name}' is not registered.")
-        del self.tools[tool_name]
-        del self.embeddings[tool_name]
+        with self._lock:
+            if tool_name not in self.tools:
+                raise ValueError(f"Tool '{tool_name}' is not registered.")
+            del self.tools[tool_name]
+            del self.embeddings[tool_name]
+            self._lexical.remove(tool_name)
+            self._matrix = None
 
-    def search_tools(self, query: str, top_k: int = 5):
+    def _embedding_matrix(self, names):
+        return np.stack([self.embeddings[name] for name in names]) if names else np.zeros((0, 0), dtype=np.float32)
+
+    def _search_matrix(self):
+        """Names and embedding matrix of the registered tools, cached until the registry changes."""
+        with self._lock:
+            if self._matrix is None:
+                names = list(self.embeddings)
+                self._matrix = (names, self._embedding_matrix(names))
+            return self._matrix
+
+    def _query_embedding(self, query):
+        """Embed a query, through the LRU cache of query embeddings. The model runs outside of any lock."""
+        cache = self._query_cache
+        with self._cache_lock:
+            embedding = cache.get(query)
+            if embedding is not None:
+                cache.move_to_end(query)
+                self.stats["cache_hits"] += 1
+                return embedding
+            self.stats["cache_misses"] += 1
+        embedding = self.embedding_model(query)
+        if self.query_cache_size:
+            with self._cache_lock:
+                cache[query] = embedding
+                while len(cache) > self.query_cache_size:
+                    cache.popitem(last=False)
+        return embedding
+
+    def _lexical_answer(self, query, lexical, top_k):
+        """The keyword matches if they are confident enough to skip the semantic search, else None."""
+        if self.lexical_margin is None or not lexical:
+            return None
+        best, score, matched = lexical[0]
+        if matched < self._lexical.query_terms(query):
+            return None
+        if len(lexical) > 1 and score < self.lexical_margin * lexical[1][1]:
+            return None
+        return [doc_id for doc_id, _, _ in lexical[:top_k]]
+
+    def _describe(self, names, tools):
+        described = []
+        for name in names:
+            tool = tools.get(name)
+            if tool is not None:
+                described.append({"name": name, "description": tool.description, "instruction": tool.instruction})
+        return described
+
+    def _rank(self, names, similarities, mask, depth):
+        """Names of the `depth` most similar tools, restricted to a row mask if given."""
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(names))
+        if len(candidates) > depth:
+            candidates = candidates[np.argpartition(-similarities[candidates], depth - 1)[:depth]]
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        return [names[i] for i in order]
+
+    def _search(self, query, top_k, scope=None):
         """
-        Search for tools using semantic similarity based on their descriptions.
+        Search the registered tools, or the tools of a scope.
 
-        :param query: A string to match against tool descriptions.
-        :param top_k: Number of top results to return.
-        :return: A list of matching tools, sorted by similarity score.
+        The lock is only held while the keyword matches and the search matrix
+        are taken, the query is embedded and ranked outside of it so that
+        concurrent searches do not wait on each other.
+
+        :param scope: callable - `scope(names)`, called under the lock with the names of the matrix
+                      rows, returns the searchable tools by name and the mask of their rows.
         """
-        # Check if query is a single word and exists in tools
-        if query.isalnum() and query in self.tools:
-            tool = self.tools.get(query)
-            if tool:
-                return [{"name": query, "description": tool.description, "instruction": tool.instruction}]
+        with self._lock:
+            tool_names, tool_embeddings = self._search_matrix()
+            tools, mask = scope(tool_names) if scope is not None else (self.tools, None)
+            # Check if query is a single word and exists in tools
+            if query.isalnum() and query in tools:
+                return self._describe([query], tools)
+
+            self.stats["searches"] += 1
+            lexical = self._lexical.search(query)
+            if scope is not None:
+                lexical = [hit for hit in lexical if hit[0] in tools]
+        answer = self._lexical_answer(query, lexical, top_k)
+        if answer is not None:
+            self.stats["lexical_only"] += 1
+            return self._describe(answer, tools)
 
-        query_embedding = self.embedding_model(query)
-        tool_names = list(self.embeddings.keys())
-        tool_embeddings = np.array([self.embeddings[name] for name in tool_names])
+        query_embedding = self._query_embedding(query)
 
         # Compute cosine similarity
-        similarities = cosine_similarity([query_embedding], tool_embeddings)[0]
-        ranked_indices = np.argsort(similarities)[::-1][:top_k]
-
-        return [
-            {
-                "name": tool_names[i],
-                "description": self.tools[tool_names[i]].description,
-                "instruction": self.tools[tool_names[i]].instruction,
-                #"score": similarities[i],
-            }
-            for i in ranked_indices
-        ]
+        similarities = cosine_similarity(query_embedding, tool_embeddings)[0]
+        semantic = self._rank(tool_names, similarities, mask, max(top_k, FUSION_DEPTH))
+        if not lexical:
+            return self._describe(semantic[:top_k], tools)
+
+        fused = reciprocal_rank_fusion([semantic, [doc_id for doc_id, _, _ in lexical]])
+        return self._describe([doc_id for doc_id, _ in fused[:top_k]], tools)
+
+    def search_tools(self, query: str, top_k: int = 5):
+        """
+        Search for tools by keywords and semantic similarity based on their descriptions.
+
+        A query whose best keyword match contains every query term and clearly
+        beats the other matches (see `lexical_margin`) is answered from the
+        keyword index alone, possibly with fewer than `top_k` tools. Other
+        queries fuse the keyword and semantic rankings.
+
+        :param query: A string to match against tool descriptions.
+        :param top_k: Number of top results to return.
+        :return: A list of matching tools, sorted by relevance.
+        """
+        return self._search(query, top_k)
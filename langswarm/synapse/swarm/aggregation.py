@@ -26,32 +26,37 @@ class LLMAggregation(Swarm):
         if not self.query:
             raise ValueError('Requires query to be set as a string at init.')
         
-    def generate_paragraphs(self):
+    def generate_paragraphs(self, context):
         """
         Generate response paragraphs for the given query from all LLM clients.
 
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
         Returns:
             int: Number of clients that generated paragraphs.
         """
-        for client in self.clients:
-            self._create_paragraphs(client, erase_query=True)
+        with self.tracer.span("generate", clients=len(self.clients)):
+            for client in self.clients:
+                self._create_paragraphs(client, context, erase_query=True)
         return len(self.clients)
 
-    def instantiate(self):
+    def instantiate(self, context):
         """
         Validate initialization and generate paragraphs.
 
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
         Returns:
             bool: True if successful, False otherwise.
         """
         if self.check_initialization():
-            if self.verbose:
-                print("\nInitialization successful.")
+            self._log("Initialization successful.")
 
-            created_clients = self.generate_paragraphs()
+            created_clients = self.generate_paragraphs(context)
 
-            if self.verbose:
-                print("\nClients created:", created_clients)
+            self._log("Clients created: %s", created_clients)
 
             return True
 
@@ -131,31 +136,63 @@ class LLMAggregation(Swarm):
         {paragraphs}
         ---
         """
-        if hb:
-            return hb.aggregator_bot.chat(q=query, reset=True, erase_query=True)
-        else:
-            return self.aggregate_paragraphs(paragraphs)
+        with self.tracer.span("aggregation", helper_bot=bool(hb)):
+            if hb:
+                return hb.aggregator_bot.chat(q=query, reset=True, erase_query=True)
+            else:
+                return self.aggregate_paragraphs(paragraphs)
 
-    def run(self, hb=None):
+    def run(self, hb=None, query=None, context=None):
         """
         Execute the aggregation workflow among LLM clients.
 
         Args:
             hb: Helper bot instance for performing the aggregation task.
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
 
         Returns:
             str: The aggregated paragraph or a message indicating failure.
         """
+        context = context or self.new_context(query)
         aggregated_paragraph = 'No aggregation done.'
 
-        if self.instantiate():
-            if self.verbose:
-                print("Class Instantiated.")
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.instantiate(context):
+                self._log("Class Instantiated.")
+
+                # Aggregate the list of generated paragraphs
+                aggregated_paragraph = self.aggregate_list(context.paragraphs, hb)
+
+                self._log("Aggregated list: %s", aggregated_paragraph)
+
+        context.result = aggregated_paragraph
+        return aggregated_paragraph
+
+    async def arun(self, hb=None, query=None, context=None):
+        """
+        Execute the aggregation workflow without blocking the event loop.
+
+        The clients are queried concurrently and the aggregation runs on the
+        default executor.
+
+        Args:
+            hb: Helper bot instance for performing the aggregation task.
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
+
+        Returns:
+            str: The aggregated paragraph or a message indicating failure.
+        """
+        context = context or self.new_context(query)
+        aggregated_paragraph = 'No aggregation done.'
 
-            # Aggregate the list of generated paragraphs
-            aggregated_paragraph = self.aggregate_list(self.paragraphs, hb)
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.check_initialization():
+                await self.agenerate_paragraphs(context)
+                aggregated_paragraph = await self._in_executor(self.aggregate_list, context.paragraphs, hb)
 
-            if self.verbose:
-                print("Aggregated list:", aggregated_paragraph)
+                self._log("Aggregated list: %s", aggregated_paragraph)
 
+        context.result = aggregated_paragraph
         return aggregated_paragraph
@@ -26,46 +26,80 @@ class LLMBranching(Swarm):
         if not self.query:
             raise ValueError('Requires query to be set as a string at init.')
 
-    def generate_paragraphs(self):
+    def generate_paragraphs(self, context):
         """
         Generate response paragraphs for the given query from all LLM clients.
 
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
         Returns:
             int: Number of clients that generated paragraphs.
         """
-        for client in self.clients:
-            self._create_paragraphs(client, erase_query=True)
+        with self.tracer.span("generate", clients=len(self.clients)):
+            for client in self.clients:
+                self._create_paragraphs(client, context, erase_query=True)
         return len(self.clients)
 
-    def instantiate(self):
+    def instantiate(self, context):
         """
         Validate initialization and generate paragraphs.
 
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
         Returns:
             bool: True if successful, False otherwise.
         """
         if self.check_initialization():
-            if self.verbose:
-                print("\nInitialization successful.")
+            self._log("Initialization successful.")
 
-            created_clients = self.generate_paragraphs()
+            created_clients = self.generate_paragraphs(context)
 
-            if self.verbose:
-                print("\nClients created:", created_clients)
+            self._log("Clients created: %s", created_clients)
 
             return True
 
         return False
 
-    def run(self):
+    def run(self, query=None, context=None):
         """
         Execute the branching workflow among LLM clients.
 
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
+
+        Returns:
+            list: List of paragraphs generated by LLM clients.
+        """
+        context = context or self.new_context(query)
+
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.instantiate(context):
+                self._log("Class Instantiated.")
+
+        context.result = context.paragraphs
+        return context.paragraphs
+
+    async def arun(self, query=None, context=None):
+        """
+        Execute the branching workflow without blocking the event loop.
+
+        The clients are queried concurrently.
+
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
+
         Returns:
             list: List of paragraphs generated by LLM clients.
         """
-        if self.instantiate():
-            if self.verbose:
-                print("Class Instantiated.")
+        context = context or self.new_context(query)
+
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.check_initialization():
+                await self.agenerate_paragraphs(context)
 
-        return self.paragraphs
+        context.result = context.paragraphs
+        return context.paragraphs
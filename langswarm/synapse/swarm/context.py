@@ -0,0 +1,37 @@
+from .tracing import RunReport
+
+
+class RunContext:
+    """
+    Request-scoped state of a single swarm run.
+
+    The swarm instance only holds the shared, heavy resources (embedding
+    model, clients, thresholds). Everything produced while answering one
+    query lives here, so one warm swarm can serve several threads or tasks
+    at once and nothing accumulates across runs.
+
+    Attributes:
+        query (str): The query of the run.
+        paragraphs (list): Outputs generated by the agents.
+        embeddings: Embeddings of the paragraphs, once computed.
+        results (dict): Intermediate results (similarities, thresholds, paraphrase groups...).
+        result: The final result of the run.
+        report (RunReport): Stage breakdown and counters, filled when the swarm has a tracer.
+        leases (list): (pool, client) leases of the run, given back when it ends.
+        clients (list): Clients leased for the run from `llms` configs, in the order they were asked.
+    """
+
+    __slots__ = ("query", "paragraphs", "embeddings", "results", "result", "report", "leases", "clients")
+
+    def __init__(self, query=''):
+        self.query = query
+        self.paragraphs = []
+        self.embeddings = None
+        self.results = {}
+        self.result = None
+        self.report = RunReport()
+        self.leases = []
+        self.clients = []
+
+    def __repr__(self):
+        return f"RunContext(query={self.query!r}, paragraphs={len(self.paragraphs)})"
@@ -0,0 +1,261 @@
+import hashlib
+import json
+from collections.abc import MutableSequence, Sequence
+
+# Tokens a chat message costs beyond its content (role and separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def message_tokens(message, token_counter):
+    """Tokens of one chat message, its content plus the per-message overhead."""
+    content = message.get("content", "") if isinstance(message, dict) else message
+    return token_counter(str(content or "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationState(Sequence):
+    """
+    An immutable conversation history with structural sharing.
+
+    A state is a segment of messages on top of a parent state. `append` and
+    `extend` return a new state pointing at the old one, so every version of
+    a conversation shares its prefix with the others, and handing a state to
+    N agents costs nothing per agent. Token counts are cached per segment,
+    and the running total is kept per state, so counting the tokens of a
+    grown history only counts the new segment. Indexing flattens the
+    history into a tuple once per state.
+
+    Attributes:
+        parent (ConversationState): The state this one extends, None for the root.
+        segment (tuple): The messages added by this state.
+    """
+
+    __slots__ = ("parent", "segment", "_length", "_depth", "_fingerprint", "_tokens", "_messages")
+
+    def __init__(self, messages=(), parent=None):
+        self.parent = parent
+        self.segment = tuple(messages)
+        self._length = len(self.segment) + (len(parent) if parent is not None else 0)
+        self._depth = parent._depth + 1 if parent is not None else 0
+        self._fingerprint = None
+        self._tokens = {}
+        self._messages = None
+
+    @classmethod
+    def of(cls, messages):
+        """The state of a list of messages, returned as is if it already is a state."""
+        return messages if isinstance(messages, cls) else cls(messages)
+
+    def append(self, message):
+        return ConversationState((message,), parent=self)
+
+    def extend(self, messages):
+        messages = tuple(messages)
+        return ConversationState(messages, parent=self) if messages else self
+
+    def _segments(self):
+        segments, state = [], self
+        while state is not None:
+            if state.segment:
+                segments.append(state.segment)
+            state = state.parent
+        segments.reverse()
+        return segments
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for segment in self._segments():
+            yield from segment
+
+    def messages(self):
+        """The whole history as a tuple, built once per state."""
+        if self._messages is None:
+            self._messages = tuple(message for segment in self._segments() for message in segment)
+        return self._messages
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.messages()[index])
+        try:
+            return self.messages()[index]
+        except IndexError:
+            raise IndexError("conversation index out of range") from None
+
+    def __eq__(self, other):
+        if isinstance(other, ConversationState) and other.fingerprint == self.fingerprint:
+            return True
+        return isinstance(other, Sequence) and not isinstance(other, str) and list(self) == list(other)
+
+    def __hash__(self):
+        return hash(self.fingerprint)
+
+    def __repr__(self):
+        return f"ConversationState(messages={self._length}, segments={self._depth + 1})"
+
+    @property
+    def fingerprint(self):
+        """Hash of the whole history, the same however it was split into segments."""
+        if self._fingerprint is None:
+            # Walk up to the nearest hashed ancestor, iteratively to allow long chains.
+            pending, state = [], self
+            while state is not None and state._fingerprint is None:
+                pending.append(state)
+                state = state.parent
+            fingerprint = state._fingerprint if state is not None else ""
+            for ancestor in reversed(pending):
+                for message in ancestor.segment:
+                    message = json.dumps(message, sort_keys=True, default=str)
+                    fingerprint = hashlib.sha256((fingerprint + message).encode("utf-8")).hexdigest()
+                ancestor._fingerprint = fingerprint
+        return self._fingerprint
+
+    def segment_tokens(self, token_counter):
+        """Tokens of this state's own segment, cached per counter."""
+        key = ("segment", token_counter)
+        if key not in self._tokens:
+            self._tokens[key] = sum(message_tokens(m, token_counter) for m in self.segment)
+        return self._tokens[key]
+
+    def token_count(self, token_counter):
+        """
+        Tokens of the whole history.
+
+        :param token_counter: callable - Counts the tokens of a text.
+        :return: int - The token count, only segments not counted before are counted.
+        """
+        key = ("total", token_counter)
+        if key not in self._tokens:
+            # Walk up to the nearest counted ancestor, iteratively to allow long chains.
+            pending, state = [], self
+            while state is not None and ("total", token_counter) not in state._tokens:
+                pending.append(state)
+                state = state.parent
+            total = state._tokens[("total", token_counter)] if state is not None else 0
+            for ancestor in reversed(pending):
+                total += ancestor.segment_tokens(token_counter)
+                ancestor._tokens[("total", token_counter)] = total
+        return self._tokens[key]
+
+    def view(self):
+        """A mutable, copy-on-write view of the state for one agent."""
+        return ConversationView(self)
+
+
+class ConversationView(MutableSequence):
+    """
+    A per-agent, copy-on-write view over a shared `ConversationState`.
+
+    Behaves like the `in_memory` list of a client: messages added in front
+    (e.g. a system prompt) and appended after the shared history are kept
+    in small per-view lists, the shared history itself is never copied.
+    Only changing or removing a message of the shared history copies it
+    into this view.
+
+    Attributes:
+        head (list): Messages before the shared history.
+        base (ConversationState): The shared history.
+        tail (list): Messages after the shared history.
+    """
+
+    __slots__ = ("head", "base", "tail")
+
+    def __init__(self, base=None, head=None, tail=None):
+        self.head = list(head or [])
+        self.base = base if base is not None else ConversationState()
+        self.tail = list(tail or [])
+
+    def _materialize(self):
+        """Copy the shared history into this view before changing it."""
+        self.head = self.head + list(self.base) + self.tail
+        self.base = ConversationState()
+        self.tail = []
+
+    def _index(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("conversation index out of range")
+        return index
+
+    def _locate(self, index):
+        """The part holding a (non-negative) index and the offset in it."""
+        if index < len(self.head):
+            return self.head, index
+        index -= len(self.head)
+        if index < len(self.base):
+            return self.base, index
+        return self.tail, index - len(self.base)
+
+    def __len__(self):
+        return len(self.head) + len(self.base) + len(self.tail)
+
+    def __iter__(self):
+        yield from self.head
+        yield from self.base
+        yield from self.tail
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        part, offset = self._locate(self._index(index))
+        return part[offset]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            messages = list(self)
+            messages[index] = value
+            self.head, self.base, self.tail = messages, ConversationState(), []
+            return
+        index = self._index(index)
+        part, offset = self._locate(index)
+        if part is self.base:
+            self._materialize()
+            part, offset = self.head, index
+        part[offset] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            messages = list(self)
+            del messages[index]
+            self.head, self.base, self.tail = messages, ConversationState(), []
+            return
+        index = self._index(index)
+        part, offset = self._locate(index)
+        if part is self.base:
+            self._materialize()
+            part, offset = self.head, index
+        del part[offset]
+
+    def insert(self, index, value):
+        if index < 0:
+            index = max(0, index + len(self))
+        if index <= len(self.head):
+            self.head.insert(index, value)
+        elif index >= len(self.head) + len(self.base):
+            self.tail.insert(index - len(self.head) - len(self.base), value)
+        else:
+            self._materialize()
+            self.head.insert(index, value)
+
+    def __add__(self, other):
+        return ConversationView(self.base, self.head, self.tail + list(other))
+
+    def __radd__(self, other):
+        # `[system_prompt] + view` keeps sharing the history.
+        return ConversationView(self.base, list(other) + self.head, self.tail)
+
+    def __eq__(self, other):
+        return isinstance(other, Sequence) and not isinstance(other, str) and list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return ConversationView(self.base, self.head, self.tail)
+
+    def freeze(self):
+        """The view as a state, sharing the history when nothing was put in front of it."""
+        if self.head:
+            return ConversationState(list(self))
+        return self.base.extend(self.tail)
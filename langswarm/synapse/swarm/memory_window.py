@@ -0,0 +1,234 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ..utils.tokens import count_tokens
+from .conversation import message_tokens
+
+logger = logging.getLogger("langswarm.synapse.swarm")
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def bot_summarizer(bot, max_words=200):
+    """
+    A summarizer asking an LLM client to fold evicted turns into the running summary.
+
+    The bot must be a separate client from the one whose memory is windowed:
+    background summaries run while that client answers the next turn, and a
+    client's memory is not safe to use from two threads. `LLMRouting` rejects
+    a window summarizing with its own main bot.
+
+    :param bot: A client with `chat(q=..., erase_query=True)`, its memory is left unchanged.
+    :param max_words: int - Length the summary is asked to stay under.
+    :return: callable - `summarizer(summary, messages) -> str`, with the client as its `bot` attribute.
+    """
+    def summarize(summary, messages):
+        turns = "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+        prompt = (
+            f"Update the summary of a conversation with the turns below, in at most {max_words} words. "
+            "Keep facts, decisions and open questions, drop small talk.\n\n"
+            f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{turns}\n\nOutput the updated summary only."
+        )
+        return bot.chat(q=prompt, erase_query=True)
+
+    summarize.bot = bot
+    return summarize
+
+
+class MemoryWindow:
+    """
+    Keeps a bot's conversation memory within a token budget.
+
+    After every turn, the oldest turns are evicted until the memory fits in
+    `max_tokens`, always keeping the system prompt and the last `keep_last`
+    messages. With a `summarizer`, evicted turns are folded into a summary
+    kept as a system message after the system prompt; summaries are made in
+    the background by default and show up in the memory at the next turn.
+
+    Token counts are cached per message and the window only counts messages
+    added since the last turn, so keeping the budget costs O(new + evicted)
+    messages however long the session has been. A window tracks one bot.
+    A summarizer calling an LLM client must use a client of its own, see
+    `bot_summarizer`. Call `close` to stop the summary worker.
+
+    Attributes:
+        max_tokens (int): Token budget of the memory.
+        keep_last (int): Most recent messages never evicted.
+        summary (str): Running summary of the evicted turns.
+        evicted (int): Messages evicted.
+        counted (int): Messages whose tokens were counted.
+        summaries (int): Summaries made.
+    """
+
+    def __init__(self, max_tokens=4000, keep_last=2, token_counter=count_tokens, summarizer=None, background=True):
+        """
+        :param max_tokens: int - Token budget of the memory.
+        :param keep_last: int - Most recent messages never evicted.
+        :param token_counter: callable - Counts the tokens of a text, tiktoken's cl100k_base by default.
+        :param summarizer: callable - `summarizer(summary, messages) -> str`, evicted turns are dropped if None.
+        :param background: bool - Summarize on a worker thread instead of during the turn.
+        """
+        self.max_tokens = max_tokens
+        self.keep_last = keep_last
+        self.token_counter = token_counter
+        self.summarizer = summarizer
+        self.background = background
+        self.summary = None
+        self.evicted = 0
+        self.counted = 0
+        self.summaries = 0
+        self._tracked = deque()
+        self._turn_tokens = 0
+        self._summary_message = None
+        self._summary_tokens = 0
+        self._system = (None, 0)
+        self._system_tokens_used = 0
+        self._pending = []
+        self._future = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _count(self, message):
+        self.counted += 1
+        return message_tokens(message, self.token_counter)
+
+    def _system_tokens(self, history):
+        """Tokens of the system prompt, recounted only when it changes."""
+        first = history[0] if history else None
+        if not (isinstance(first, dict) and first.get("role") == "system") or first is self._summary_message:
+            return 0, 0
+        if self._system[0] != first.get("content"):
+            self._system = (first.get("content"), self._count(first))
+        return 1, self._system[1]
+
+    def _sync(self, history, start):
+        """Track the messages added since the last turn, recounting all only if the memory was changed elsewhere."""
+        tracked = self._tracked
+        turns = len(history) - start
+        if tracked and (
+            len(tracked) > turns
+            or history[start] is not tracked[0][0]
+            or history[start + len(tracked) - 1] is not tracked[-1][0]
+        ):
+            tracked.clear()
+            self._turn_tokens = 0
+        for message in history[start + len(tracked):]:
+            tokens = self._count(message)
+            tracked.append((message, tokens))
+            self._turn_tokens += tokens
+
+    def _collect_summary(self):
+        """Take a finished background summary, if any."""
+        future = self._future
+        if future is None or not future.done():
+            return
+        self._future = None
+        try:
+            self._set_summary(future.result())
+        except Exception as e:
+            logger.warning("Summarizing evicted turns failed, they are dropped: %s", e)
+
+    def _set_summary(self, summary):
+        self.summary = summary
+        self.summaries += 1
+
+    def _summarize(self):
+        """Hand the evicted turns to the summarizer, one batch at a time so summaries fold in order."""
+        if self.summarizer is None or not self._pending or self._future is not None:
+            return
+        batch, self._pending = self._pending, []
+        if not self.background:
+            try:
+                self._set_summary(self.summarizer(self.summary, batch))
+            except Exception as e:
+                logger.warning("Summarizing evicted turns failed, they are dropped: %s", e)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summarizer")
+        self._future = self._executor.submit(self.summarizer, self.summary, batch)
+
+    def _place_summary(self, history, protected):
+        """Put the current summary after the system prompt, replacing the previous one."""
+        if self.summary is None:
+            return
+        content = SUMMARY_PREFIX + self.summary
+        current = self._summary_message
+        present = current is not None and len(history) > protected and history[protected] is current
+        if present and current.get("content") == content:
+            return
+        message = {"role": "system", "content": content}
+        if present:
+            history[protected] = message
+        else:
+            history.insert(protected, message)
+        self._summary_message = message
+        self._summary_tokens = self._count(message)
+
+    def token_count(self):
+        """Tokens of the memory as of the last `enforce`."""
+        return self._system_tokens_used + (self._summary_tokens if self._summary_message is not None else 0) + self._turn_tokens
+
+    def enforce(self, bot):
+        """
+        Evict the oldest turns of the bot's memory until it fits in the budget.
+
+        :param bot: A client keeping its messages in `in_memory`.
+        :return: int - Messages evicted.
+        """
+        with self._lock:
+            history = bot.in_memory
+            if not history:
+                self._tracked.clear()
+                self._turn_tokens = 0
+                return 0
+
+            self._collect_summary()
+            protected, system_tokens = self._system_tokens(history)
+            self._system_tokens_used = system_tokens
+            self._place_summary(history, protected)
+            has_summary = self._summary_message is not None and len(history) > protected and history[protected] is self._summary_message
+            if not has_summary:
+                self._summary_message = None
+            start = protected + (1 if has_summary else 0)
+            self._sync(history, start)
+
+            evicted = []
+            budget = self.max_tokens - system_tokens - (self._summary_tokens if has_summary else 0)
+            while self._turn_tokens > budget and len(self._tracked) > self.keep_last:
+                message, tokens = self._tracked.popleft()
+                self._turn_tokens -= tokens
+                evicted.append(message)
+            if evicted:
+                del history[start:start + len(evicted)]
+                self.evicted += len(evicted)
+                self._pending.extend(evicted)
+                self._summarize()
+            return len(evicted)
+
+    def flush(self, bot=None):
+        """
+        Wait for the pending summaries, and place the summary in the bot's memory if given.
+
+        :param bot: A client whose memory should get the latest summary.
+        """
+        while True:
+            with self._lock:
+                future = self._future
+                if future is None:
+                    self._summarize()
+                    future = self._future
+                if future is None:
+                    break
+            future.exception()
+            with self._lock:
+                self._collect_summary()
+        if bot is not None:
+            self.enforce(bot)
+
+    def close(self):
+        """Wait for a running summary and stop the worker thread, one is started again if needed."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def default_client_factory(llm_config, system_prompt):
+    """Create a langswarm-core LLM client from a swarm llm config."""
+    from langswarm.core.base.bot import LLM
+
+    return LLM(
+        provider=llm_config['provider'],
+        model=llm_config['model'],
+        api_key=llm_config.get('key'),
+        system_prompt=system_prompt,
+    )
+
+
+class ClientPoolMetrics:
+    """
+    Statistics of a client pool.
+
+    Attributes:
+        leases (int): Clients leased.
+        hits (int): Leases served by an idle pooled client.
+        created (int): Clients created.
+        waits (int): Leases that waited for a client to be released.
+        timeouts (int): Leases that gave up waiting.
+        wait_time (float): Total seconds leases waited.
+        evicted (int): Idle clients evicted.
+        discarded (int): Clients dropped on release because they could not be reset.
+    """
+
+    def __init__(self):
+        self.leases = 0
+        self.hits = 0
+        self.created = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.evicted = 0
+        self.discarded = 0
+
+    def to_dict(self):
+        return {
+            "leases": self.leases,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.leases if self.leases else 0.0,
+            "created": self.created,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time,
+            "evicted": self.evicted,
+            "discarded": self.discarded,
+        }
+
+
+class ClientPool:
+    """
+    Leases LLM clients to swarms, keyed by (provider, model, config hash, system prompt hash).
+
+    Creating a client pays its setup and, on its first call, a fresh HTTP
+    connection. A pooled client keeps its HTTP session between leases, so its
+    connections are reused. A client's conversation memory is reset when it
+    is released, so every lease starts clean.
+
+    Attributes:
+        factory (callable): `factory(llm_config, system_prompt)` creates a client.
+        max_per_key (int): Clients per key, leases wait for a release beyond it. Unbounded if None.
+        max_idle (int): Idle clients kept per key.
+        idle_timeout (float): Seconds an idle client is kept.
+        metrics (ClientPoolMetrics): Pool statistics.
+    """
+
+    def __init__(self, factory=None, max_per_key=None, max_idle=16, idle_timeout=300.0, clock=time.monotonic):
+        self.factory = factory or default_client_factory
+        self.max_per_key = max_per_key
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.metrics = ClientPoolMetrics()
+        self._clock = clock
+        self._idle = {}
+        self._counts = {}
+        self._keys = {}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def key(llm_config, system_prompt):
+        """
+        Pool key of a client: provider, model, and hashes of the whole config and of the system prompt.
+
+        The config hash covers the API key and any other credential, so a
+        client built with one tenant's key is never leased to another.
+        """
+        config = json.dumps(llm_config, sort_keys=True, default=repr)
+        config_hash = hashlib.sha256(config.encode("utf-8")).hexdigest()[:16]
+        prompt_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()[:16]
+        return llm_config['provider'], llm_config['model'], config_hash, prompt_hash
+
+    def key_of(self, client):
+        """The pool key of a leased client, None if the client is not leased from this pool."""
+        with self._condition:
+            return self._keys.get(id(client))
+
+    def _evict_idle(self, now):
+        """Drop idle clients past the idle timeout, with the condition held."""
+        for key, idle in self._idle.items():
+            while idle and now - idle[0][1] > self.idle_timeout:
+                idle.popleft()
+                self._counts[key] -= 1
+                self.metrics.evicted += 1
+
+    def evict_idle(self):
+        """
+        Drop idle clients past the idle timeout.
+
+        :return: int - Number of clients evicted.
+        """
+        with self._condition:
+            evicted = self.metrics.evicted
+            self._evict_idle(self._clock())
+            self._condition.notify_all()
+            return self.metrics.evicted - evicted
+
+    def acquire(self, llm_config, system_prompt=None, timeout=None):
+        """
+        Lease a client, reusing an idle one of the same key when possible.
+
+        :param llm_config: dict - Config with 'provider', 'model' and 'key'.
+        :param system_prompt: str - System prompt of the client.
+        :param timeout: float - Seconds to wait when `max_per_key` clients are leased.
+        :return: The client, to be given back with `release`.
+        :raises TimeoutError: If no client was released within the timeout.
+        """
+        key = self.key(llm_config, system_prompt)
+        started = self._clock()
+        waited = False
+        with self._condition:
+            while True:
+                self._evict_idle(self._clock())
+                idle = self._idle.get(key)
+                if idle:
+                    client, _ = idle.pop()
+                    self.metrics.hits += 1
+                    break
+                if self.max_per_key is None or self._counts.get(key, 0) < self.max_per_key:
+                    self._counts[key] = self._counts.get(key, 0) + 1
+                    client = None
+                    break
+                waited = True
+                remaining = None if timeout is None else timeout - (self._clock() - started)
+                if remaining is not None and remaining <= 0:
+                    self.metrics.waits += 1
+                    self.metrics.timeouts += 1
+                    self.metrics.wait_time += self._clock() - started
+                    raise TimeoutError(f"No client available for {key[:2]} within {timeout}s.")
+                self._condition.wait(remaining)
+
+            self.metrics.leases += 1
+            if waited:
+                self.metrics.waits += 1
+                self.metrics.wait_time += self._clock() - started
+
+        if client is None:
+            try:
+                client = self.factory(llm_config, system_prompt)
+            except Exception:
+                with self._condition:
+                    self._counts[key] -= 1
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                self.metrics.created += 1
+
+        with self._condition:
+            self._keys[id(client)] = key
+        return client
+
+    def release(self, client, discard=False):
+        """
+        Give a leased client back, its memory is reset for the next lease.
+
+        :param client: A client returned by `acquire`.
+        :param discard: bool - Drop the client instead of pooling it, e.g. after a failed call.
+        """
+        with self._condition:
+            key = self._keys.pop(id(client))
+
+        if not discard:
+            try:
+                client.reset()
+            except Exception:
+                discard = True
+
+        with self._condition:
+            idle = self._idle.setdefault(key, deque())
+            if discard or len(idle) >= self.max_idle:
+                self._counts[key] -= 1
+                if discard:
+                    self.metrics.discarded += 1
+            else:
+                idle.append((client, self._clock()))
+            self._condition.notify_all()
+
+    @contextmanager
+    def lease(self, llm_config, system_prompt=None, timeout=None):
+        """Lease a client for the duration of a `with` block, discarding it if the block fails."""
+        client = self.acquire(llm_config, system_prompt, timeout)
+        try:
+            yield client
+        except Exception:
+            self.release(client, discard=True)
+            raise
+        self.release(client)
+
+    def idle_count(self):
+        with self._condition:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def clear(self):
+        """Drop all idle clients."""
+        with self._condition:
+            for key, idle in self._idle.items():
+                self._counts[key] -= len(idle)
+                idle.clear()
+            self._condition.notify_all()
+
+
+_default_pool = None
+_default_pool_guard = threading.Lock()
+
+
+def default_client_pool():
+    """The process-wide pool used by swarms without a pool of their own."""
+    global _default_pool
+    with _default_pool_guard:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
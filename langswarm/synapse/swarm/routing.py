@@ -1,8 +1,16 @@
 import re
+import asyncio
+import inspect
+import logging
 
 from .swarm import Swarm
 from .branching import LLMBranching
 from .consensus import LLMConsensus
+from .memory_window import MemoryWindow
+from .tracing import NULL_TRACER
+from ..embeddings.encoders import load_encoder
+
+logger = logging.getLogger("langswarm.synapse.swarm")
 
 class LLMRouting:
     """
@@ -21,10 +29,12 @@ class LLMRouting:
         main_bot (LLM): The main bot instance for processing queries.
         query (str): Input query to be processed.
         remove_chat (bool): Flag to determine whether to remove chat history after processing.
-        verbose (bool): Enable detailed logs.
+        verbose (bool): Log progress at INFO instead of DEBUG level.
+        tracer (Tracer): Records agent call spans, shared with the swarms it creates.
+        memory_window (MemoryWindow): Token budget of the main bot's memory, unbounded if None.
     """
 
-    def __init__(self, route, bots, main_bot, query, remove_chat=False, verbose=False):
+    def __init__(self, route, bots, main_bot, query, remove_chat=False, verbose=False, tracer=None, model='all-MiniLM-L6-v2', memory_window=None):
         """
         Initialize the LLMRouting class with the specified route and parameters.
 
@@ -34,7 +44,14 @@ class LLMRouting:
             main_bot (LLM): The main bot instance for processing queries.
             query (str): Input query to be processed.
             remove_chat (bool): Whether to remove chat history after processing.
-            verbose (bool): Enable detailed logs.
+            verbose (bool): Log progress at INFO instead of DEBUG level.
+            tracer (Tracer, optional): Records spans, tracing is disabled if None.
+            model (str or object): Embedding model of the swarms created by routes 1 and 2.
+            memory_window (MemoryWindow or int, optional): Token budget of the main bot's memory,
+                an int is a budget without summarization. Its summarizer must not chat with the main bot.
+
+        Raises:
+            ValueError: If the memory window summarizes with the main bot.
         """
         self.route = route
         self.bots = bots
@@ -42,6 +59,37 @@ class LLMRouting:
         self.query = query
         self.remove_chat = remove_chat
         self.verbose = verbose
+        self.tracer = tracer or NULL_TRACER
+        self.model = model
+        self.memory_window = MemoryWindow(memory_window) if isinstance(memory_window, int) else memory_window
+        if self.memory_window is not None and getattr(self.memory_window.summarizer, "bot", None) is main_bot:
+            raise ValueError("The memory window must summarize with a separate client, not the main bot.")
+
+    def close(self):
+        """Wait for the memory window's pending summary and stop its worker thread."""
+        if self.memory_window is not None:
+            self.memory_window.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _log(self, msg, *args):
+        """Log a progress event, at INFO level when verbose and DEBUG otherwise."""
+        logger.log(logging.INFO if self.verbose else logging.DEBUG, msg, *args)
+
+    def _keep_chat(self, _bot, response):
+        """Remove the turn or add the response, keeping the main bot's memory within its window."""
+        if self.remove_chat:
+            _bot.remove()
+            return
+        _bot.add_response(response)
+        if self.memory_window is not None and _bot is self.main_bot:
+            evicted = self.memory_window.enforce(_bot)
+            if evicted:
+                self.tracer.count("evicted_messages", evicted)
 
     def call(self, _bot, _query):
         """
@@ -54,14 +102,41 @@ class LLMRouting:
         Returns:
             str: The response from the bot.
         """
-        response = _bot.chat(q=_query)
-        if self.remove_chat:
-            _bot.remove()
-        else:
-            _bot.add_response(response)
+        with self.tracer.span("agent_call", route=self.route):
+            response = _bot.chat(q=_query)
+        self.tracer.count("agent_calls")
+        self._keep_chat(_bot, response)
+        return response
+
+    async def acall(self, _bot, _query):
+        """
+        Process a query using the specified bot without blocking the event loop.
 
+        Bots with a native coroutine `achat` are awaited, other bots are called
+        on the default executor.
+
+        Args:
+            _bot (LLM): The bot instance to use for processing.
+            _query (str): The query to process.
+
+        Returns:
+            str: The response from the bot.
+        """
+        if not inspect.iscoroutinefunction(getattr(_bot, "achat", None)):
+            return await asyncio.get_running_loop().run_in_executor(None, self.call, _bot, _query)
+
+        with self.tracer.span("agent_call", route=self.route):
+            response = await _bot.achat(q=_query)
+        self.tracer.count("agent_calls")
+        self._keep_chat(_bot, response)
         return response
 
+    async def _aencoder(self):
+        """Load the embedding model named by `self.model` once, in an executor thread."""
+        if isinstance(self.model, str):
+            self.model = await asyncio.get_running_loop().run_in_executor(None, load_encoder, self.model)
+        return self.model
+
     def safe_str_to_int(self, s):
         """
         Safely convert a string to an integer by extracting numeric parts.
@@ -77,33 +152,18 @@ class LLMRouting:
             return int(float(match.group()))
         return 0
 
-    def run(self):
+    def _selection_query(self, query, responses):
         """
-        Execute the selected routing strategy.
+        Build the prompt asking the consensus swarm to pick the best response (route 1).
+
+        Args:
+            query (str): The original query.
+            responses (list): The responses of the branching swarm.
 
         Returns:
-            str: The result of the routing workflow.
+            str: The selection prompt.
         """
-        if self.route == 0:
-            # Route 0: Regular route
-            if self.verbose:
-                print('\nRunning Route 0: Regular route')
-            return self.call(self.main_bot, self.query)
-
-        elif self.route == 1:
-            # Route 1: LLMBranching with consolidation
-            if self.verbose:
-                print('\nRunning Route 1: LLMBranching with consolidation')
-
-            swarm = LLMBranching(
-                query=self.query,
-                verbose=self.verbose,
-                clients=self.bots
-            )
-
-            responses = swarm.run()
-
-            query = f"""
+        return f"""
             Below is a query and a list of LLM agent's responses to that query. Your goal is to select the best response to the query.
 
             Instructions:
@@ -113,7 +173,7 @@ class LLMRouting:
             ---
 
             Task:
-            {self.query}
+            {query}
 
             ---
 
@@ -127,55 +187,150 @@ class LLMRouting:
             Example output: '7'.
             """
 
-            consensus_swarm = LLMConsensus(
+    def _select_response(self, responses, run_result):
+        """
+        Return the response whose index the consensus swarm selected (route 1).
+
+        Args:
+            responses (list): The responses of the branching swarm.
+            run_result (str): The output of the consensus swarm.
+
+        Returns:
+            str: The selected response, or an error message.
+        """
+        index = self.safe_str_to_int(run_result)
+
+        try:
+            return responses[index]
+        except IndexError as e:
+            self._log("IndexError: %s", e)
+            return "Error: Invalid response index."
+
+    def run(self, query=None):
+        """
+        Execute the selected routing strategy.
+
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+
+        Returns:
+            str: The result of the routing workflow.
+        """
+        query = self.query if query is None else query
+
+        if self.route == 0:
+            # Route 0: Regular route
+            self._log("Running Route 0: Regular route")
+            return self.call(self.main_bot, query)
+
+        elif self.route == 1:
+            # Route 1: LLMBranching with consolidation
+            self._log("Running Route 1: LLMBranching with consolidation")
+
+            swarm = LLMBranching(
                 query=query,
+                verbose=self.verbose,
+                clients=self.bots,
+                tracer=self.tracer,
+                model=self.model
+            )
+
+            responses = swarm.run()
+
+            consensus_swarm = LLMConsensus(
+                query=self._selection_query(query, responses),
                 verbose=True,
-                clients=self.bots
+                clients=self.bots,
+                tracer=self.tracer,
+                model=self.model
             )
 
             run_result = consensus_swarm.run()
-            index = self.safe_str_to_int(run_result)
-
-            try:
-                return responses[index]
-            except IndexError as e:
-                if self.verbose:
-                    print('IndexError:', e)
-                return "Error: Invalid response index."
+            return self._select_response(responses, run_result)
 
         elif self.route == 2:
             # Route 2: LLMConsensus
-            if self.verbose:
-                print('\nRunning Route 2: LLMConsensus')
+            self._log("Running Route 2: LLMConsensus")
 
             swarm = LLMConsensus(
-                query=self.query,
+                query=query,
                 verbose=self.verbose,
-                clients=self.bots
+                clients=self.bots,
+                tracer=self.tracer,
+                model=self.model
             )
 
             return swarm.run()
 
         elif self.route == 3:
             # Route 3: Prompt reformulator
-            if self.verbose:
-                print('\nRunning Route 3: Prompt reformulator')
+            self._log("Running Route 3: Prompt reformulator")
 
-            response = self.call(self.bots.prompt.prompt_reformulator_llm, self.query)
+            response = self.call(self.bots.prompt.prompt_reformulator_llm, query)
 
-            if self.verbose:
-                print('\nUpdated query via route 3:', response)
+            self._log("Updated query via route 3: %s", response)
 
             return self.call(self.main_bot, response)
 
         elif self.route == 4:
             # Route 4: Prompt to inline
-            if self.verbose:
-                print('\nRunning Route 4: Prompt to inline')
+            self._log("Running Route 4: Prompt to inline")
 
-            response = self.call(self.bots.prompt.remarks_to_inline_bot, self.query)
+            response = self.call(self.bots.prompt.remarks_to_inline_bot, query)
 
-            if self.verbose:
-                print('\nUpdated query via route 4:', response)
+            self._log("Updated query via route 4: %s", response)
 
             return self.call(self.main_bot, response)
+
+    async def arun(self, query=None):
+        """
+        Execute the selected routing strategy without blocking the event loop.
+
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+
+        Returns:
+            str: The result of the routing workflow.
+        """
+        query = self.query if query is None else query
+
+        if self.route == 0:
+            self._log("Running Route 0: Regular route")
+            return await self.acall(self.main_bot, query)
+
+        elif self.route == 1:
+            self._log("Running Route 1: LLMBranching with consolidation")
+
+            model = await self._aencoder()
+            swarm = LLMBranching(query=query, verbose=self.verbose, clients=self.bots, tracer=self.tracer, model=model)
+            responses = await swarm.arun()
+
+            selection_query = self._selection_query(query, responses)
+            consensus_swarm = LLMConsensus(query=selection_query, verbose=True, clients=self.bots, tracer=self.tracer, model=model)
+            run_result = await consensus_swarm.arun()
+            return self._select_response(responses, run_result)
+
+        elif self.route == 2:
+            self._log("Running Route 2: LLMConsensus")
+
+            model = await self._aencoder()
+            swarm = LLMConsensus(query=query, verbose=self.verbose, clients=self.bots, tracer=self.tracer, model=model)
+            return await swarm.arun()
+
+        elif self.route == 3:
+            self._log("Running Route 3: Prompt reformulator")
+
+            response = await self.acall(self.bots.prompt.prompt_reformulator_llm, query)
+
+            self._log("Updated query via route 3: %s", response)
+
+            return await self.acall(self.main_bot, response)
+
+        elif self.route == 4:
+            self._log("Running Route 4: Prompt to inline")
+
+            response = await self.acall(self.bots.prompt.remarks_to_inline_bot, query)
+
+            self._log("Updated query via route 4: %s", response)
+
+            return await self.acall(self.main_bot, response)
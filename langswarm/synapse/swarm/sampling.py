@@ -0,0 +1,139 @@
+import math
+import threading
+from collections import deque
+from statistics import NormalDist, median
+
+
+def wilson_interval(successes, n, confidence=0.9):
+    """
+    Wilson score interval of a proportion.
+
+    Args:
+        successes (int): Number of successes, e.g. agents in the top answer group.
+        n (int): Number of trials, e.g. agents asked.
+        confidence (float): Confidence level of the interval (0-1).
+
+    Returns:
+        tuple: (low, high) bounds of the proportion.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class AgreementHistory:
+    """
+    Per query class statistics of past adaptive runs.
+
+    Keeps the number of agents the recent runs of each class needed, and
+    their top group share. Share one history between swarms to let them
+    learn from each other's runs.
+
+    Attributes:
+        window (int): Number of recent runs kept per class.
+    """
+
+    def __init__(self, window=50):
+        self.window = window
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def record(self, query_class, agents, top_share):
+        with self._lock:
+            runs = self._runs.setdefault(query_class, deque(maxlen=self.window))
+            runs.append((agents, top_share))
+
+    def typical_agents(self, query_class):
+        """The median number of agents recent runs of the class needed, None without history."""
+        with self._lock:
+            runs = list(self._runs.get(query_class, ()))
+        return int(median(agents for agents, _ in runs)) if runs else None
+
+    def stats(self, query_class):
+        with self._lock:
+            runs = list(self._runs.get(query_class, ()))
+        if not runs:
+            return {"runs": 0}
+        return {
+            "runs": len(runs),
+            "median_agents": median(agents for agents, _ in runs),
+            "mean_top_share": sum(share for _, share in runs) / len(runs),
+        }
+
+    def to_dict(self):
+        with self._lock:
+            return {query_class: [list(run) for run in runs] for query_class, runs in self._runs.items()}
+
+    @classmethod
+    def from_dict(cls, data, window=50):
+        history = cls(window=window)
+        for query_class, runs in data.items():
+            for agents, top_share in runs:
+                history.record(query_class, agents, top_share)
+        return history
+
+
+class AdaptiveSampler:
+    """
+    Decides how many agents a swarm asks, from the agreement of their answers.
+
+    A run starts with a small batch of agents, sized from the history of its
+    query class, and adds `step` agents at a time while the Wilson interval
+    of the top answer group's support is inconclusive: its lower bound is not
+    above one half (no established majority) and it is wider than `margin`
+    on each side. It never asks more than `maximum` agents.
+
+    Attributes:
+        confidence (float): Confidence level of the support interval (0-1).
+        initial (int): Starting batch size for query classes without history.
+        step (int): Agents added per round.
+        margin (float): Half-width of the interval at which sampling stops regardless of majority.
+        minimum (int): Smallest starting batch.
+        maximum (int): Largest number of agents per run.
+        history (AgreementHistory): Per query class statistics.
+        classifier (callable): Maps a query to its class, all queries share one class if None.
+    """
+
+    def __init__(self, confidence=0.9, initial=3, step=2, margin=0.15, minimum=1, maximum=100,
+                 history=None, classifier=None):
+        self.confidence = confidence
+        self.initial = initial
+        self.step = step
+        self.margin = margin
+        self.minimum = minimum
+        self.maximum = maximum
+        self.history = history or AgreementHistory()
+        self.classifier = classifier
+
+    def query_class(self, query):
+        return self.classifier(query) if self.classifier else "default"
+
+    def initial_size(self, query):
+        """Starting batch size, the typical size of past runs of the query's class when known."""
+        typical = self.history.typical_agents(self.query_class(query))
+        size = typical if typical is not None else self.initial
+        return max(self.minimum, min(self.maximum, size))
+
+    def done(self, top_count, asked):
+        """
+        Whether the answers so far are conclusive.
+
+        Args:
+            top_count (int): Size of the largest group of agreeing answers.
+            asked (int): Number of agents asked.
+
+        Returns:
+            bool: True when no more agents should be asked.
+        """
+        if asked >= self.maximum:
+            return True
+        low, high = wilson_interval(top_count, asked, self.confidence)
+        return low > 0.5 or (high - low) / 2 <= self.margin
+
+    def record(self, query, asked, top_count):
+        self.history.record(self.query_class(query), asked, top_count / asked if asked else 0.0)
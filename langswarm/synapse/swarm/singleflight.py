@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class _LeaderGone(Exception):
+    """Set on a call's future when its leader was cancelled or interrupted."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into one execution.
+
+    The first caller of a key (the leader) runs the call; callers arriving
+    while it is in flight (followers) wait for the leader's outcome instead
+    of running it again: they get the same result object, or the leader's
+    exception is raised in each of them. Nothing is kept once the call has
+    finished, later callers run it again. Only errors (`Exception`) are
+    shared: if the leader is cancelled or interrupted, one of the followers
+    runs the call instead.
+
+    Threads and asyncio tasks can share one instance, and a key can be led
+    by a thread and followed by a task or the other way around.
+
+    Attributes:
+        leaders (int): Calls executed.
+        followers (int): Calls served by another caller's execution.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        """Return (future, is_leader) for a key."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _abandon(self, key, future):
+        """Drop a call whose leader was cancelled, its followers join the key again."""
+        with self._lock:
+            del self._calls[key]
+        future.set_exception(_LeaderGone())
+
+    def _rejoin(self, key):
+        """Join a key again after its leader was cancelled, counting the caller as a follower once."""
+        with self._lock:
+            self.followers -= 1
+        return self._join(key)
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run `func(*args, **kwargs)` unless a call with the same key is in flight.
+
+        :param key: Hashable key identifying equivalent calls.
+        :return: tuple - (result, whether this caller ran the call).
+        """
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                return future.result(), False
+            except _LeaderGone:
+                future, leader = self._rejoin(key)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result)
+        return result, True
+
+    async def ado(self, key, func, *args, **kwargs):
+        """
+        Await `func(*args, **kwargs)` unless a call with the same key is in flight.
+
+        :param key: Hashable key identifying equivalent calls.
+        :param func: A coroutine function.
+        :return: tuple - (result, whether this caller ran the call).
+        """
+        future, leader = self._join(key)
+        while not leader:
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future)), False
+            except _LeaderGone:
+                future, leader = self._rejoin(key)
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        except BaseException:
+            self._abandon(key, future)
+            raise
+        self._finish(key, future, result)
+        return result, True
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+_default_single_flight = SingleFlight()
+
+
+def default_single_flight():
+    """The process-wide instance used by swarms created with `single_flight=True`."""
+    return _default_single_flight
@@ -1,13 +1,33 @@
+import json
+import asyncio
+import hashlib
+import inspect
+import logging
+import contextvars
+import weakref
+import threading
+import functools
 import numpy as np
 from decimal import Decimal
-from sentence_transformers import SentenceTransformer, util
 from transformers import pipeline
 
+from ..embeddings.encoders import load_encoder
+from ..embeddings.storage import cosine_similarity, to_storage
+from .context import RunContext
+from .conversation import ConversationState
+from .pool import default_client_pool
+from .sampling import AdaptiveSampler
+from .singleflight import default_single_flight
+from .tracing import NULL_TRACER
+
+logger = logging.getLogger("langswarm.synapse.swarm")
+
+# Locks serializing calls to a client, shared by every swarm using it.
+_client_locks = weakref.WeakKeyDictionary()
+_client_locks_guard = threading.Lock()
+
 class Swarm:
     """
-    ToDo: Clean up the verbose outputs (prints)
-    ToDo: Log instead of print? Or both?
-
     A multi-agent system for output validation and consensus using semantic similarity,
     paraphrase detection, and cosine similarity.
 
@@ -21,8 +41,8 @@ class Swarm:
     - query (str): Input query for the agents.
     - llms (list): List of LLM configurations (provider, model, and API key).
     - clients (list): List of initialized clients.
-    - state (list): Initial state memory for agents.
-    - verbose (bool): Enable detailed logging.
+    - state (list or ConversationState): Initial state memory for agents, shared between them copy-on-write.
+    - verbose (bool): Log progress at INFO instead of DEBUG level on the 'langswarm.synapse.swarm' logger.
     - sensitivity (int): Sensitivity factor for determining the number of agents.
     - minimum_bots (int): Minimum number of agents to instantiate.
     - maximum_bots (int): Maximum number of agents to instantiate.
@@ -30,12 +50,29 @@ class Swarm:
     - threshold (float): Similarity threshold for validation.
     - requirements (list): List of predefined requirements for output validation.
     - paraphrase_threshold (float): Similarity threshold for paraphrase detection.
-    - model (str): Name of the SentenceTransformer model.
+    - model (str or object): Name of the SentenceTransformer model, or an encoder object with an `encode` method.
+    - encoder_backend (str): Backend loading a named model, "torch" (SentenceTransformer) or "onnx" (ONNX Runtime).
+    - quantize (bool): Load a named model with int8 dynamically quantized weights.
+    - encoder_threads (int): Intra-op threads of the encoder.
+    - embedding_dtype (str): Storage dtype of the embeddings, "float32", "float16" or "int8".
+    - adaptive (bool): Ask agents in rounds until their answers agree conclusively, instead of asking all of them.
+    - sampler (AdaptiveSampler): The adaptive sampling policy, implies `adaptive`. Defaults to one built
+      from `confidence`, `minimum_bots` and `maximum_bots`.
+    - client_pool (ClientPool): Pool leasing the clients created from `llms`, defaults to the process-wide pool.
+    - single_flight (SingleFlight or bool): Coalesce identical in-flight runs, and calls to clients declaring
+      `deterministic = True`. True uses the process-wide instance, disabled if None.
     - instructions (str): Instructions for the agents.
+    - tracer (Tracer): Records spans per stage and per agent call, tracing is disabled if None.
 
     Attributes:
     - bots (int): Calculated number of agents based on sensitivity and confidence.
-    - paragraphs (list): Outputs generated by agents.
+    - last_context (RunContext): State of the most recent run.
+    - paragraphs (list): Outputs generated by agents in the most recent run.
+
+    Each run keeps its query, paragraphs, embeddings and results in a
+    `RunContext`, so one instance can serve concurrent runs. The `arun`
+    methods of the workflows query the clients concurrently and run the
+    embedding work on the default executor, without blocking the event loop.
     """
 
     def __init__(
@@ -53,14 +90,24 @@ class Swarm:
         requirements=None,
         paraphrase_threshold=0.8,
         model='all-MiniLM-L6-v2',
-        instructions='You are a helpful assistant.'
+        instructions='You are a helpful assistant.',
+        tracer=None,
+        encoder_backend='torch',
+        quantize=False,
+        encoder_threads=None,
+        embedding_dtype='float32',
+        adaptive=False,
+        sampler=None,
+        client_pool=None,
+        single_flight=None
     ):
         self.llms = llms or []
         self.query = query
-        self.state = state
-        self.paragraphs = []
+        self.state = ConversationState.of(state) if state is not None else None
+        self.last_context = None
         self.clients = clients or []
         self.verbose = verbose
+        self.tracer = tracer or NULL_TRACER
         self.threshold = threshold
         self.confidence = confidence
         self.sensitivity = sensitivity
@@ -68,7 +115,16 @@ class Swarm:
         self.maximum_bots = maximum_bots
         self.instructions = instructions
         self.requirements = requirements or []
-        self.model = SentenceTransformer(model)
+        self.model = (
+            load_encoder(model, backend=encoder_backend, quantize=quantize, threads=encoder_threads)
+            if isinstance(model, str) else model
+        )
+        self.embedding_dtype = embedding_dtype
+        if sampler is None and adaptive:
+            sampler = AdaptiveSampler(confidence=confidence, minimum=minimum_bots, maximum=maximum_bots)
+        self.sampler = sampler
+        self.client_pool = client_pool
+        self.single_flight = default_single_flight() if single_flight is True else single_flight or None
         self.paraphrase_threshold = paraphrase_threshold
         self.bots = int(
             min(
@@ -80,8 +136,33 @@ class Swarm:
             )
         )
 
-        if self.verbose and not self.clients:
-            print("\nBots:", self.bots)
+        if not self.clients:
+            self._log("Bots: %s", self.bots)
+
+    def _log(self, msg, *args, level=None):
+        """Log a progress event, at INFO level for verbose swarms and DEBUG otherwise."""
+        if level is None:
+            level = logging.INFO if self.verbose else logging.DEBUG
+        logger.log(level, msg, *args)
+
+    @property
+    def paragraphs(self):
+        """Outputs generated by agents in the most recent run."""
+        return self.last_context.paragraphs if self.last_context is not None else []
+
+    def new_context(self, query=None):
+        """
+        Create the context of a new run and make it the most recent one.
+
+        Args:
+            query (str, optional): The query of the run, defaults to `self.query`.
+
+        Returns:
+            RunContext: The new context.
+        """
+        context = RunContext(self.query if query is None else query)
+        self.last_context = context
+        return context
 
     def check_initialization(self):
         """
@@ -105,108 +186,466 @@ class Swarm:
         #)
         return True
 
-    def _create_paragraphs(self, llm, erase_query=False):
+    def _client_lock(self, llm):
+        """
+        Return the lock serializing calls to one client.
+
+        A client keeps conversation memory, so overlapping runs, of this or of
+        any other swarm sharing the client, must not interleave `set_memory`
+        and `chat` on it.
+        """
+        with _client_locks_guard:
+            lock = _client_locks.get(llm)
+            if lock is None:
+                lock = _client_locks[llm] = threading.Lock()
+            return lock
+
+    def agent_fingerprint(self):
+        """
+        Identify the agent set and the settings shaping its answers.
+
+        Returns:
+            tuple: Hashable fingerprint, part of the single-flight key of a run.
+        """
+        return (
+            tuple(id(client) for client in self.clients),
+            tuple((config.get('provider'), config.get('model')) for config in self.llms),
+            self.instructions,
+            tuple(self.requirements),
+            self.threshold,
+            self.paraphrase_threshold,
+            self.state.fingerprint if self.state is not None else None,
+        )
+
+    def _client_identity(self, llm):
+        """
+        What a deterministic client's answers depend on, besides the prompt and memory.
+
+        A pooled client is identified by its pool key (provider, model, config and
+        system prompt hashes), another client by its class, provider, model and
+        system prompt, so equal clients share calls. Clients exposing none of these
+        are identified by themselves.
+        """
+        key = (self.client_pool or default_client_pool()).key_of(llm)
+        if key is not None:
+            return key
+        provider, model = getattr(llm, "provider", None), getattr(llm, "model", None)
+        if isinstance(provider, str) and isinstance(model, str):
+            system_prompt = getattr(llm, "system_prompt", None)
+            prompt_hash = hashlib.sha256(str(system_prompt or "").encode("utf-8")).hexdigest()[:16]
+            return (type(llm).__qualname__, provider, model, prompt_hash)
+        return ("client", id(llm))
+
+    def _call_key(self, llm, query, erase_query):
+        """
+        Single-flight key of an agent call, None if the call must not be coalesced.
+
+        Only calls to clients declaring `deterministic = True` that leave the
+        client's memory unchanged (`erase_query`) are coalesced, keyed by the
+        client's identity (see `_client_identity`), the prompt and the memory
+        the client answers from.
+        """
+        if self.single_flight is None or not erase_query or getattr(llm, "deterministic", False) is not True:
+            return None
+        if self.state is not None:
+            memory_hash = self.state.fingerprint
+        else:
+            memory = getattr(llm, "in_memory", None)
+            memory_hash = hashlib.sha256(json.dumps(memory, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return ("agent_call", self._client_identity(llm), query, memory_hash)
+
+    def _chat(self, llm, query, erase_query=False):
+        """
+        Ask one LLM client, holding its lock.
+
+        Concurrent identical calls to a deterministic client are coalesced
+        when the swarm has single-flight enabled.
+
+        Args:
+            llm: Initialized LLM client.
+            query (str): The query to send.
+            erase_query (bool): Whether to remove the query from memory after execution.
+
+        Returns:
+            str: The response of the client.
+        """
+        key = self._call_key(llm, query, erase_query)
+        if key is None:
+            return self._call_client(llm, query, erase_query)
+        response, leader = self.single_flight.do(key, self._call_client, llm, query, erase_query)
+        if not leader:
+            self.tracer.count("coalesced_calls")
+        return response
+
+    def _call_client(self, llm, query, erase_query):
+        with self.tracer.span("agent_call", provider=getattr(llm, "provider", None), model=getattr(llm, "model", None)):
+            with self._client_lock(llm):
+                if self.state is not None:
+                    llm.set_memory(self.state.view())
+                response = llm.chat(q=query, erase_query=erase_query)
+            self._count_call(query, response)
+            return response
+
+    def _coalesced_run(self, query, run):
+        """
+        Run the workflow, or wait for an identical run already in flight.
+
+        Args:
+            query (str): The query of the run, `self.query` if None.
+            run (callable): Runs the workflow.
+
+        Returns:
+            The result of the run.
+        """
+        key = ("run", type(self).__name__, self.query if query is None else query, self.agent_fingerprint())
+        result, leader = self.single_flight.do(key, run)
+        if not leader:
+            self.tracer.count("coalesced_runs")
+        return result
+
+    async def _acoalesced_run(self, query, run):
+        """Await the workflow, or an identical run already in flight. `run` returns a coroutine."""
+        key = ("run", type(self).__name__, self.query if query is None else query, self.agent_fingerprint())
+        result, leader = await self.single_flight.ado(key, run)
+        if not leader:
+            self.tracer.count("coalesced_runs")
+        return result
+
+    def _count_call(self, query, response):
+        """Count an agent call, and its tokens if the tracer has a token counter."""
+        if not self.tracer.enabled:
+            return
+        self.tracer.count("agent_calls")
+        if self.tracer.token_counter is not None:
+            self.tracer.count("prompt_tokens", self.tracer.token_counter(query))
+            self.tracer.count("completion_tokens", self.tracer.token_counter(str(response)))
+
+    def _create_paragraphs(self, llm, context, erase_query=False):
         """
         Generate output paragraphs from an LLM client.
 
         Args:
             llm: Initialized LLM client.
+            context (RunContext): The run to add the paragraph to.
             erase_query (bool): Whether to remove the query from memory after execution.
         """
-        if self.state is not None:
-            llm.set_memory(self.state)
-        self.paragraphs.append(llm.chat(q=self.query, erase_query=erase_query))
+        context.paragraphs.append(self._chat(llm, context.query, erase_query=erase_query))
+
+    @staticmethod
+    async def _in_executor(func, *args, **kwargs):
+        """Run blocking work (client calls, embeddings) on the default executor, in the current context."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, functools.partial(context.run, func, *args, **kwargs))
+
+    async def _achat(self, llm, query, erase_query=False):
+        """
+        Ask one LLM client without blocking the event loop.
+
+        Clients with a native coroutine `achat` are awaited on the loop, other
+        clients are called on the default executor.
+
+        Args:
+            llm: Initialized LLM client.
+            query (str): The query to send.
+            erase_query (bool): Whether to remove the query from memory after execution.
 
-    def _create_client(self, llm_config):
+        Returns:
+            str: The response of the client.
+        """
+        if not inspect.iscoroutinefunction(getattr(llm, "achat", None)):
+            return await self._in_executor(self._chat, llm, query, erase_query=erase_query)
+
+        key = self._call_key(llm, query, erase_query)
+        if key is None:
+            return await self._acall_client(llm, query, erase_query)
+        response, leader = await self.single_flight.ado(key, self._acall_client, llm, query, erase_query)
+        if not leader:
+            self.tracer.count("coalesced_calls")
+        return response
+
+    async def _acall_client(self, llm, query, erase_query):
+        with self.tracer.span("agent_call", provider=getattr(llm, "provider", None), model=getattr(llm, "model", None)):
+            lock = self._client_lock(llm)
+            acquire = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                acquire.add_done_callback(lambda _: lock.release())
+                raise
+            try:
+                if self.state is not None:
+                    llm.set_memory(self.state.view())
+                response = await llm.achat(q=query, erase_query=erase_query)
+            finally:
+                lock.release()
+            self._count_call(query, response)
+            return response
+
+    async def agenerate_paragraphs(self, context):
+        """
+        Generate response paragraphs from all LLM clients concurrently.
+
+        Args:
+            context (RunContext): The run to add the paragraphs to, in client order.
+
+        Returns:
+            int: Number of clients that generated paragraphs.
+        """
+        with self.tracer.span("generate", clients=len(self.clients)):
+            paragraphs = await asyncio.gather(*(self._achat(client, context.query, erase_query=True) for client in self.clients))
+        context.paragraphs.extend(paragraphs)
+        return len(paragraphs)
+
+    def _top_group_size(self, paragraphs, embeddings):
+        """
+        Size of the largest group of paraphrased answers.
+
+        Args:
+            paragraphs (list): The answers so far.
+            embeddings (list): Embeddings of the first answers, extended with the new ones.
+
+        Returns:
+            int: Number of answers in the largest group.
+        """
+        if len(paragraphs) > len(embeddings):
+            embeddings.extend(self.encode(paragraphs[len(embeddings):]))
+        groups = self.detect_paraphrases(paragraphs, embeddings, self.paraphrase_threshold)
+        return max((len(group) for group in groups), default=0)
+
+    def _sampling_round(self, context, asked, clients, embeddings):
+        """Record a finished round, returns the size of the next round or 0 to stop."""
+        top_count = self._top_group_size(context.paragraphs, embeddings)
+        self.tracer.count("adaptive_rounds")
+        self._log("Adaptive sampling: %s of %s agents agree.", top_count, asked)
+        if asked < len(clients) and not self.sampler.done(top_count, asked):
+            return self.sampler.step
+        self.sampler.record(context.query, asked, top_count)
+        context.results.update(agents_asked=asked, top_group_size=top_count)
+        self.tracer.count("agents_skipped", len(clients) - asked)
+        return 0
+
+    def generate_adaptively(self, context):
+        """
+        Ask the clients in rounds until their answers agree conclusively.
+
+        The first round asks `sampler.initial_size(query)` clients, each
+        following round `sampler.step` more, in client order.
+
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
+        Returns:
+            int: Number of clients that generated paragraphs.
+        """
+        clients = self.clients[:self.sampler.maximum]
+        embeddings = []
+        asked = 0
+        size = self.sampler.initial_size(context.query)
+        with self.tracer.span("generate", clients=len(clients), adaptive=True) as span:
+            while size:
+                for client in clients[asked:asked + size]:
+                    self._create_paragraphs(client, context, erase_query=True)
+                asked = len(context.paragraphs)
+                size = self._sampling_round(context, asked, clients, embeddings)
+            span.set_attribute("asked", asked)
+        context.embeddings = embeddings
+        return asked
+
+    async def agenerate_adaptively(self, context):
+        """
+        Ask the clients in concurrent rounds until their answers agree conclusively.
+
+        Args:
+            context (RunContext): The run to add the paragraphs to, in client order.
+
+        Returns:
+            int: Number of clients that generated paragraphs.
+        """
+        clients = self.clients[:self.sampler.maximum]
+        embeddings = []
+        asked = 0
+        size = self.sampler.initial_size(context.query)
+        with self.tracer.span("generate", clients=len(clients), adaptive=True) as span:
+            while size:
+                batch = clients[asked:asked + size]
+                context.paragraphs.extend(
+                    await asyncio.gather(*(self._achat(client, context.query, erase_query=True) for client in batch))
+                )
+                asked = len(context.paragraphs)
+                size = await self._in_executor(self._sampling_round, context, asked, clients, embeddings)
+            span.set_attribute("asked", asked)
+        context.embeddings = embeddings
+        return asked
+
+    def _create_client(self, llm_config, context):
         """
         Initialize an LLM client and generate output.
 
         Args:
             llm_config (dict): Configuration for the LLM client.
+            context (RunContext): The run to add the output to.
         """
-        if len(self.clients) >= self.bots:
+        if len(context.clients) >= self.bots:
             return
+        self._lease_and_ask(llm_config, context)
 
-        _llm = LLM(
-            provider=llm_config['provider'],
-            model=llm_config['model'],
-            api_key=llm_config['key'],
-            system_prompt=f"""{self.instructions} {self.requirements}"""
-        )
-        self._create_paragraphs(_llm)
+    def _lease_and_ask(self, llm_config, context):
+        """Lease a client for a config, add its output to the run and keep it in the run's `clients`."""
+        pool = self.client_pool or default_client_pool()
+        with self.tracer.span("client_lease", provider=llm_config['provider'], model=llm_config['model']):
+            _llm = pool.acquire(llm_config, system_prompt=f"""{self.instructions} {self.requirements}""")
+        context.leases.append((pool, _llm))
+        self._create_paragraphs(_llm, context)
+
+        self._log("Paragraph created.")
 
-        if self.verbose:
-            print("\nParagraph created.")
+        context.clients.append(_llm)
 
-        self.clients.append(_llm)
+        self._log("Client appended.")
+
+    def release_clients(self, context):
+        """
+        Give the clients leased for a run back to their pool.
 
-        if self.verbose:
-            print("\nClient appended.")
+        Args:
+            context (RunContext): The finished run.
+        """
+        while context.leases:
+            pool, client = context.leases.pop()
+            pool.release(client)
 
-    def create_clients(self):
+    def create_clients(self, context):
         """
         Create LLM clients and distribute tasks among them.
 
+        The clients are leased for the run and kept on its context, `clients`
+        only holds the clients given to the swarm.
+
+        Args:
+            context (RunContext): The run to add the outputs to.
+
         Returns:
             int: Total number of clients created.
         """
-        self.clients = []
+        if self.sampler is not None:
+            return self.create_clients_adaptively(context)
+
         counter = 0
         nbr_of_llms = len(self.llms)
 
         for _ in range(self.bots // nbr_of_llms):
-            [self._create_client(x) for x in self.llms]
+            [self._create_client(x, context) for x in self.llms]
             counter += nbr_of_llms
 
         for _ in range(self.bots % nbr_of_llms):
-            [self._create_client(x) for x in self.llms]
+            [self._create_client(x, context) for x in self.llms]
             counter += 1
 
-            if len(self.clients) >= self.bots:
+            if len(context.clients) >= self.bots:
                 break
 
-        self.clients = self.clients[:self.bots]
         return counter
 
-    def instantiate(self):
+    def create_clients_adaptively(self, context):
+        """
+        Lease clients from `llms` in rounds until their answers agree conclusively.
+
+        Like `generate_adaptively`, but a client is only leased once it is
+        asked, so the clients of a conclusive first round are all that is leased.
+
+        Args:
+            context (RunContext): The run to add the outputs to.
+
+        Returns:
+            int: Total number of clients created.
+        """
+        configs = [self.llms[i % len(self.llms)] for i in range(self.sampler.maximum)]
+        embeddings = []
+        asked = 0
+        size = self.sampler.initial_size(context.query)
+        while size:
+            for llm_config in configs[asked:asked + size]:
+                self._lease_and_ask(llm_config, context)
+            asked = len(context.paragraphs)
+            size = self._sampling_round(context, asked, configs, embeddings)
+        context.embeddings = embeddings
+        return asked
+
+    def instantiate(self, context):
         """
         Ensure all prerequisites are met and initialize clients.
 
+        Args:
+            context (RunContext): The run to add the outputs to.
+
         Returns:
             bool: True if initialization is successful.
         """
         if self.check_initialization():
-            if self.verbose:
-                print("\nInitialization successful.")
+            self._log("Initialization successful.")
 
-            created_clients = self.create_clients()
+            with self.tracer.span("generate", clients=self.bots):
+                created_clients = self.create_clients(context)
 
-            if self.verbose:
-                print("\nClients created:", created_clients)
+            self._log("Clients created: %s", created_clients)
 
             return True
 
         return False
 
-    def calculate_global_similarity(self, paragraphs, requirement_sentences):
+    def encode(self, sentences):
+        """
+        Embed sentences with the swarm's encoder, in the storage dtype.
+
+        Args:
+            sentences (str or list): A sentence or a list of sentences.
+
+        Returns:
+            np.ndarray: One embedding for a string, a matrix for a list.
+        """
+        return to_storage(self.model.encode(sentences), self.embedding_dtype)
+
+    def paragraph_embeddings(self, context):
+        """
+        Embeddings of the paragraphs of a run, kept on the context.
+
+        Embeddings computed while sampling adaptively are reused, only
+        paragraphs without one are encoded.
+
+        Args:
+            context (RunContext): The run.
+
+        Returns:
+            np.ndarray: One embedding per paragraph.
+        """
+        known = list(context.embeddings) if context.embeddings is not None else []
+        known = known[:len(context.paragraphs)]
+        if len(known) < len(context.paragraphs):
+            known.extend(self.encode(context.paragraphs[len(known):]))
+        context.embeddings = np.asarray(known)
+        return context.embeddings
+
+    def calculate_global_similarity(self, paragraphs, requirement_sentences, paragraph_embeddings=None,
+                                    requirement_embeddings=None):
         """
         Compute the global average similarity between outputs and requirements.
 
         Args:
             paragraphs (list): Generated outputs.
             requirement_sentences (list): Requirement sentences.
+            paragraph_embeddings (np.ndarray, optional): Embeddings of the outputs, encoded if not given.
+            requirement_embeddings (np.ndarray, optional): Embeddings of the requirements, encoded if not given.
 
         Returns:
             float: Global average similarity score.
         """
-        requirement_embeddings = self.model.encode(requirement_sentences)
-        paragraph_embeddings = self.model.encode(paragraphs)
+        if requirement_embeddings is None:
+            requirement_embeddings = self.encode(requirement_sentences)
+        if paragraph_embeddings is None:
+            paragraph_embeddings = self.encode(paragraphs)
 
-        all_similarities = []
-
-        for paragraph_embedding in paragraph_embeddings:
-            similarities = util.cos_sim(paragraph_embedding, requirement_embeddings)
-            all_similarities.extend(similarities[0].tolist())
+        all_similarities = cosine_similarity(paragraph_embeddings, requirement_embeddings)
 
         return np.mean(all_similarities)
 
@@ -240,12 +679,10 @@ class Swarm:
         adjusted_threshold = max(0.0, min(1.0, adjusted_threshold))
     
         # Log for debugging
-        if self.verbose:
-            print(f"Dynamic Threshold Adjustment:")
-            print(f"  Original Threshold: {threshold}")
-            print(f"  Global Avg Similarity: {global_average_similarity}")
-            print(f"  Adjustment Factor: {adjustment_factor}")
-            print(f"  Adjusted Threshold: {adjusted_threshold}")
+        self._log(
+            "Dynamic Threshold Adjustment: original threshold %s, global avg similarity %s, adjustment factor %s, adjusted threshold %s",
+            threshold, global_average_similarity, adjustment_factor, adjusted_threshold
+        )
     
         return adjusted_threshold
 
@@ -266,13 +703,11 @@ class Swarm:
         negative_requirements = []
 
         for req in requirements:
-            if self.verbose:
-                print("\nClassify requirement:", req)
+            self._log("Classify requirement: %s", req)
 
             result = classifier(req)[0]
 
-            if self.verbose:
-                print("\nResult:", result)
+            self._log("Result: %s", result)
 
             label = result['label'].lower()
 
@@ -297,15 +732,15 @@ class Swarm:
         """
         paraphrase_groups = []
         used_paragraphs = set()
+        similarities = cosine_similarity(compliant_embeddings, compliant_embeddings) if len(compliant_embeddings) else None
 
-        for i, paragraph_embedding in enumerate(compliant_embeddings):
+        for i in range(len(compliant_embeddings)):
             if i not in used_paragraphs:
                 group = [compliant_paragraphs[i]]
                 used_paragraphs.add(i)
 
                 for j in range(i + 1, len(compliant_embeddings)):
-                    similarity = util.cos_sim(paragraph_embedding, compliant_embeddings[j])
-                    if similarity >= paraphrase_threshold:
+                    if similarities[i, j] >= paraphrase_threshold:
                         group.append(compliant_paragraphs[j])
                         used_paragraphs.add(j)
 
@@ -335,6 +770,9 @@ class Swarm:
         best_paragraph = None
         highest_similarity = -1
         group_size_of_best = 0
+        known = {}
+        if compliant_embeddings is not None:
+            known = dict(zip(compliant_paragraphs, compliant_embeddings))
     
         try:
             # Step 1: Handle special case where there are exactly two paraphrase groups
@@ -345,14 +783,14 @@ class Swarm:
             # Step 2: Iterate over each paraphrase group to calculate average similarity
             for group in paraphrase_groups:
                 if len(group) > 1:  # Only consider groups with more than one paragraph
-                    # Encode all paragraphs in the group into embeddings
-                    paragraph_embeddings = self.model.encode(group)
+                    # Reuse the embeddings of the paragraphs, encoding only unknown ones
+                    if all(paragraph in known for paragraph in group):
+                        paragraph_embeddings = np.asarray([known[paragraph] for paragraph in group])
+                    else:
+                        paragraph_embeddings = self.encode(group)
     
                     # Compute the average cosine similarity for each paragraph within the group
-                    avg_similarities = [
-                        util.cos_sim(paragraph_embeddings[i], paragraph_embeddings).mean().item()
-                        for i in range(len(group))
-                    ]
+                    avg_similarities = cosine_similarity(paragraph_embeddings, paragraph_embeddings).mean(axis=1).tolist()
     
                     # Find the paragraph with the highest average similarity within the group
                     best_index = avg_similarities.index(max(avg_similarities))
@@ -368,8 +806,7 @@ class Swarm:
     
         except Exception as e:
             # Log the error for debugging purposes
-            if self.verbose:
-                print(f"Error during get_consensus: {e}")
+            self._log("Error during get_consensus: %s", e, level=logging.WARNING)
             # Fallback in case of an error
             best_paragraph = "No consensus could be determined."
             highest_similarity = 0
@@ -380,46 +817,58 @@ class Swarm:
         
         return best_paragraph, highest_similarity, group_size_of_best
 
-    def run(self):
+    def run(self, query=None, context=None):
         """
         Execute the Swarm workflow and determine consensus output.
 
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
+
         Returns:
             str: Consensus paragraph.
         """
         consensus_paragraph = 'No consensus found.'
+        context = context or self.new_context(query)
 
-        if self.instantiate():
-            if self.verbose:
-                print("Class instantiated.")
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            try:
+                if self.instantiate(context):
+                    self._log("Class instantiated.")
 
-            requirement_sentences = self.requirements
+                    requirement_sentences = self.requirements
 
-            global_average_similarity = self.calculate_global_similarity(self.paragraphs, requirement_sentences)
+                    with self.tracer.span("embedding", paragraphs=len(context.paragraphs)):
+                        paragraph_embeddings = self.paragraph_embeddings(context)
+                    with self.tracer.span("global_similarity"):
+                        global_average_similarity = self.calculate_global_similarity(
+                            context.paragraphs, requirement_sentences, paragraph_embeddings)
+                    context.results["global_average_similarity"] = global_average_similarity
 
-            if self.verbose:
-                print("Global Average Similarity:", global_average_similarity)
+                    self._log("Global Average Similarity: %s", global_average_similarity)
 
-            dynamic_threshold = self.dynamic_threshold(global_average_similarity, self.threshold)
+                    with self.tracer.span("threshold"):
+                        dynamic_threshold = self.dynamic_threshold(global_average_similarity, self.threshold)
 
-            if self.verbose:
-                print("Dynamic Threshold:", dynamic_threshold)
+                    self._log("Dynamic Threshold: %s", dynamic_threshold)
 
-            positive_requirements, negative_requirements = self.classify_requirements(requirement_sentences)
+                    with self.tracer.span("classify_requirements"):
+                        positive_requirements, negative_requirements = self.classify_requirements(requirement_sentences)
 
-            if self.verbose:
-                print("Positive Requirements:", positive_requirements)
-                print("Negative Requirements:", negative_requirements)
-
-            paraphrase_groups = self.detect_paraphrases(
-                self.paragraphs,
-                [self.model.encode(paragraph) for paragraph in self.paragraphs],
-                self.paraphrase_threshold
-            )
+                    self._log("Positive Requirements: %s", positive_requirements)
+                    self._log("Negative Requirements: %s", negative_requirements)
 
-            if self.verbose:
-                print("\nParaphrase Groups:", paraphrase_groups)
+                    with self.tracer.span("paraphrase_grouping"):
+                        paraphrase_groups = self.detect_paraphrases(
+                            context.paragraphs,
+                            context.embeddings,
+                            self.paraphrase_threshold
+                        )
+                    context.results["paraphrase_groups"] = paraphrase_groups
 
-            return consensus_paragraph
+                    self._log("Paraphrase Groups: %s", paraphrase_groups)
+            finally:
+                self.release_clients(context)
 
+        context.result = consensus_paragraph
         return consensus_paragraph
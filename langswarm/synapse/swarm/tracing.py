@@ -0,0 +1,296 @@
+import json
+import time
+import threading
+import contextvars
+from itertools import count
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional, only needed by OpenTelemetrySink.
+    otel_trace = None
+
+
+_current_span = contextvars.ContextVar("langswarm_current_span", default=None)
+_span_ids = count(1)
+
+
+class RunReport:
+    """
+    Stage breakdown and counters of one run.
+
+    Attributes:
+        stages (dict): Stage name -> total seconds spent in spans of that name.
+        calls (dict): Stage name -> number of spans of that name.
+        counters (dict): Counter name -> value (e.g. agent_calls, prompt_tokens, cache_hits).
+        spans (list): The finished spans, in completion order.
+    """
+
+    __slots__ = ("stages", "calls", "counters", "spans", "_lock")
+
+    def __init__(self):
+        self.stages = {}
+        self.calls = {}
+        self.counters = {}
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span):
+        with self._lock:
+            self.stages[span.name] = self.stages.get(span.name, 0.0) + span.duration
+            self.calls[span.name] = self.calls.get(span.name, 0) + 1
+            self.spans.append(span)
+
+    def add_count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def total(self):
+        """Seconds spent in the outermost 'run' span, 0.0 if the run was not traced."""
+        return self.stages.get("run", 0.0)
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "stages": dict(self.stages),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+        }
+
+    def __repr__(self):
+        stages = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in self.stages.items())
+        return f"RunReport({stages})"
+
+
+class Span:
+    """
+    A timed stage of a run, used as a context manager.
+
+    Spans nest through a context variable, so spans opened in tasks created
+    by `asyncio.gather` or in functions run with a copied context get the
+    enclosing span as their parent.
+    """
+
+    __slots__ = ("name", "attributes", "parent", "report", "span_id", "start_time", "start", "end", "error",
+                 "_tracer", "_token")
+
+    def __init__(self, tracer, name, report, attributes):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.report = report
+        self.span_id = next(_span_ids)
+        self.start_time = None
+        self.start = None
+        self.end = None
+        self.error = None
+        self._token = None
+
+    @property
+    def duration(self):
+        if self.start is None:
+            return 0.0
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        if self.report is None and self.parent is not None:
+            self.report = self.parent.report
+        self._token = _current_span.set(self)
+        self.start_time = time.time()
+        self.start = time.perf_counter()
+        self._tracer._started(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.error = repr(exc)
+        _current_span.reset(self._token)
+        if self.report is not None:
+            self.report.add_span(self)
+        self._tracer._ended(self)
+        return False
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NullSpan:
+    """A span that records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """
+    The default tracer, records nothing.
+
+    `span` returns a shared no-op context manager, so instrumented code costs
+    a method call per stage when tracing is disabled.
+    """
+
+    enabled = False
+    token_counter = None
+
+    def span(self, name, report=None, **attributes):
+        return NULL_SPAN
+
+    def count(self, name, value=1, report=None):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class Tracer:
+    """
+    Records spans per stage and per agent call, and counters.
+
+    Finished spans are added to the `RunReport` of their run and passed to
+    the sinks (e.g. `JsonLinesSink`, `OpenTelemetrySink`).
+
+    Attributes:
+        sinks (list): Objects with `on_start(span)` and `on_end(span)` methods.
+        token_counter (callable): Counts the tokens of prompts and responses, tokens are not counted if None.
+        counters (dict): Counter totals across all runs.
+    """
+
+    enabled = True
+
+    def __init__(self, sinks=None, token_counter=None):
+        self.sinks = list(sinks or [])
+        self.token_counter = token_counter
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def span(self, name, report=None, **attributes):
+        """
+        Open a span, to be used as a context manager.
+
+        :param name: str - The stage name, e.g. 'embedding'.
+        :param report: RunReport - The report of the run, inherited from the parent span if None.
+        :return: Span - The span.
+        """
+        return Span(self, name, report, attributes)
+
+    def count(self, name, value=1, report=None):
+        """
+        Increment a counter, in the run report of the current span and in the totals.
+
+        :param name: str - The counter name, e.g. 'agent_calls', 'prompt_tokens', 'cache_hits'.
+        :param value: int - The increment.
+        :param report: RunReport - The report of the run, defaults to the one of the current span.
+        """
+        if report is None:
+            span = _current_span.get()
+            report = span.report if span is not None else None
+        if report is not None:
+            report.add_count(name, value)
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def _started(self, span):
+        for sink in self.sinks:
+            sink.on_start(span)
+
+    def _ended(self, span):
+        for sink in self.sinks:
+            sink.on_end(span)
+
+
+class JsonLinesSink:
+    """
+    Writes finished spans as JSON lines.
+
+    Attributes:
+        path (str): The file the spans are appended to, None when writing to a stream.
+    """
+
+    def __init__(self, path=None, stream=None):
+        if (path is None) == (stream is None):
+            raise ValueError("Provide either a path or a stream.")
+        self.path = path
+        self._stream = stream if stream is not None else open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def close(self):
+        if self.path is not None:
+            self._stream.close()
+
+
+class OpenTelemetrySink:
+    """
+    Mirrors spans to OpenTelemetry, requires the `opentelemetry-api` package.
+
+    Attributes:
+        tracer: The OpenTelemetry tracer, defaults to the global provider's tracer.
+    """
+
+    def __init__(self, tracer=None):
+        if otel_trace is None:
+            raise ImportError("OpenTelemetrySink requires the 'opentelemetry-api' package.")
+        self.tracer = tracer or otel_trace.get_tracer("langswarm.synapse")
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _attribute(value):
+        return value if isinstance(value, (str, bool, int, float)) else str(value)
+
+    def on_start(self, span):
+        with self._lock:
+            parent = self._spans.get(span.parent.span_id) if span.parent is not None else None
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.tracer.start_span(
+            span.name,
+            context=context,
+            attributes={k: self._attribute(v) for k, v in span.attributes.items()},
+            start_time=int(span.start_time * 1e9),
+        )
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span):
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, self._attribute(value))
+        if span.error is not None:
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, span.error))
+        otel_span.end()
@@ -26,32 +26,41 @@ class LLMVoting(Swarm):
         if not self.query:
             raise ValueError('Requires query to be set as a string at init.')
 
-    def generate_paragraphs(self):
+    def generate_paragraphs(self, context):
         """
-        Generate response paragraphs for the given query from all LLM clients.
+        Generate response paragraphs for the given query from all LLM clients,
+        or from as many as needed for a conclusive agreement when the swarm has a sampler.
+
+        Args:
+            context (RunContext): The run to add the paragraphs to.
 
         Returns:
             int: Number of clients that generated paragraphs.
         """
-        for client in self.clients:
-            self._create_paragraphs(client, erase_query=True)
+        if self.sampler is not None:
+            return self.generate_adaptively(context)
+
+        with self.tracer.span("generate", clients=len(self.clients)):
+            for client in self.clients:
+                self._create_paragraphs(client, context, erase_query=True)
         return len(self.clients)
 
-    def instantiate(self):
+    def instantiate(self, context):
         """
         Validate initialization and generate paragraphs.
 
+        Args:
+            context (RunContext): The run to add the paragraphs to.
+
         Returns:
             bool: True if successful, False otherwise.
         """
         if self.check_initialization():
-            if self.verbose:
-                print("\nInitialization successful.")
+            self._log("Initialization successful.")
 
-            created_clients = self.generate_paragraphs()
+            created_clients = self.generate_paragraphs(context)
 
-            if self.verbose:
-                print("\nClients created:", created_clients)
+            self._log("Clients created: %s", created_clients)
 
             return True
 
@@ -67,53 +76,122 @@ class LLMVoting(Swarm):
         Returns:
             tuple: Original paragraphs and their embeddings.
         """
-        paragraph_embeddings = self.model.encode(paragraphs)
+        paragraph_embeddings = self.encode(paragraphs)
         return paragraphs, paragraph_embeddings
 
-    def run(self):
+    def evaluate(self, context):
         """
-        Execute the voting workflow among LLM clients.
+        Determine the winning paragraph by grouping paraphrases.
+
+        The embeddings and intermediate results are stored on the context.
+
+        Args:
+            context (RunContext): The run, with the paragraphs generated by the LLM clients.
 
         Returns:
             tuple: Consensus paragraph, size of the consensus group, and all generated paragraphs.
         """
-        consensus_paragraph = 'No consensus found.'
+        paragraphs = context.paragraphs
+
+        # Embed the paragraphs, reusing the embeddings computed while sampling
+        with self.tracer.span("embedding", paragraphs=len(paragraphs)):
+            paragraph_embeddings = self.paragraph_embeddings(context)
 
-        if self.instantiate():
-            if self.verbose:
-                print("Class Instantiated.")
+        self._log("Created embeddings.")
 
-            # Calculate global average similarity among responses
-            global_average_similarity = self.calculate_global_similarity(self.paragraphs, self.paragraphs)
+        # Calculate global average similarity among responses
+        with self.tracer.span("global_similarity"):
+            global_average_similarity = self.calculate_global_similarity(
+                paragraphs, paragraphs, paragraph_embeddings, paragraph_embeddings)
 
-            if self.verbose:
-                print("Global Average Similarity:", global_average_similarity)
+        self._log("Global Average Similarity: %s", global_average_similarity)
 
-            # Dynamically adjust thresholds
+        # Dynamically adjust thresholds
+        with self.tracer.span("threshold"):
             dynamic_threshold = self.dynamic_threshold(global_average_similarity, self.threshold, adjustment_factor=0.8)
+        with self.tracer.span("threshold"):
             dynamic_paraphrase_threshold = self.dynamic_threshold(global_average_similarity, self.paraphrase_threshold, adjustment_factor=0.8)
 
-            if self.verbose:
-                print("Dynamic Threshold:", dynamic_threshold)
-                print("Dynamic Paraphrase Threshold:", dynamic_paraphrase_threshold)
-
-            # Generate embeddings for paragraphs
-            paragraphs, paragraph_embeddings = self.create_embeddings(self.paragraphs)
-
-            if self.verbose:
-                print("Created embeddings.")
+        self._log("Dynamic Threshold: %s", dynamic_threshold)
+        self._log("Dynamic Paraphrase Threshold: %s", dynamic_paraphrase_threshold)
 
-            # Detect paraphrase groups based on similarity
+        # Detect paraphrase groups based on similarity
+        with self.tracer.span("paraphrase_grouping"):
             paraphrase_groups = self.detect_paraphrases(paragraphs, paragraph_embeddings, dynamic_paraphrase_threshold)
 
-            # Determine consensus from paraphrase groups
+        # Determine consensus from paraphrase groups
+        with self.tracer.span("consensus", groups=len(paraphrase_groups)):
             consensus_paragraph, highest_similarity, group_size_of_best = self.get_consensus(
                 paraphrase_groups, paragraphs, paragraph_embeddings
             )
+        context.results.update(
+            global_average_similarity=global_average_similarity,
+            dynamic_threshold=dynamic_threshold,
+            dynamic_paraphrase_threshold=dynamic_paraphrase_threshold,
+            paraphrase_groups=paraphrase_groups,
+            highest_similarity=highest_similarity,
+            group_size=group_size_of_best,
+        )
+
+        self._log("Highest Similarity: %s", highest_similarity)
+        self._log("Consensus Paragraph: %s", consensus_paragraph)
+        self._log("Consensus Group Size: %s", group_size_of_best)
+
+        return consensus_paragraph, group_size_of_best, context.paragraphs
+
+    def run(self, query=None, context=None):
+        """
+        Execute the voting workflow among LLM clients.
 
-            if self.verbose:
-                print("\nHighest Similarity:", highest_similarity)
-                print("\nConsensus Paragraph:", consensus_paragraph)
-                print("\nConsensus Group Size:", group_size_of_best)
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
 
-        return consensus_paragraph, group_size_of_best, self.paragraphs
+        Returns:
+            tuple: Consensus paragraph, size of the consensus group, and all generated paragraphs.
+        """
+        if context is None and self.single_flight is not None:
+            return self._coalesced_run(query, lambda: self.run(query, self.new_context(query)))
+
+        context = context or self.new_context(query)
+        result = 'No consensus found.', 0, context.paragraphs
+
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.instantiate(context):
+                self._log("Class Instantiated.")
+
+                result = self.evaluate(context)
+
+        context.result = result
+        return result
+
+    async def arun(self, query=None, context=None):
+        """
+        Execute the voting workflow without blocking the event loop.
+
+        The clients are queried concurrently and the embedding work runs on the
+        default executor.
+
+        Args:
+            query (str, optional): The query to process, defaults to `self.query`.
+            context (RunContext, optional): The context of the run, created if not given.
+
+        Returns:
+            tuple: Consensus paragraph, size of the consensus group, and all generated paragraphs.
+        """
+        if context is None and self.single_flight is not None:
+            return await self._acoalesced_run(query, lambda: self.arun(query, self.new_context(query)))
+
+        context = context or self.new_context(query)
+        result = 'No consensus found.', 0, context.paragraphs
+
+        with self.tracer.span("run", report=context.report, workflow=type(self).__name__):
+            if self.check_initialization():
+                if self.sampler is not None:
+                    await self.agenerate_adaptively(context)
+                else:
+                    await self.agenerate_paragraphs(context)
+                result = await self._in_executor(self.evaluate, context)
+
+        context.result = result
+        return result
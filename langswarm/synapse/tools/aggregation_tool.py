@@ -27,6 +27,7 @@ class LangSwarmAggregationTool(Tool):
         super().__init__(
             name="LangSwarm Aggregation",
             func=self.run,
+            coroutine=self.arun,
             description="A tool to merge and aggregate responses from multiple agents.",
             aggregation=LLMAggregation(clients=agents, **kwargs)
         )
@@ -42,5 +43,17 @@ class LangSwarmAggregationTool(Tool):
         Returns:
         - str: The aggregated result.
         """
-        self.aggregation.query = query
-        return self.aggregation.run(hb)
+        return self.aggregation.run(hb, query=query)
+
+    async def arun(self, query, hb=None):
+        """
+        Asynchronously executes the aggregation workflow without blocking the event loop.
+
+        Parameters:
+        - query (str): The query to process.
+        - hb: Additional aggregation handler, if required.
+
+        Returns:
+        - str: The aggregated result.
+        """
+        return await self.aggregation.arun(hb, query=query)
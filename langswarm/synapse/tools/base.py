@@ -1,9 +1,397 @@
+import copy
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Resource key standing for every resource of a tool.
+ALL_RESOURCES = "*"
+
+
+def action(name=None, reads=None, writes=None):
+    """
+    Register a method as a tool action.
+
+    The action table and parameter specs of a tool are compiled once per class
+    (see `BaseTool.__init_subclass__`), so dispatching a call does not have to
+    inspect the method signature again.
+
+    `reads` and `writes` declare the resources an action touches, so calls
+    that cannot interfere can run concurrently. Each entry is the name of a
+    parameter holding a resource key (e.g. "filename"), "*" for all resources
+    of the tool, or any other string as a literal resource (e.g. "branches").
+    A parameter left to None stands for all resources. An action declaring
+    neither is assumed to change every resource of its tool.
+
+    :param name: str - The action name exposed to agents, defaults to the method name.
+    :param reads: tuple - Resources the action reads.
+    :param writes: tuple - Resources the action changes.
+    """
+    def decorator(func):
+        func._tool_action = name or func.__name__
+        func._tool_resources = (reads, writes)
+        return func
+    return decorator
+
+
+class ActionSpec:
+    """
+    Precomputed parameter descriptor for a single tool action.
+
+    Attributes:
+        name (str): The action name.
+        attr (str): The name of the method implementing the action.
+        function (callable): The unbound method implementing the action.
+        accepted (frozenset): Names of the keyword arguments the method accepts.
+        required (frozenset): Names of the arguments without a default value.
+        var_keyword (bool): True if the method accepts arbitrary keyword arguments.
+        reads (tuple): Declared resources read, None if undeclared.
+        writes (tuple): Declared resources changed, None if undeclared.
+    """
+
+    __slots__ = ("name", "attr", "function", "parameters", "accepted", "required", "var_keyword",
+                 "defaults", "reads", "writes")
+
+    def __init__(self, name, attr, function, reads=None, writes=None):
+        self.name = name
+        self.attr = attr
+        self.function = function
+        self.reads = tuple(reads) if reads is not None else None
+        self.writes = tuple(writes) if writes is not None else None
+
+        # Skip `self`, the remaining parameters are the ones agents provide.
+        parameters = list(inspect.signature(function).parameters.values())[1:]
+        self.parameters = tuple(
+            p.name for p in parameters
+            if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+        )
+        self.accepted = frozenset(self.parameters)
+        self.required = frozenset(
+            p.name for p in parameters
+            if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) and p.default is p.empty
+        )
+        self.var_keyword = any(p.kind == p.VAR_KEYWORD for p in parameters)
+        self.defaults = {p.name: p.default for p in parameters if p.default is not p.empty}
+
+    @property
+    def declared(self):
+        """True if the action declared the resources it reads or changes."""
+        return self.reads is not None or self.writes is not None
+
+    @property
+    def read_only(self):
+        """True if the action declared that it changes nothing."""
+        return self.declared and not self.writes
+
+    def _keys(self, tool, entries, kwargs):
+        keys = set()
+        for entry in entries or ():
+            if entry == ALL_RESOURCES:
+                keys.add(ALL_RESOURCES)
+            elif entry in self.accepted:
+                value = kwargs.get(entry, self.defaults.get(entry))
+                keys.add(ALL_RESOURCES if value is None else tool._resource_key(value))
+            else:
+                keys.add(entry)
+        return frozenset(keys)
+
+    def resources(self, tool, kwargs):
+        """
+        Resource keys a call reads and changes.
+
+        :param tool: BaseTool - The tool the call is made on.
+        :param kwargs: dict - The arguments of the call.
+        :return: tuple - (read keys, written keys), frozensets where "*" stands for all resources.
+        """
+        if not self.declared:
+            return frozenset(), frozenset((ALL_RESOURCES,))
+        return self._keys(tool, self.reads, kwargs), self._keys(tool, self.writes, kwargs)
+
+    def validate(self, kwargs):
+        """
+        Validate the provided keyword arguments against the spec.
+
+        :param kwargs: dict - The arguments provided by the caller.
+        :return: str or None - An error message, or None if the arguments are valid.
+        """
+        if not self.var_keyword and not self.accepted.issuperset(kwargs):
+            invalid = [k for k in kwargs if k not in self.accepted]
+            return f"Error: Unexpected arguments {invalid}. Expected: {list(self.parameters)}"
+
+        if not self.required.issubset(kwargs):
+            missing = [k for k in self.parameters if k in self.required and k not in kwargs]
+            return f"Error: Missing required arguments {missing}. Expected: {list(self.parameters)}"
+
+        return None
+
+
+class ToolResultCache:
+    """
+    A size-bounded LRU cache of the results of read-only tool actions.
+
+    Entries are indexed by the resource keys their call read, so a mutating
+    call drops exactly the entries reading what it changed; a change of "*"
+    (or of an undeclared action) drops them all, and a change of any key
+    drops the entries that read "*" (e.g. listings).
+
+    Changes made outside the tool are caught by `version`, which returns a
+    token of the current state of the resources an entry read (e.g. their
+    mtime and size): an entry is only served while its token is unchanged.
+    Results are copied in and out, so callers never share a mutable result.
+
+    Attributes:
+        maxsize (int): Entries kept.
+        ttl (float): Seconds an entry is valid, forever if None.
+        version (callable): `version(reads)` returns a token of the state of the resources, None to skip the check.
+        hits (int): Calls answered from the cache.
+        misses (int): Cacheable calls that ran.
+        invalidations (int): Entries dropped by mutating calls or found out of date.
+        evictions (int): Entries dropped to stay within `maxsize` or past their ttl.
+    """
+
+    def __init__(self, maxsize=256, ttl=None, clock=time.monotonic, version=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._by_resource = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(action_name, kwargs):
+        try:
+            items = tuple(sorted(kwargs.items()))
+            hash(items)
+            return action_name, items
+        except TypeError:
+            return action_name, json.dumps(kwargs, sort_keys=True, default=str)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        _, _, reads, _ = self._entries.pop(key)
+        for resource in reads:
+            keys = self._by_resource.get(resource)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_resource[resource]
+
+    @staticmethod
+    def _copy(result):
+        if isinstance(result, (str, bytes, int, float, bool, type(None))):
+            return result
+        return copy.deepcopy(result)
+
+    def current_version(self, reads):
+        """Token of the current state of the resources read, see `version`."""
+        return None if self.version is None else self.version(reads)
+
+    def get(self, key):
+        """
+        Look a call up.
+
+        :return: tuple - (found, result, generation), pass the generation to `put` on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[1] > self.ttl:
+                self._drop(key)
+                self.evictions += 1
+                entry = None
+            generation = self._generation
+        if entry is not None and entry[3] is not None and self.current_version(entry[2]) != entry[3]:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._drop(key)
+                    self.invalidations += 1
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return False, None, generation
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+        return True, self._copy(entry[0]), generation
+
+    def put(self, key, result, reads, generation, version=None):
+        """
+        Store a result, unless a mutating call started since the lookup.
+
+        :param version: The `current_version` of the resources taken before the call ran.
+        """
+        result = self._copy(result)
+        with self._lock:
+            if generation != self._generation or self.maxsize <= 0:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, self._clock(), reads, version)
+            for resource in reads:
+                self._by_resource.setdefault(resource, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, writes):
+        """Drop the entries reading resources a mutating call changes."""
+        with self._lock:
+            self._generation += 1
+            if ALL_RESOURCES in writes:
+                keys = list(self._entries)
+            else:
+                keys = {key for resource in writes for key in self._by_resource.get(resource, ())}
+                keys.update(self._by_resource.get(ALL_RESOURCES, ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_resource.clear()
+
+    def to_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+
+
 class BaseTool:
+    # Compiled action table, {action_name: ActionSpec}, populated per subclass.
+    _actions = {}
+    # Results of read-only actions kept per tool instance. Off by default: enable it for tools whose
+    # resources are only changed through the tool, or that check them with `_resource_version`.
+    result_cache_size = 0
+    # Seconds a cached result is valid, for resources also changed outside the tool.
+    result_cache_ttl = None
+
     def __init__(self, name, description, instruction):
         self.name = name
         self.description = description
         self.instruction = instruction
 
+    def __init_subclass__(cls, **kwargs):
+        """Compile the action table of the subclass once, at class creation."""
+        super().__init_subclass__(**kwargs)
+        actions = {}
+        for action_name, spec in cls._actions.items():
+            # Re-compile inherited actions whose method was overridden.
+            function = getattr(cls, spec.attr)
+            actions[action_name] = spec if function is spec.function else ActionSpec(
+                action_name, spec.attr, function, spec.reads, spec.writes
+            )
+
+        for attr, member in vars(cls).items():
+            action_name = getattr(member, "_tool_action", None)
+            if action_name is not None:
+                actions[action_name] = ActionSpec(action_name, attr, member, *member._tool_resources)
+        cls._actions = actions
+
+    def has_action(self, action_name):
+        """Check whether the tool supports the given action."""
+        return action_name in self._actions
+
+    @property
+    def result_cache(self):
+        """The `ToolResultCache` of this tool, created on first use."""
+        cache = self.__dict__.get("_result_cache")
+        if cache is None:
+            cache = self.__dict__.setdefault("_result_cache", ToolResultCache(
+                self.result_cache_size, self.result_cache_ttl, version=self._resource_versions
+            ))
+        return cache
+
+    def cache_stats(self):
+        """Hit rate and counters of the result cache."""
+        return self.result_cache.to_dict()
+
+    def _resource_key(self, value):
+        """Normalize a resource parameter (a path, an id...) to the key calls are compared on."""
+        return str(value)
+
+    def _resource_version(self, key):
+        """
+        A token of the current state of a resource, e.g. a file's mtime and size.
+
+        Cached results are only served while the tokens of what they read are
+        unchanged. None if the tool cannot tell, the default.
+        """
+        return None
+
+    def _resource_versions(self, reads):
+        versions = tuple(self._resource_version(key) for key in sorted(reads))
+        return None if all(version is None for version in versions) else versions
+
+    @staticmethod
+    def _is_error(result):
+        if isinstance(result, str):
+            return result.startswith("Error")
+        return isinstance(result, dict) and result.get("status") == "error"
+
+    def _dispatch(self, action_name, payload=None):
+        """
+        Validate the payload against the action's spec and call the action.
+
+        With `result_cache_size` set, results of read-only actions are served
+        from the tool's result cache, other actions invalidate the cached
+        results of what they change. Error results are not cached.
+
+        :param action_name: str - The action to perform.
+        :param payload: dict - Keyword arguments for the action.
+        :return: The result of the action, or an error message.
+        """
+        spec = self._actions.get(action_name)
+        if spec is None:
+            return (
+                f"Unsupported action: {action_name}. Available actions are:\n\n"
+                f"{self.instruction}"
+            )
+
+        payload = payload or {}
+        error = spec.validate(payload)
+        if error is not None:
+            return error
+
+        if not self.result_cache_size:
+            return spec.function(self, **payload)
+
+        cache = self.result_cache
+        reads, writes = spec.resources(self, payload)
+        if spec.read_only:
+            key = cache.key(action_name, payload)
+            found, result, generation = cache.get(key)
+            if not found:
+                version = cache.current_version(reads)
+                result = spec.function(self, **payload)
+                if not self._is_error(result):
+                    cache.put(key, result, reads, generation, version)
+            return result
+
+        # Invalidate before and after, so reads overlapping the change are not kept either.
+        cache.invalidate(writes)
+        try:
+            return spec.function(self, **payload)
+        finally:
+            cache.invalidate(writes)
+
     def use(self, *args, **kwargs):
         """Override this method to define the tool's behavior."""
         raise NotImplementedError("This method should be implemented in a subclass.")
@@ -27,6 +27,7 @@ class LangSwarmBranchingTool(Tool):
         super().__init__(
             name="LangSwarm Branching",
             func=self.run,
+            coroutine=self.arun,
             description="A tool to generate multiple responses from a set of agents.",
             branching = LLMBranching(clients=agents, **kwargs)
         )
@@ -41,5 +42,16 @@ class LangSwarmBranchingTool(Tool):
         Returns:
         - list: A list of responses from the agents.
         """
-        self.branching.query = query
-        return self.branching.run()
+        return self.branching.run(query=query)
+
+    async def arun(self, query):
+        """
+        Asynchronously executes the branching workflow without blocking the event loop.
+
+        Parameters:
+        - query (str): The query to process.
+
+        Returns:
+        - list: A list of responses from the agents.
+        """
+        return await self.branching.arun(query)
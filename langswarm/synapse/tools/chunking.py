@@ -0,0 +1,115 @@
+import ast
+import hashlib
+from typing import Callable, List, NamedTuple, Optional
+
+from ..utils.tokens import count_tokens
+
+
+class Chunk(NamedTuple):
+    """A contiguous part of a file, lines are 1-based and inclusive."""
+    text: str
+    start_line: int
+    end_line: int
+
+    @property
+    def hash(self) -> str:
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+class FileChunker:
+    """
+    Splits files into chunks of at most `max_tokens` tokens on syntactic boundaries.
+
+    Python files are split between top-level statements (functions, classes,
+    imports...), and consecutive small statements are packed into one chunk.
+    Other files, Python files that do not parse and statements larger than
+    `max_tokens` are split between lines.
+
+    Since chunk boundaries only depend on the surrounding code, an edit
+    usually changes the hash of the affected chunks only.
+
+    Attributes:
+        max_tokens (int): Maximum size of a chunk, a single line may exceed it.
+        token_counter (callable): Returns the number of tokens of a text, defaults to tiktoken.
+    """
+
+    def __init__(self, max_tokens: int = 1500, token_counter: Optional[Callable[[str], int]] = None):
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter or count_tokens
+
+    def chunk(self, text: str, path: Optional[str] = None) -> List[Chunk]:
+        """
+        Split a file into chunks.
+
+        :param text: str - The content of the file.
+        :param path: str - The path of the file, used to pick the splitting strategy.
+        :return: list - The chunks, in file order.
+        """
+        lines = text.splitlines(keepends=True)
+        if not lines:
+            return []
+        if self.token_counter(text) <= self.max_tokens:
+            return [Chunk(text, 1, len(lines))]
+
+        if path and path.endswith(".py"):
+            boundaries = self._python_boundaries(text)
+            if boundaries is not None:
+                return self._pack(lines, boundaries)
+        return self._sized(lines, 0, len(lines))
+
+    @staticmethod
+    def _python_boundaries(text):
+        """0-based line numbers where top-level statements start, None if the file does not parse."""
+        try:
+            tree = ast.parse(text)
+        except (SyntaxError, ValueError):
+            return None
+        boundaries = []
+        for node in tree.body:
+            # Decorators belong to the function or class they decorate.
+            decorators = getattr(node, "decorator_list", [])
+            start = min([node.lineno] + [d.lineno for d in decorators]) - 1
+            if not boundaries or start > boundaries[-1]:
+                boundaries.append(start)
+        return boundaries
+
+    def _pack(self, lines, boundaries):
+        """Pack the segments between boundaries into chunks of at most max_tokens."""
+        # Leading comments and blank lines stay with the first statement.
+        starts = [0] + [b for b in boundaries if b > 0]
+        segments = [(start, end) for start, end in zip(starts, starts[1:] + [len(lines)])]
+
+        chunks = []
+        current_start, current_tokens = None, 0
+        for start, end in segments:
+            tokens = self.token_counter("".join(lines[start:end]))
+            if current_start is not None and current_tokens + tokens > self.max_tokens:
+                chunks.append(self._make(lines, current_start, start))
+                current_start, current_tokens = None, 0
+            if tokens > self.max_tokens:
+                chunks.extend(self._sized(lines, start, end))
+                continue
+            if current_start is None:
+                current_start = start
+            current_tokens += tokens
+        if current_start is not None:
+            chunks.append(self._make(lines, current_start, len(lines)))
+        return chunks
+
+    def _sized(self, lines, start, end):
+        """Split lines[start:end] between lines into chunks of at most max_tokens."""
+        chunks = []
+        chunk_start, tokens = start, 0
+        for i in range(start, end):
+            line_tokens = self.token_counter(lines[i])
+            if i > chunk_start and tokens + line_tokens > self.max_tokens:
+                chunks.append(self._make(lines, chunk_start, i))
+                chunk_start, tokens = i, 0
+            tokens += line_tokens
+        if chunk_start < end:
+            chunks.append(self._make(lines, chunk_start, end))
+        return chunks
+
+    @staticmethod
+    def _make(lines, start, end):
+        return Chunk("".join(lines[start:end]), start + 1, end)
@@ -1,79 +1,135 @@
-import os
-from typing import Dict, List
+import inspect
 import json
+from typing import Dict, Iterator, List, Optional
+
+from langswarm.memory.adapters.database_adapter import DatabaseAdapter
+
+from .base import BaseTool
+from .path_trie import PathTrie
 
 
 class CodebaseIndexer(BaseTool):
     """
     Tool for indexing a codebase by querying the database for metadata and creating a file/folder structure.
+
+    The structure is kept in a `PathTrie` (`self.index`), built from paginated adapter
+    results so only one page of metadata is held at a time. It can be updated
+    incrementally with `apply_events` and queried with `subtree`, `glob`, `prefix`
+    and `stats` without materializing the whole tree.
     """
-    def __init__(self, name="Codebase Indexer", description="Indexes file and folder structures from a database query."):
-        super().__init__(name, description)
+    def __init__(self, name="Codebase Indexer", description="Indexes file and folder structures from a database query.",
+                 instruction=None, page_size=1000):
+        super().__init__(name, description, instruction or description)
+        self.page_size = page_size
+        self.index = PathTrie()
 
-    def use(self, adapter, query: Dict = None, output_format: str = "dict") -> Dict:
+    def use(self, adapter, query: Dict = None, output_format: str = "dict", page_size: Optional[int] = None):
         """
         Indexes the codebase by fetching metadata from the database and building a file/folder structure.
 
         Args:
             adapter (DatabaseAdapter): The adapter used to query the database.
             query (Dict, optional): Pre-written query to fetch metadata.
-            output_format (str): Output format of the index. Options: "dict", "json". Defaults to "dict".
+            output_format (str): Output format of the index. Options: "dict", "json", "trie". Defaults to "dict".
+            page_size (int, optional): Number of metadata records fetched per adapter call.
 
         Returns:
-            Dict: A nested dictionary representing the file/folder structure.
+            Dict: A nested dictionary representing the file/folder structure,
+            a compact JSON string, or the PathTrie itself for "trie".
         """
         if not isinstance(adapter, DatabaseAdapter):
             raise ValueError("The adapter must be an instance of DatabaseAdapter.")
+        if output_format not in ("dict", "json", "trie"):
+            raise ValueError("Invalid output_format. Choose 'dict', 'json' or 'trie'.")
 
-        # Step 1: Query the database for metadata
+        # Step 1 and 2: Stream the metadata into a fresh trie
+        index = PathTrie()
         try:
-            metadata_results = adapter.query(query=query)
+            records = 0
+            for record in self._iter_metadata(adapter, query, page_size or self.page_size):
+                records += 1
+                self._add_record(index, record)
         except Exception as e:
             raise RuntimeError(f"Failed to fetch metadata from the database: {e}")
 
-        if not metadata_results:
+        if not records:
             raise ValueError("No metadata retrieved from the database.")
-
-        # Step 2: Build the file/folder structure
-        file_structure = self._build_file_structure(metadata_results)
+        self.index = index
 
         # Step 3: Output the index
+        if output_format == "trie":
+            return index
+        file_structure = index.subtree()
         if output_format == "json":
-            return json.dumps(file_structure, indent=2)
-        elif output_format == "dict":
-            return file_structure
-        else:
-            raise ValueError("Invalid output_format. Choose 'dict' or 'json'.")
+            return json.dumps(file_structure, separators=(",", ":"))
+        return file_structure
 
-    def _build_file_structure(self, metadata_results: List[Dict]) -> Dict:
+    def _iter_metadata(self, adapter, query: Dict, page_size: int) -> Iterator[Dict]:
         """
-        Builds a nested file/folder structure from metadata results.
+        Yields metadata records page by page.
+
+        Adapters whose `query` does not take `limit` and `offset` by name are
+        queried once. A page larger than `page_size` means the adapter ignored
+        the limit, it is taken as the whole result.
+        """
+        if not self._paginates(adapter):
+            yield from adapter.query(query=query) or []
+            return
+
+        offset = 0
+        while True:
+            page = list(adapter.query(query=query, limit=page_size, offset=offset) or [])
+            yield from page
+            if len(page) != page_size:
+                return
+            offset += len(page)
+
+    @staticmethod
+    def _paginates(adapter) -> bool:
+        """True if the adapter's `query` takes `limit` and `offset` arguments by name."""
+        try:
+            parameters = inspect.signature(adapter.query).parameters
+        except (TypeError, ValueError):
+            return False
+        return "limit" in parameters and "offset" in parameters
+
+    @staticmethod
+    def _add_record(index: PathTrie, record: Dict) -> None:
+        metadata = record.get("metadata", {}) or {}
+        file_path = metadata.get("path", "")
+        if file_path:
+            index.add(file_path, metadata.get("size", 0) or 0)
+
+    def apply_events(self, events: List[Dict]) -> int:
+        """
+        Updates the index incrementally from change events.
 
         Args:
-            metadata_results (List[Dict]): Metadata results from the database query.
+            events (List[Dict]): Events like {"type": "added" | "modified" | "deleted" | "renamed",
+                "path": str, "size": int, "old_path": str}.
 
         Returns:
-            Dict: A nested dictionary representing the file/folder structure.
+            int: The number of files in the index.
         """
-        file_structure = {}
+        for event in events:
+            self.index.apply_event(event)
+        return len(self.index)
 
-        for record in metadata_results:
-            # Extract the file path from metadata
-            file_path = record.get("metadata", {}).get("path", "")
-            if not file_path:
-                continue
+    def subtree(self, path: str = "", depth: Optional[int] = None) -> Optional[Dict]:
+        """Returns the nested structure below a directory, limited to `depth` levels."""
+        return self.index.subtree(path, depth)
 
-            # Break the path into components
-            path_parts = file_path.split(os.sep)
+    def glob(self, pattern: str) -> List[str]:
+        """Returns the file paths matching a glob pattern, e.g. 'src/**/*.py'."""
+        return list(self.index.glob(pattern))
 
-            # Recursively build the nested dictionary structure
-            current_level = file_structure
-            for part in path_parts:
-                if part not in current_level:
-                    current_level[part] = {}
-                current_level = current_level[part]
+    def prefix(self, prefix: str) -> List[str]:
+        """Returns the file paths starting with a prefix."""
+        return list(self.index.prefix(prefix))
 
-        return file_structure
+    def stats(self, path: str = "") -> Optional[Dict]:
+        """Returns the file count and total size of a directory, or the size of a file."""
+        return self.index.stats(path)
 
 """
 from adapters.pinecone_adapter import PineconeAdapter
@@ -95,4 +151,9 @@ print("File Structure:")
 for folder, sub_structure in file_structure.items():
     print(f"{folder}: {sub_structure}")
 
+# Keep the index up to date and query it
+indexer.apply_events([{"type": "added", "path": "src/new_module.py", "size": 120}])
+print(indexer.glob("src/**/*.py"))
+print(indexer.stats("src"))
+
 """
@@ -25,6 +25,7 @@ class LangSwarmConsensusTool(Tool):
         super().__init__(
             name="LangSwarm Consensus",
             func=self.run,
+            coroutine=self.arun,
             description="A tool to reach consensus among multiple agents for a given query.",
             consensus = LLMConsensus(clients=agents, **kwargs)
         )
@@ -39,5 +40,16 @@ class LangSwarmConsensusTool(Tool):
         Returns:
         - str: The consensus result.
         """
-        self.consensus.query = query
-        return self.consensus.run()
+        return self.consensus.run(query=query)
+
+    async def arun(self, query):
+        """
+        Asynchronously executes the consensus workflow without blocking the event loop.
+
+        Parameters:
+        - query (str): The query to process.
+
+        Returns:
+        - str: The consensus result.
+        """
+        return await self.consensus.arun(query)
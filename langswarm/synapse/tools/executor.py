@@ -0,0 +1,180 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .base import ALL_RESOURCES
+
+
+def _overlap(keys, others):
+    return bool(keys) and bool(others) and (ALL_RESOURCES in keys or ALL_RESOURCES in others or not keys.isdisjoint(others))
+
+
+def conflicts(first, second):
+    """
+    Whether two planned calls must run in order.
+
+    Calls conflict when they are made on the same tool instance and one of
+    them changes a resource the other reads or changes.
+
+    :param first: PlannedCall - The earlier call.
+    :param second: PlannedCall - The later call.
+    :return: bool
+    """
+    if first.instance_name != second.instance_name:
+        return False
+    return (
+        _overlap(first.writes, second.reads | second.writes)
+        or _overlap(second.writes, first.reads)
+    )
+
+
+class PlannedCall:
+    """
+    A tool call of a batch with the resources it touches.
+
+    Attributes:
+        index (int): Position of the call in the batch.
+        call (dict): The call as emitted by the agent.
+        instance_name (str): The tool instance the call is made on.
+        reads (frozenset): Resource keys read, "*" for all.
+        writes (frozenset): Resource keys changed, "*" for all.
+        after (list): Indexes of the earlier calls this call waits for.
+    """
+
+    __slots__ = ("index", "call", "instance_name", "tool", "reads", "writes", "after")
+
+    def __init__(self, index, call, tool):
+        self.index = index
+        self.call = call
+        self.instance_name = call.get("instance_name")
+        self.tool = tool
+        self.after = []
+        method = call.get("method", "execute")
+        spec = getattr(tool, "_actions", {}).get(call.get("action")) if tool is not None else None
+        if method != "execute" or tool is None:
+            # Tool requests and unknown tools touch no resource.
+            self.reads, self.writes = frozenset(), frozenset()
+        elif spec is None:
+            self.reads, self.writes = frozenset(), frozenset((ALL_RESOURCES,))
+        else:
+            self.reads, self.writes = spec.resources(tool, call.get("parameters") or {})
+
+
+class ToolCallExecutor:
+    """
+    Runs the tool calls of a `START>>> {"calls": [...]} <<<END` block concurrently.
+
+    Each call is analysed for the resources it reads and changes, as
+    declared by the tool's actions (see `action`). Calls that do not
+    conflict run in parallel, a call changing a resource waits for the
+    earlier calls touching it, and calls on the same resource therefore
+    keep the agent's order. Results are returned in the order of the calls.
+
+    A call raising an exception gets the error message as its result, the
+    other calls still run.
+
+    Attributes:
+        tools: A dict of tools by instance name, or a registry with `get_tool` (and `search_tools`).
+        max_workers (int): Calls run at the same time.
+    """
+
+    def __init__(self, tools, max_workers=8):
+        self.tools = tools
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_guard = threading.Lock()
+
+    def _get_tool(self, name):
+        if isinstance(self.tools, dict):
+            return self.tools.get(name)
+        return self.tools.get_tool(name)
+
+    @staticmethod
+    def _calls(block):
+        if isinstance(block, dict):
+            block = block.get("calls", [block])
+        return list(block or [])
+
+    def plan(self, calls):
+        """
+        Plan a batch: the resources of each call and the earlier calls it must wait for.
+
+        :param calls: list or dict - The calls, or a block with a "calls" list.
+        :return: list - A PlannedCall per call, in order.
+        """
+        planned = []
+        for index, call in enumerate(self._calls(calls)):
+            current = PlannedCall(index, call, self._get_tool(call.get("instance_name")))
+            current.after = [earlier.index for earlier in planned if conflicts(earlier, current)]
+            planned.append(current)
+        return planned
+
+    def run_call(self, call):
+        """
+        Run a single call.
+
+        :param call: dict - A call with "method", "instance_name", "action" and "parameters".
+        :return: The result of the call, or an error message.
+        """
+        name = call.get("instance_name")
+        tool = self._get_tool(name)
+        try:
+            if call.get("method", "execute") == "request":
+                if tool is not None:
+                    return tool.instruction
+                if hasattr(self.tools, "search_tools"):
+                    return self.tools.search_tools(name)
+                return f"Error: No tool named '{name}'."
+            if tool is None:
+                return f"Error: No tool named '{name}'."
+            return tool.run(call.get("parameters") or {}, action=call.get("action"))
+        except Exception as e:
+            return f"Error: {type(e).__name__}: {e}"
+
+    def _executor(self):
+        with self._pool_guard:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-call")
+            return self._pool
+
+    def execute(self, calls):
+        """
+        Run a batch of calls, concurrently where they do not conflict.
+
+        :param calls: list or dict - The calls, or a block with a "calls" list.
+        :return: list - The result of each call, in the order of the calls.
+        """
+        planned = self.plan(calls)
+        if len(planned) <= 1:
+            return [self.run_call(p.call) for p in planned]
+
+        pool = self._executor()
+        futures = []
+
+        def run(current):
+            # Earlier calls were submitted first, so they are running or done: waiting cannot deadlock.
+            for index in current.after:
+                futures[index].exception()
+            return self.run_call(current.call)
+
+        for current in planned:
+            futures.append(pool.submit(run, current))
+        return [future.result() for future in futures]
+
+    async def aexecute(self, calls):
+        """
+        Run a batch of calls without blocking the event loop, see `execute`.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.execute, calls)
+
+    def close(self):
+        with self._pool_guard:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
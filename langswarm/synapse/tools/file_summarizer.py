@@ -1,4 +1,14 @@
-from abc import ABC, abstractmethod
+import hashlib
+import logging
+import posixpath
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .base import BaseTool
+from .chunking import FileChunker
+
+logger = logging.getLogger("langswarm.synapse.tools")
 
 
 class FileSummarizer(BaseTool):
@@ -8,15 +18,37 @@ class FileSummarizer(BaseTool):
     Purpose: To create high-level summaries of individual files, describing their purpose, 
     key functions/classes, and interactions with other project components.
     """
-    def __init__(self, llm_agent, name="File Summarizer", description="Summarizes a file and writes the summary back to the database."):
+    def __init__(self, llm_agent, name="File Summarizer", description="Summarizes a file and writes the summary back to the database.",
+                 instruction=None, max_workers=4, write_batch_size=50, chunk_tokens=None, token_counter=None,
+                 reduce_fanout=8, summary_cache=None, summary_cache_size=4096):
         """
         Initialize the File Summarizer tool.
 
         Args:
             llm_agent: The LLM agent to use for summarization.
+            max_workers (int): Maximum number of concurrent LLM calls, across the files of `use_batch`
+                and the chunks of each file.
+            write_batch_size (int): Number of summaries written back to the database per batch.
+            chunk_tokens (int, optional): Enables the map-reduce mode: files larger than this many
+                tokens are split into chunks that are summarized separately, then combined.
+            token_counter (callable, optional): Counts the tokens of a text, defaults to tiktoken.
+            reduce_fanout (int): Number of summaries combined by one reduce prompt.
+            summary_cache (dict, optional): Mapping of content hash to summary, shared by chunk,
+                reduce and directory summaries. Defaults to an in-memory LRU cache.
+            summary_cache_size (int): Summaries kept by the default cache.
         """
-        super().__init__(name, description)
+        super().__init__(name, description, instruction or description)
         self.llm_agent = llm_agent
+        self.max_workers = max_workers
+        self.write_batch_size = write_batch_size
+        self.chunker = FileChunker(chunk_tokens, token_counter) if chunk_tokens else None
+        self.reduce_fanout = max(2, reduce_fanout)
+        self.summary_cache = OrderedDict() if summary_cache is None else summary_cache
+        self.summary_cache_size = summary_cache_size
+        self._lru = summary_cache is None
+        self._cache_lock = threading.Lock()
+        # Shared by the file workers of `use_batch` and the chunk workers of each file.
+        self._llm_slots = threading.BoundedSemaphore(max_workers)
 
     def use(self, adapter, file_id):
         """
@@ -35,13 +67,120 @@ class FileSummarizer(BaseTool):
             raise ValueError(f"File with ID {file_id} not found in the database.")
 
         # Step 2: Summarize the file content
-        summary = self._generate_summary(file_content)
+        summary = self._generate_summary(file_content, path=file_id)
 
         # Step 3: Write the summary back to the database
-        self._write_summary_to_database(adapter, file_id, summary)
+        self._write_summary_to_database(adapter, file_id, summary, self._content_hash(file_content))
 
         return {"file_id": file_id, "summary": summary}
 
+    def use_batch(self, adapter, file_ids, max_workers=None, force=False):
+        """
+        Summarizes many files concurrently, skipping files that did not change.
+
+        A file is skipped when the sha256 of its content matches the `summary_hash`
+        stored with its existing summary, so re-summarizing a repository after a
+        small commit only calls the LLM for the changed files.
+
+        Args:
+            adapter (DatabaseAdapter): The database adapter to fetch and write the files.
+            file_ids (list): The unique IDs of the files to summarize.
+            max_workers (int, optional): Maximum number of files summarized at once, LLM calls stay
+                within the tool's `max_workers`.
+            force (bool): Summarize every file, even if its content did not change.
+
+        Returns:
+            list: One dict per file ID with "file_id", "status" ("summarized", "unchanged",
+            "missing" or "error") and "summary" (or "error").
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        records = self._fetch_files(adapter, file_ids)
+
+        results = {}
+        pending = []
+        for file_id in file_ids:
+            record = records.get(file_id)
+            if record is None or not record.get("text"):
+                results[file_id] = {"file_id": file_id, "status": "missing", "summary": None}
+                continue
+
+            content_hash = self._content_hash(record["text"])
+            metadata = record.get("metadata") or {}
+            if not force and metadata.get("summary") and metadata.get("summary_hash") == content_hash:
+                results[file_id] = {"file_id": file_id, "status": "unchanged", "summary": metadata["summary"]}
+            else:
+                pending.append((file_id, record["text"], metadata.get("path", file_id), content_hash))
+
+        writes = []
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            futures = [(file_id, content_hash, executor.submit(self._generate_summary, content, path))
+                       for file_id, content, path, content_hash in pending]
+            for file_id, content_hash, future in futures:
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    results[file_id] = {"file_id": file_id, "status": "error", "error": str(e)}
+                    continue
+                results[file_id] = {"file_id": file_id, "status": "summarized", "summary": summary}
+                writes.append((file_id, {"summary": summary, "summary_hash": content_hash}))
+
+        for start in range(0, len(writes), self.write_batch_size):
+            self._write_metadata_batch(adapter, writes[start:start + self.write_batch_size])
+
+        return [results[file_id] for file_id in file_ids]
+
+    @staticmethod
+    def _content_hash(file_content):
+        return hashlib.sha256(file_content.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _record_id(record):
+        return record.get("id") or record.get("key") or (record.get("metadata") or {}).get("id")
+
+    def _fetch_files(self, adapter, file_ids):
+        """
+        Fetch the records of many files, with a single query when the adapter supports it.
+
+        Files the bulk query did not return, all of them if the adapter does
+        not support bulk queries, are fetched one by one.
+
+        Args:
+            adapter (DatabaseAdapter): The database adapter instance.
+            file_ids (list): The unique IDs of the files to retrieve.
+
+        Returns:
+            dict: The records keyed by file ID, missing files are left out.
+        """
+        records = {}
+        if not file_ids:
+            return records
+
+        wanted = set(file_ids)
+        try:
+            for record in adapter.query({"id": {"$in": file_ids}}) or []:
+                record_id = self._record_id(record)
+                if record_id in wanted:
+                    records[record_id] = record
+        except Exception as e:
+            logger.warning("Bulk query of %d files failed, querying them one by one: %s", len(file_ids), e)
+
+        missing = [file_id for file_id in file_ids if file_id not in records]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for file_id, results in zip(missing, executor.map(lambda i: self._query_file(adapter, i), missing)):
+                    if results:
+                        records[file_id] = results[0]
+        return records
+
+    @staticmethod
+    def _query_file(adapter, file_id):
+        """Query the records of one file, logging a failed query and returning None."""
+        try:
+            return adapter.query({"id": file_id})
+        except Exception as e:
+            logger.warning("Query of file %s failed: %s", file_id, e)
+            return None
+
     def _fetch_file_content(self, adapter, file_id):
         """
         Fetch the file content using the database adapter.
@@ -58,24 +197,132 @@ class FileSummarizer(BaseTool):
             return None
         return results[0]["text"]
 
-    def _generate_summary(self, file_content):
+    def _generate_summary(self, file_content, path=None):
         """
         Generate a high-level summary of the file using the LLM agent.
 
+        In map-reduce mode, files larger than `chunk_tokens` are split into chunks
+        (top-level statements for Python files), the chunks are summarized in
+        parallel and the chunk summaries are combined hierarchically. Chunk and
+        reduce summaries are cached by hash, so after an edit only the affected
+        chunks and their ancestors in the reduce tree reach the LLM.
+
         Args:
             file_content (str): The content of the file to summarize.
+            path (str, optional): The path of the file, used to pick the chunking strategy.
 
         Returns:
             str: The generated summary of the file.
         """
+        if self.chunker is not None:
+            chunks = self.chunker.chunk(file_content, path)
+            if len(chunks) > 1:
+                return self._map_reduce(chunks, path)
+
         prompt = (
             "Summarize the following file content, describing its purpose, key functions or classes, "
             "and how it interacts with other parts of the project:\n\n"
             f"{file_content}"
         )
-        return self.llm_agent.run(prompt)
+        return self._run(prompt)
+
+    def _run(self, prompt):
+        """Run a prompt through the LLM agent, at most `max_workers` at a time."""
+        with self._llm_slots:
+            return self.llm_agent.run(prompt)
+
+    def _cached_summary(self, key, prompt):
+        """Run a prompt through the LLM agent, unless a summary is cached under `key`."""
+        with self._cache_lock:
+            summary = self.summary_cache.get(key)
+            if summary is not None and self._lru:
+                self.summary_cache.move_to_end(key)
+        if summary is None:
+            summary = self._run(prompt)
+            with self._cache_lock:
+                self.summary_cache[key] = summary
+                while self._lru and len(self.summary_cache) > self.summary_cache_size:
+                    self.summary_cache.popitem(last=False)
+        return summary
+
+    def _map_reduce(self, chunks, path=None):
+        """
+        Summarize the chunks of a file and combine the summaries.
+
+        Args:
+            chunks (list): The chunks of the file, in order.
+            path (str, optional): The path of the file.
+
+        Returns:
+            str: The combined summary.
+        """
+        name = path or "a file"
+
+        def summarize_chunk(chunk):
+            prompt = (
+                f"Summarize the following part of {name} (lines {chunk.start_line}-{chunk.end_line}), "
+                "describing its purpose, key functions or classes, and how it interacts with other parts "
+                f"of the project:\n\n{chunk.text}"
+            )
+            return self._cached_summary(f"chunk:{chunk.hash}", prompt)
+
+        def combine(summaries):
+            joined = "\n\n".join(summaries)
+            prompt = (
+                f"The following are summaries of consecutive parts of {name}. Combine them into a single "
+                "summary describing the file's purpose, key functions or classes, and how it interacts "
+                f"with other parts of the project:\n\n{joined}"
+            )
+            return self._cached_summary(f"reduce:{self._content_hash(joined)}", prompt)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            summaries = list(executor.map(summarize_chunk, chunks))
+            while len(summaries) > 1:
+                groups = [summaries[i:i + self.reduce_fanout] for i in range(0, len(summaries), self.reduce_fanout)]
+                summaries = list(executor.map(combine, groups))
+        return summaries[0]
+
+    def summarize_directories(self, file_summaries):
+        """
+        Build directory-level summaries bottom-up from file summaries.
 
-    def _write_summary_to_database(self, adapter, file_id, summary):
+        Every directory is summarized from the summaries of its files and
+        subdirectories. Rollups are cached by the hash of their inputs, so only
+        directories with a changed descendant are summarized again.
+
+        Args:
+            file_summaries (dict): File path -> summary, e.g. from `use_batch` results.
+
+        Returns:
+            dict: Directory path ('' for the root) -> summary.
+        """
+        children = {}
+        for path, summary in file_summaries.items():
+            path = posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+            directory = posixpath.dirname(path)
+            children.setdefault(directory, {})[posixpath.basename(path)] = summary
+            while directory:
+                children.setdefault(posixpath.dirname(directory), {}).setdefault(posixpath.basename(directory), None)
+                directory = posixpath.dirname(directory)
+
+        rollups = {}
+        # Deepest directories first, so subdirectory rollups are available to their parents.
+        for directory in sorted(children, key=lambda d: d.count("/") + bool(d), reverse=True):
+            parts = []
+            for name, summary in sorted(children[directory].items()):
+                if summary is None:
+                    summary = rollups[posixpath.join(directory, name)]
+                    name += "/"
+                parts.append(f"{name}: {summary}")
+            joined = "\n\n".join(parts)
+            prompt = (
+                f"Summarize the directory '{directory or '.'}' from the following summaries of its files and "
+                f"subdirectories, describing its role in the project:\n\n{joined}"
+            )
+            rollups[directory] = self._cached_summary(f"directory:{self._content_hash(directory + joined)}", prompt)
+        return rollups
+
+    def _write_summary_to_database(self, adapter, file_id, summary, content_hash=None):
         """
         Write the generated summary back to the database.
 
@@ -83,10 +330,27 @@ class FileSummarizer(BaseTool):
             adapter (DatabaseAdapter): The database adapter instance.
             file_id (str): The unique ID of the file.
             summary (str): The generated summary to write.
+            content_hash (str, optional): The hash of the summarized content.
         """
         metadata = {"summary": summary}
+        if content_hash is not None:
+            metadata["summary_hash"] = content_hash
         adapter.add_metadata(file_id=file_id, metadata=metadata)
 
+    def _write_metadata_batch(self, adapter, writes):
+        """
+        Write several summaries back to the database.
+
+        Args:
+            adapter (DatabaseAdapter): The database adapter instance.
+            writes (list): (file_id, metadata) tuples.
+        """
+        if hasattr(adapter, "add_metadata_batch"):
+            adapter.add_metadata_batch(writes)
+            return
+        for file_id, metadata in writes:
+            adapter.add_metadata(file_id=file_id, metadata=metadata)
+
 """
 from adapters.pinecone_adapter import PineconeAdapter
 from llm_agent import LLMAdapter  # Placeholder for your LLM agent
@@ -108,4 +372,13 @@ result = file_summarizer.use(adapter=adapter, file_id=file_id)
 
 print(f"Summary for file {result['file_id']}:")
 print(result["summary"])
+
+# Re-summarize many files, only the changed ones reach the LLM
+for result in file_summarizer.use_batch(adapter=adapter, file_ids=["file_1", "file_2", "file_3"]):
+    print(result["file_id"], result["status"])
+
+# Summarize big files in chunks, then roll the summaries up per directory
+file_summarizer = FileSummarizer(llm_agent=llm_agent, chunk_tokens=2000)
+results = file_summarizer.use_batch(adapter=adapter, file_ids=["src/app.py", "src/utils.py"])
+directory_summaries = file_summarizer.summarize_directories({r["file_id"]: r["summary"] for r in results if r["summary"]})
 """
@@ -13,6 +13,30 @@ components = SimpleNamespace(
      - Parameters:
        - `filename` (str): File name of the file.
     
+    - read_range: Read part of a large file by line numbers or byte offsets.
+     - Parameters:
+       - `filename` (str): File name of the file.
+       - `start_line` (int): First line to read, starting at 1.
+       - `end_line` (int | optional): Last line to read (inclusive), defaults to the end of the file.
+       - `start_byte` (int | optional): First byte to read, use instead of lines to read by bytes.
+       - `end_byte` (int | optional): Byte offset to stop at (exclusive).
+    
+    - head: Read the first lines of a file.
+     - Parameters:
+       - `filename` (str): File name of the file.
+       - `lines` (int): Number of lines, defaults to 10.
+    
+    - tail: Read the last lines of a file.
+     - Parameters:
+       - `filename` (str): File name of the file.
+       - `lines` (int): Number of lines, defaults to 10.
+    
+    - read_chunk: Read a large file chunk by chunk.
+     - Parameters:
+       - `filename` (str): File name of the file.
+       - `cursor` (str | optional): The `next_cursor` returned by the previous chunk, omit for the first chunk.
+       - `chunk_size` (int | optional): Approximate chunk size in bytes, defaults to 65536.
+    
     - update_file: Append or overwrite content in an existing file.
      - Important: Include complete content without truncation.
      - Parameters:
@@ -20,16 +44,30 @@ components = SimpleNamespace(
        - `content` (str): Content of the file.
        - `append` (bool): Append content, defaults to True.
     
+    - batch: Apply many file operations in one call, e.g. to scaffold a project.
+     - Writes are atomic, and files whose content would not change are skipped.
+     - Parameters:
+       - `operations` (list): Operations to apply in order. Each is a dict with an `action`
+         (`create_file`, `update_file`, `delete_file` or `create_directory`) and that action's parameters,
+         e.g. {"action": "create_file", "filename": "src/app.py", "content": "..."}.
+    
     - delete_file: Delete a file.
      - Parameters:
        - `filename` (str): File name of the file.
     
     - list_files: List all files in the directory.
+     - Parameters (all optional):
+       - `pattern` (str): Glob pattern to filter names, e.g. "*.csv".
+       - `extension` (str | list): Only list files with these extensions, e.g. ".py".
+       - `offset` (int): Number of entries to skip, for paging through long listings.
+       - `limit` (int): Maximum number of entries to return.
+       - `details` (bool): Include type, size and modification time of each entry.
     
     - list_all_files_and_folders: List all files and folders in a given directory..
      - Parameters:
-       - `base_dir` (str): The base directory to list files and folders from.
+       - `base_dir` (str): The base directory to list files and folders from, "" for the top directory.
        - `recursive` (bool): If True, list all files and folders recursively.
+       - `pattern`, `extension`, `offset`, `limit`, `details`: Optional, as for list_files.
        
     - help: Get help on how to use the tool.
     """,
@@ -0,0 +1,272 @@
+import os
+import time
+import fnmatch
+import threading
+from itertools import islice
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # Optional, fall back to polling directory mtimes.
+    INotify = None
+
+
+class Entry:
+    """A file or directory in the index."""
+
+    __slots__ = ("name", "is_dir", "size", "mtime_ns")
+
+    def __init__(self, name, is_dir, size, mtime_ns):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    def to_dict(self, path):
+        return {
+            "path": path,
+            "type": "directory" if self.is_dir else "file",
+            "size": self.size,
+            "mtime": self.mtime_ns / 1e9,
+        }
+
+
+class _Directory:
+    __slots__ = ("mtime_ns", "entries")
+
+    def __init__(self, mtime_ns, entries):
+        self.mtime_ns = mtime_ns
+        self.entries = entries  # {name: Entry}, sorted by name
+
+
+class DirectoryIndex:
+    """
+    A cached index of a directory tree, built with `os.scandir`.
+
+    Every directory is scanned once and kept with its mtime. A refresh only
+    re-scans directories whose mtime changed (a directory's mtime changes when
+    entries are added, removed or renamed), instead of re-walking the tree.
+    When `inotify_simple` is installed and `watch` is True, inotify events mark
+    directories dirty and unchanged directories are not even stat'ed. Directories
+    that could not be watched (e.g. past the inotify watch limit) are polled.
+    Call `close` to release the inotify file descriptor.
+
+    When polling, the size/mtime of a file modified in place by another process
+    is only picked up once its directory changes, or after `invalidate`.
+
+    Attributes:
+        root (str): Absolute path of the indexed directory.
+        ttl (float): Seconds during which a refresh is considered fresh and skipped.
+        generation (int): Incremented whenever a directory is re-scanned or dropped.
+    """
+
+    def __init__(self, root, ttl=1.0, watch=True):
+        self.root = os.path.abspath(root)
+        self.ttl = ttl
+        self.generation = 0
+        self._dirs = {}  # relative dir path ('' for the root) -> _Directory
+        self._dirty = set()
+        self._refreshed_at = None
+        self._lock = threading.RLock()
+
+        self._inotify = None
+        self._watches = {}  # watch descriptor -> relative dir path
+        self._unwatched = set()  # relative dir paths polled because they could not be watched
+        if watch and INotify is not None:
+            try:
+                self._inotify = INotify()
+            except OSError:
+                self._inotify = None
+
+    # -- Scanning ----------------------------------------------------------
+
+    def _abs(self, rel):
+        return os.path.join(self.root, rel) if rel else self.root
+
+    def _watch(self, rel):
+        if self._inotify is None:
+            return
+        mask = (inotify_flags.CREATE | inotify_flags.DELETE | inotify_flags.MODIFY | inotify_flags.MOVED_FROM
+                | inotify_flags.MOVED_TO | inotify_flags.ATTRIB | inotify_flags.CLOSE_WRITE | inotify_flags.DELETE_SELF)
+        try:
+            self._watches[self._inotify.add_watch(self._abs(rel), mask)] = rel
+        except OSError:
+            self._unwatched.add(rel)
+
+    def _scan(self, rel):
+        """Scan a single directory, recursing into new or changed subdirectories."""
+        path = self._abs(rel)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                scanned = list(it)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            self._drop(rel)
+            return
+
+        old = self._dirs.get(rel)
+        entries = {}
+        for item in sorted(scanned, key=lambda e: e.name):
+            try:
+                is_dir = item.is_dir(follow_symlinks=False)
+                stat = item.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            entries[item.name] = Entry(item.name, is_dir, 0 if is_dir else stat.st_size, stat.st_mtime_ns)
+
+        if old is None:
+            self._watch(rel)
+        else:
+            # Forget subdirectories that disappeared.
+            for name, entry in old.entries.items():
+                if entry.is_dir and not (name in entries and entries[name].is_dir):
+                    self._drop(os.path.join(rel, name) if rel else name)
+
+        self._dirs[rel] = _Directory(mtime_ns, entries)
+        self.generation += 1
+
+        for name, entry in entries.items():
+            child = os.path.join(rel, name) if rel else name
+            if entry.is_dir and child not in self._dirs:
+                self._scan(child)
+
+    def _drop(self, rel):
+        prefix = rel + os.sep
+        for key in [k for k in self._dirs if k == rel or k.startswith(prefix) or rel == ""]:
+            del self._dirs[key]
+            self._unwatched.discard(key)
+            self.generation += 1
+        for wd in [wd for wd, path in self._watches.items() if path == rel or path.startswith(prefix)]:
+            del self._watches[wd]
+            try:
+                self._inotify.rm_watch(wd)
+            except OSError:
+                pass
+
+    def _changed_dirs(self):
+        """Relative paths of directories that need a re-scan."""
+        if self._inotify is not None:
+            changed = set()
+            for event in self._inotify.read(timeout=0):
+                if event.mask & inotify_flags.Q_OVERFLOW:
+                    return self._stat_changed_dirs()
+                rel = self._watches.get(event.wd)
+                if rel is not None:
+                    changed.add(rel)
+            return changed | self._stat_changed_dirs(self._unwatched)
+        return self._stat_changed_dirs()
+
+    def _stat_changed_dirs(self, rels=None):
+        changed = set()
+        for rel in self._dirs if rels is None else list(rels):
+            directory = self._dirs.get(rel)
+            if directory is None:
+                continue
+            try:
+                if os.stat(self._abs(rel)).st_mtime_ns != directory.mtime_ns:
+                    changed.add(rel)
+            except OSError:
+                changed.add(rel)
+        return changed
+
+    def refresh(self, force=False):
+        """
+        Bring the index up to date, re-scanning only changed directories.
+
+        :param force: bool - Refresh even if the last refresh is younger than `ttl`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirs:
+                self._scan("")
+            elif force or self._dirty or self._refreshed_at is None or now - self._refreshed_at >= self.ttl:
+                changed = self._changed_dirs() | self._dirty
+                self._dirty = set()
+                # Scan parents first so removed subtrees are dropped before their children are visited.
+                for rel in sorted(changed, key=lambda r: r.count(os.sep) if r else -1):
+                    if rel == "" or rel in self._dirs:
+                        self._scan(rel)
+            self._refreshed_at = now
+
+    def invalidate(self, path=None):
+        """
+        Mark a directory as changed, e.g. after the tool wrote to it.
+
+        :param path: str - Absolute path of the directory, defaults to the whole tree.
+        """
+        with self._lock:
+            if path is None:
+                self._dirs = {}
+                self.generation += 1
+                return
+            rel = os.path.relpath(os.path.abspath(path), self.root)
+            self._dirty.add("" if rel == os.curdir else rel)
+
+    def close(self):
+        """Stop watching the tree and release the inotify file descriptor, polling from then on."""
+        with self._lock:
+            if self._inotify is None:
+                return
+            inotify, self._inotify = self._inotify, None
+            self._watches = {}
+            self._unwatched = set()
+            try:
+                inotify.close()
+            except OSError:
+                pass
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # -- Queries -----------------------------------------------------------
+
+    def _iter(self, rel, recursive):
+        directory = self._dirs.get(rel)
+        if directory is None:
+            return
+        for name, entry in directory.entries.items():
+            child = os.path.join(rel, name) if rel else name
+            yield child, entry
+            if recursive and entry.is_dir:
+                yield from self._iter(child, recursive)
+
+    def list(self, path="", recursive=False, pattern=None, extensions=None, include_dirs=True, offset=0, limit=None):
+        """
+        List indexed entries below a directory.
+
+        :param path: str - Directory relative to the root, '' for the root itself.
+        :param recursive: bool - Include entries of all subdirectories.
+        :param pattern: str - Glob pattern matched against the relative path or the name (e.g. '*.py', 'src/*').
+        :param extensions: list - Only include files with these extensions (e.g. ['.py', '.md']).
+        :param include_dirs: bool - Include directories in the result.
+        :param offset: int - Number of matching entries to skip.
+        :param limit: int - Maximum number of entries to return.
+        :return: tuple - (list of (relative path, Entry), total number of matching entries).
+        :raises ValueError: If `offset` or `limit` is negative.
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative.")
+        self.refresh()
+        rel = os.path.normpath(path) if path else ""
+        rel = "" if rel == os.curdir else rel
+        if extensions is not None:
+            extensions = {e if e.startswith(".") else f".{e}" for e in ([extensions] if isinstance(extensions, str) else extensions)}
+
+        def matches(item):
+            child, entry = item
+            if entry.is_dir:
+                if not include_dirs or extensions is not None:
+                    return False
+            elif extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                return False
+            return pattern is None or fnmatch.fnmatch(child, pattern) or fnmatch.fnmatch(entry.name, pattern)
+
+        with self._lock:
+            if rel not in self._dirs:
+                raise FileNotFoundError(f"Directory '{path}' does not exist.")
+            matched = [item for item in self._iter(rel, recursive) if matches(item)]
+
+        stop = None if limit is None else offset + limit
+        return list(islice(matched, offset, stop)), len(matched)
@@ -1,10 +1,14 @@
 import os
-import inspect
+import base64
+import hashlib
 from typing import Type, Optional, List
 
 from langswarm.memory.adapters.database_adapter import DatabaseAdapter
-from ..base import BaseTool
+from ...utils.files import write_atomic
+from ..base import ALL_RESOURCES, BaseTool, action
 from .config import ToolSettings
+from .reader import FileReader
+from .dirindex import DirectoryIndex
 
 class FilesystemTool(BaseTool):
     """
@@ -13,10 +17,13 @@ class FilesystemTool(BaseTool):
     Features:
     - Check permissions before accessing files
     - Read, write, update, and delete files
+    - Ranged, head/tail and chunked reads of large files via memory maps
+    - Cached, incrementally refreshed directory listings
+    - Batched multi-file operations with atomic (temp file + rename) writes
     - Supports common file types
     """
 
-    ALLOWED_FILE_TYPES = {".txt", ".json", ".csv", ".md", ".py"}
+    ALLOWED_FILE_TYPES = {".txt", ".json", ".csv", ".md", ".py", ".log"}
     BASE_DIR = os.path.expanduser("~/agent_files")
         
     def __init__(
@@ -47,9 +54,13 @@ class FilesystemTool(BaseTool):
         os.makedirs(self.BASE_DIR, exist_ok=True)
 
         self.db = adapter
+        self.reader = FileReader()
+        self.directory_index = DirectoryIndex(self.BASE_DIR)
 
     def _validate_path(self, filename):
         """Ensures the file is within the allowed directory and has an allowed extension."""
+        if not isinstance(filename, str):
+            raise ValueError(f"File name must be a string, got {type(filename).__name__}.")
         ext = os.path.splitext(filename)[-1]
         if ext not in self.ALLOWED_FILE_TYPES:
             raise ValueError(f"File type '{ext}' is not allowed.")
@@ -61,50 +72,60 @@ class FilesystemTool(BaseTool):
             raise PermissionError("Access outside the allowed directory is not permitted. It could be due to a leading '/', if not intended, remove it and try again.")
 
         return full_path
-    
-    def _safe_call(self, func, *args, **kwargs):
-        """Safely calls a function and detects incorrect arguments."""
-        # ToDo: Now it returns if any argument is invalid, it should only return if
-        # required arguments are missing, else we just skip invalid ones.
 
-        func_signature = inspect.signature(func)
-        accepted_args = func_signature.parameters.keys()  # Valid argument names
+    def _validate_directory(self, path):
+        """Ensures the directory is the allowed directory or within it."""
+        if path is not None and not isinstance(path, str):
+            raise ValueError(f"Directory path must be a string, got {type(path).__name__}.")
+        full_path = os.path.abspath(os.path.join(self.BASE_DIR, path or ""))
+
+        if full_path != self.BASE_DIR and not full_path.startswith(self.BASE_DIR + os.sep):
+            raise PermissionError("Access outside the allowed directory is not permitted. It could be due to a leading '/', if not intended, remove it and try again.")
+
+        return full_path
+
+    def _resource_key(self, value):
+        """Paths naming the same file, e.g. 'a/b.txt' and './a//b.txt', share a resource key."""
+        return os.path.normpath(str(value))
+
+    def _resource_version(self, key):
+        """Files and directories are checked by mtime and size, listings by the directory index."""
+        if key == ALL_RESOURCES:
+            self.directory_index.refresh()
+            return self.directory_index.generation
+        try:
+            stat = os.stat(os.path.join(self.BASE_DIR, key))
+        except OSError:
+            return "missing"
+        return stat.st_mtime_ns, stat.st_size
 
-        # Separate valid and invalid arguments
-        valid_kwargs = {k: v for k, v in kwargs.items() if k in accepted_args}
-        invalid_kwargs = {k: v for k, v in kwargs.items() if k not in accepted_args}
+    def _atomic_write(self, filepath, content):
+        """
+        Writes content to a temporary file and renames it over the target.
 
-        # If there are invalid arguments, return an error message instead of calling
-        if invalid_kwargs:
-            return f"Error: Unexpected arguments {list(invalid_kwargs.keys())}. Expected: {list(accepted_args)}"
+        Readers see either the old or the new file, never a partial write.
+        Returns False without writing if the file already has this content.
+        """
+        data = content.encode("utf-8")
+        if os.path.isfile(filepath) and os.path.getsize(filepath) == len(data):
+            with open(filepath, "rb") as f:
+                if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                    return False
 
-        # Call the function with only valid arguments
-        return func(*args, **valid_kwargs)
+        write_atomic(filepath, lambda f: f.write(data))
+        self._written(filepath)
+        return True
 
+    def _written(self, filepath):
+        """Invalidates cached state after the tool changed a file or directory."""
+        self.reader.invalidate(filepath)
+        self.directory_index.invalidate(os.path.dirname(filepath))
+    
     def run(self, payload = {}, action="read_file"):
         """Handles file operations based on the provided action and parameters."""
-        
-        # Map actions to corresponding functions
-        action_map = {
-            "help": self._help,
-            "read_file": self.read_file,
-            "create_file": self.create_file,
-            "update_file": self.update_file,
-            "delete_file": self.delete_file,
-            "list_files": self.list_files,
-            "list_all_files_and_folders": self.list_all_files_and_folders,
-            "create_directory": self.create_directory,
-        }
-
-        # Execute the corresponding action
-        if action in action_map: 
-            return self._safe_call(action_map[action], **payload)
-        else:
-            return (
-                f"Unsupported action: {action}. Available actions are:\n\n"
-                f"{self.instruction}"
-            )
+        return self._dispatch(action, payload)
 
+    @action(writes=("filename",))
     def create_file(self, filename, content):
         filepath = self._validate_path(filename)
         # Ensure the parent directory exists
@@ -112,10 +133,10 @@ class FilesystemTool(BaseTool):
         if os.path.exists(filepath):
             return f"File '{filename}' already exists."
             #raise FileExistsError(f"File '{filename}' already exists.")
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
+        self._atomic_write(filepath, content)
         return f"File '{filename}' created."
 
+    @action(reads=("filename",))
     def read_file(self, filename):
         filepath = self._validate_path(filename)
         if not os.path.exists(filepath):
@@ -123,51 +144,245 @@ class FilesystemTool(BaseTool):
         with open(filepath, "r", encoding="utf-8") as f:
             return f.read()
 
+    def _validate_existing(self, filename):
+        filepath = self._validate_path(filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"File '{filename}' does not exist.")
+        return filepath
+
+    @action(reads=("filename",))
+    def read_range(self, filename, start_line=None, end_line=None, start_byte=None, end_byte=None):
+        """
+        Read a range of lines or bytes from a file without loading the whole file.
+
+        :param filename: str - File name of the file.
+        :param start_line: int - First line to read (1-based, inclusive).
+        :param end_line: int - Last line to read (1-based, inclusive), defaults to the end of the file.
+        :param start_byte: int - First byte to read (0-based, inclusive), if reading by bytes.
+        :param end_byte: int - Byte to stop at (0-based, exclusive), defaults to the end of the file.
+        :return: str - The content of the range.
+        """
+        filepath = self._validate_existing(filename)
+        if start_byte is not None or end_byte is not None:
+            return self.reader.read_bytes(filepath, int(start_byte or 0), None if end_byte is None else int(end_byte))
+
+        start = max(int(start_line or 1), 1) - 1
+        stop = None if end_line is None else int(end_line)
+        return self.reader.read_lines(filepath, start, stop)
+
+    @action(reads=("filename",))
+    def head(self, filename, lines=10):
+        """Read the first lines of a file."""
+        return self.reader.head(self._validate_existing(filename), int(lines))
+
+    @action(reads=("filename",))
+    def tail(self, filename, lines=10):
+        """Read the last lines of a file."""
+        return self.reader.tail(self._validate_existing(filename), int(lines))
+
+    @action(reads=("filename",))
+    def read_chunk(self, filename, cursor=None, chunk_size=65536):
+        """
+        Iterate over a large file in chunks that end on line boundaries.
+
+        :param filename: str - File name of the file.
+        :param cursor: str - The `next_cursor` of the previous chunk, omit to start at the beginning.
+        :param chunk_size: int - Approximate chunk size in bytes.
+        :return: dict - The chunk content, the cursor of the next chunk (None at the end) and an eof flag.
+        """
+        filepath = self._validate_existing(filename)
+        try:
+            size_bytes = int(chunk_size)
+        except (TypeError, ValueError):
+            size_bytes = 0
+        if size_bytes <= 0:
+            return {"status": "error", "message": f"chunk_size must be a positive number of bytes, got {chunk_size!r}."}
+
+        offset, fingerprint = 0, None
+        if cursor:
+            if not isinstance(cursor, str):
+                return {"status": "error", "message": f"Invalid cursor '{cursor}'."}
+            try:
+                offset, mtime_ns, size = (int(x) for x in base64.urlsafe_b64decode(cursor.encode()).decode().split(":"))
+            except ValueError:
+                return {"status": "error", "message": f"Invalid cursor '{cursor}'."}
+            if offset < 0:
+                return {"status": "error", "message": f"Invalid cursor '{cursor}'."}
+            fingerprint = (mtime_ns, size)
+
+        stat = os.stat(filepath)
+        if fingerprint is not None and fingerprint != (stat.st_mtime_ns, stat.st_size):
+            return {"status": "error", "message": f"File '{filename}' changed since the cursor was issued, start over without a cursor."}
+
+        content, next_offset, stat = self.reader.read_chunk(filepath, offset, size_bytes)
+        next_cursor = None
+        if next_offset is not None:
+            token = f"{next_offset}:{stat.st_mtime_ns}:{stat.st_size}"
+            next_cursor = base64.urlsafe_b64encode(token.encode()).decode()
+
+        return {"content": content, "next_cursor": next_cursor, "eof": next_cursor is None}
+
+    @action(writes=("filename",))
     def update_file(self, filename, content, append=True):
         filepath = self._validate_path(filename)
-        mode = "a" if append else "w"
-        with open(filepath, mode, encoding="utf-8") as f:
-            f.write(content)
+        if append:
+            with open(filepath, "a", encoding="utf-8") as f:
+                f.write(content)
+            self._written(filepath)
+        elif not self._atomic_write(filepath, content):
+            return f"File '{filename}' unchanged."
         return f"File '{filename}' updated."
 
+    @action(writes=("filename",))
     def delete_file(self, filename):
         filepath = self._validate_path(filename)
         if os.path.exists(filepath):
             os.remove(filepath)
+            self._written(filepath)
             return f"File '{filename}' deleted."
         raise FileNotFoundError(f"File '{filename}' does not exist.")
 
-    def list_files(self):
-        return os.listdir(self.BASE_DIR)
+    BATCH_ACTIONS = {"create_file", "update_file", "delete_file", "create_directory"}
+
+    @action(writes=("*",))
+    def batch(self, operations):
+        """
+        Applies many file operations in one call.
+
+        All operations are validated before any is applied, so a malformed batch
+        changes nothing. Writes are atomic and files whose content would not
+        change are skipped. A failing operation does not stop the others.
+
+        :param operations: list - Operations as dicts with an `action` (create_file, update_file,
+                           delete_file or create_directory) and that action's parameters.
+        :return: list - One result dict per operation, in order, with `status` and `message`.
+        """
+        if not isinstance(operations, list) or not operations:
+            return {"status": "error", "message": "`operations` must be a non-empty list."}
+
+        errors = []
+        for index, operation in enumerate(operations):
+            name = operation.get("action") if isinstance(operation, dict) else None
+            if name not in self.BATCH_ACTIONS:
+                errors.append(f"Operation {index}: unsupported action '{name}', expected one of {sorted(self.BATCH_ACTIONS)}.")
+                continue
+            params = {k: v for k, v in operation.items() if k != "action"}
+            error = self._actions[name].validate(params)
+            if error is not None:
+                errors.append(f"Operation {index} ({name}): {error}")
+                continue
+            try:
+                if name == "create_directory":
+                    self._validate_directory(params["path"])
+                else:
+                    self._validate_path(params["filename"])
+            except (ValueError, PermissionError) as e:
+                errors.append(f"Operation {index} ({name}): {e}")
+
+        if errors:
+            return {"status": "error", "message": "No operations were applied.", "errors": errors}
+
+        results = []
+        for index, operation in enumerate(operations):
+            name = operation["action"]
+            params = {k: v for k, v in operation.items() if k != "action"}
+            target = params.get("filename", params.get("path"))
+            try:
+                status, message = self._apply_batch_operation(name, params)
+            except Exception as e:
+                status, message = "error", str(e)
+            results.append({"index": index, "action": name, "target": target, "status": status, "message": message})
+
+        return results
+
+    def _apply_batch_operation(self, name, params):
+        if name == "create_directory":
+            result = self.create_directory(**params)
+            return ("created" if result["status"] == "success" else result["status"]), result["message"]
+
+        filename = params["filename"]
+        filepath = self._validate_path(filename)
+
+        if name == "create_file":
+            if os.path.exists(filepath):
+                return "error", f"File '{filename}' already exists."
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            self._atomic_write(filepath, params["content"])
+            return "created", f"File '{filename}' created."
+
+        if name == "update_file":
+            message = self.update_file(**params)
+            return ("unchanged" if message.endswith("unchanged.") else "updated"), message
+
+        return "deleted", self.delete_file(filename)
+
+    def _listing(self, entries, total, offset, limit, details, to_path):
+        if details:
+            entries = [entry.to_dict(to_path(rel)) for rel, entry in entries]
+        else:
+            entries = [to_path(rel) for rel, _ in entries]
+
+        if limit is None and not offset:
+            return entries
+        return {"entries": entries, "total": total, "offset": offset}
+
+    @action(reads=("*",))
+    def list_files(self, pattern=None, extension=None, offset=0, limit=None, details=False):
+        """
+        List the files and folders in the base directory.
+
+        :param pattern: str - Glob pattern to filter names, e.g. '*.csv'.
+        :param extension: str or list - Only list files with these extensions.
+        :param offset: int - Number of entries to skip, for pagination.
+        :param limit: int - Maximum number of entries to return.
+        :param details: bool - Return dicts with path, type, size and mtime instead of names.
+        :return: list - The names, or a dict with a page of entries and the total when paginating.
+        """
+        offset, limit = int(offset or 0), None if limit is None else int(limit)
+        try:
+            entries, total = self.directory_index.list(pattern=pattern, extensions=extension, offset=offset, limit=limit)
+        except ValueError as e:
+            return f"Error: {e}"
+        return self._listing(entries, total, offset, limit, details, lambda rel: rel)
     
+    @action("help", reads=())
     def _help(self):
         return self.instruction
 
-    def list_all_files_and_folders(self, base_dir, recursive=True):
+    @action(reads=("*",))
+    def list_all_files_and_folders(self, base_dir="", recursive=True, pattern=None, extension=None, offset=0, limit=None, details=False):
         """
         List all files and folders in a given directory.
 
         :param base_dir: The base directory to list files and folders from.
         :param recursive: If True, list all files and folders recursively.
-        :return: A list of file and folder paths.
+        :param pattern: Glob pattern matched against relative paths or names, e.g. 'src/*.py'.
+        :param extension: Only list files with these extensions, e.g. '.py' or ['.py', '.md'].
+        :param offset: Number of entries to skip, for pagination.
+        :param limit: Maximum number of entries to return.
+        :param details: If True, return dicts with path, type, size and mtime.
+        :return: A list of file and folder paths, or a dict with a page of entries and the total when paginating.
         """
-        base_dir = self._validate_path(base_dir)
-        
-        if not os.path.exists(base_dir):
+        base_dir = self._validate_directory(base_dir)
+        offset, limit = int(offset or 0), None if limit is None else int(limit)
+
+        if not os.path.isdir(base_dir):
             return f"Error: The directory '{base_dir}' does not exist."
     
         try:
-            if recursive:
-                # Recursive: Walk through all subdirectories
-                return [os.path.join(root, name) 
-                        for root, dirs, files in os.walk(base_dir) 
-                        for name in dirs + files]
-            else:
-                # Non-recursive: List only top-level files and folders
-                return [os.path.join(base_dir, name) for name in os.listdir(base_dir)]
+            entries, total = self.directory_index.list(
+                os.path.relpath(base_dir, self.BASE_DIR), recursive=recursive, pattern=pattern, extensions=extension,
+                offset=offset, limit=limit)
+        except FileNotFoundError:
+            return f"Error: The directory '{base_dir}' does not exist."
         except PermissionError:
             return f"Error: Permission denied when accessing '{base_dir}'."
+        except ValueError as e:
+            return f"Error: {e}"
+
+        return self._listing(entries, total, offset, limit, details, lambda rel: os.path.join(self.BASE_DIR, rel))
     
+    @action(writes=("path",))
     def create_directory(self, path: str):
         """
         Creates a new directory at the specified path.
@@ -180,12 +395,13 @@ class FilesystemTool(BaseTool):
         if not path:
             return {"status": "error", "message": "Missing directory path."}
         
-        path = self._validate_path(path)
+        path = self._validate_directory(path)
 
         try:
             # Ensure the directory does not already exist
             if not os.path.exists(path):
                 os.makedirs(path)  # ✅ Create directory (including parents if needed)
+                self._written(path)
                 return {"status": "success", "message": f"Directory '{path}' created successfully."}
             else:
                 return {"status": "error", "message": f"Directory '{path}' already exists."}
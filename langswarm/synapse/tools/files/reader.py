@@ -0,0 +1,219 @@
+import os
+import mmap
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LineIndex:
+    """
+    Byte offsets of the line starts of a file.
+
+    The index is built with a single vectorised pass over a memory map of the
+    file, so jumping to line N afterwards is a constant-time lookup.
+
+    Attributes:
+        mtime_ns (int): Modification time of the indexed file.
+        size (int): Size of the indexed file in bytes.
+        offsets (np.ndarray): Offset of the first byte of every line.
+    """
+
+    SCAN_BLOCK = 64 * 1024 * 1024
+
+    def __init__(self, mm, mtime_ns, size):
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+        starts = [np.zeros(1, dtype=np.uint64)]
+        for block_start in range(0, size, self.SCAN_BLOCK):
+            block = np.frombuffer(mm, dtype=np.uint8, count=min(self.SCAN_BLOCK, size - block_start), offset=block_start)
+            starts.append(np.flatnonzero(block == 10).astype(np.uint64) + np.uint64(block_start + 1))
+        offsets = np.concatenate(starts)
+
+        # A trailing newline does not start another line.
+        if len(offsets) > 1 and offsets[-1] == size:
+            offsets = offsets[:-1]
+        self.offsets = offsets
+
+    def __len__(self):
+        return 0 if self.size == 0 else len(self.offsets)
+
+    def line_span(self, start, stop):
+        """
+        Byte span of the lines [start, stop) (0-based).
+
+        :return: tuple - (start_byte, end_byte).
+        """
+        count = len(self)
+        start, stop = max(0, min(start, count)), max(0, min(stop, count))
+        if start >= stop:
+            return 0, 0
+        end = self.size if stop >= count else int(self.offsets[stop])
+        return int(self.offsets[start]), end
+
+    def is_current(self, stat):
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class FileReader:
+    """
+    Memory-mapped ranged reads with a per-file cache of line indexes.
+
+    Nothing is loaded into memory beyond the requested range. Line indexes are
+    built lazily on the first line-addressed read and invalidated when the
+    file's mtime or size changes.
+
+    Attributes:
+        max_indexes (int): Maximum number of cached line indexes.
+        encoding (str): Encoding used to decode the returned text.
+    """
+
+    def __init__(self, max_indexes=32, encoding="utf-8"):
+        self.max_indexes = max_indexes
+        self.encoding = encoding
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _decode(self, data):
+        return data.decode(self.encoding, errors="replace")
+
+    def _map(self, path):
+        """Open a read-only memory map, returns (file, mmap or None, stat)."""
+        f = open(path, "rb")
+        stat = os.fstat(f.fileno())
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        return f, mm, stat
+
+    def _close(self, f, mm):
+        if mm is not None:
+            mm.close()
+        f.close()
+
+    def line_index(self, path, mm=None, stat=None):
+        """
+        Return the cached line index of a file, building it if needed.
+
+        :param path: str - The absolute file path.
+        :return: LineIndex - The line index.
+        """
+        stat = stat or os.stat(path)
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is not None and index.is_current(stat):
+                self._indexes.move_to_end(path)
+                return index
+
+        if mm is None and stat.st_size:
+            f, mm, stat = self._map(path)
+            try:
+                index = LineIndex(mm, stat.st_mtime_ns, stat.st_size)
+            finally:
+                self._close(f, mm)
+        else:
+            index = LineIndex(mm if mm is not None else b"", stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            self._indexes[path] = index
+            self._indexes.move_to_end(path)
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, path=None):
+        """Drop the cached line index of a file, or of all files."""
+        with self._lock:
+            if path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(path, None)
+
+    def read_bytes(self, path, start=0, end=None):
+        """
+        Read the byte range [start, end) of a file.
+
+        :return: str - The decoded content.
+        """
+        f, mm, stat = self._map(path)
+        try:
+            if mm is None:
+                return ""
+            end = stat.st_size if end is None else min(end, stat.st_size)
+            return self._decode(mm[max(0, start):max(0, end)])
+        finally:
+            self._close(f, mm)
+
+    def read_lines(self, path, start, stop=None):
+        """
+        Read the lines [start, stop) (0-based) of a file.
+
+        :return: str - The decoded lines.
+        """
+        f, mm, stat = self._map(path)
+        try:
+            if mm is None:
+                return ""
+            index = self.line_index(path, mm=mm, stat=stat)
+            start_byte, end_byte = index.line_span(start, len(index) if stop is None else stop)
+            return self._decode(mm[start_byte:end_byte])
+        finally:
+            self._close(f, mm)
+
+    def head(self, path, lines=10):
+        """
+        Read the first lines of a file without indexing it.
+
+        :return: str - The decoded lines.
+        """
+        f, mm, stat = self._map(path)
+        try:
+            if mm is None or lines <= 0:
+                return ""
+            end = 0
+            for _ in range(lines):
+                end = mm.find(b"\n", end) + 1
+                if end == 0:
+                    end = stat.st_size
+                    break
+            return self._decode(mm[:end])
+        finally:
+            self._close(f, mm)
+
+    def tail(self, path, lines=10):
+        """
+        Read the last lines of a file by scanning backwards from its end.
+
+        :return: str - The decoded lines.
+        """
+        f, mm, stat = self._map(path)
+        try:
+            if mm is None or lines <= 0:
+                return ""
+            # Ignore a trailing newline, it does not start another line.
+            start = stat.st_size - 1 if mm[stat.st_size - 1:] == b"\n" else stat.st_size
+            for _ in range(lines):
+                start = mm.rfind(b"\n", 0, start)
+                if start == -1:
+                    break
+            return self._decode(mm[start + 1:])
+        finally:
+            self._close(f, mm)
+
+    def read_chunk(self, path, offset=0, chunk_size=65536):
+        """
+        Read a chunk of roughly `chunk_size` bytes, ending on a line boundary if possible.
+
+        :return: tuple - (content, next offset or None at the end of the file, stat).
+        """
+        f, mm, stat = self._map(path)
+        try:
+            if mm is None or offset >= stat.st_size:
+                return "", None, stat
+            end = min(offset + chunk_size, stat.st_size)
+            if end < stat.st_size:
+                newline = mm.rfind(b"\n", offset, end)
+                if newline != -1:
+                    end = newline + 1
+            return self._decode(mm[offset:end]), (end if end < stat.st_size else None), stat
+        finally:
+            self._close(f, mm)
@@ -1,13 +1,13 @@
 import json
 import re
-import inspect
 
 from typing import Type, Optional, List
 
 from langswarm.core.utils.utilities import Utils
 from langchain_community.utilities.github import GitHubAPIWrapper
 from langswarm.memory.adapters.database_adapter import DatabaseAdapter
-from ..base import BaseTool
+from ..base import BaseTool, action
+from ..streaming import loads_tolerant
 from .config import ToolSettings
 
 class GitHubTool(BaseTool):
@@ -24,7 +24,10 @@ class GitHubTool(BaseTool):
     - Extracting code for analysis or retrieval.
     - Updating files with comments, docstrings, or refactored code.
     - Creating new branches or pull requests for code changes.
-    
+
+    Every file change is a commit on the active branch, so they all write the
+    "branch" resource and are never run concurrently; switching or creating
+    a branch changes what every path refers to, so it writes all resources.
     """
     def __init__(
         self, 
@@ -65,25 +68,6 @@ class GitHubTool(BaseTool):
         self.agents = agents
         self.utils = Utils()
     
-    def _safe_call(self, func, *args, **kwargs):
-        """Safely calls a function and detects incorrect arguments."""
-        # ToDo: Now it returns if any argument is invalid, it should only return if
-        # required arguments are missing, else we just skip invalid ones.
-
-        func_signature = inspect.signature(func)
-        accepted_args = func_signature.parameters.keys()  # Valid argument names
-
-        # Separate valid and invalid arguments
-        valid_kwargs = {k: v for k, v in kwargs.items() if k in accepted_args}
-        invalid_kwargs = {k: v for k, v in kwargs.items() if k not in accepted_args}
-
-        # If there are invalid arguments, return an error message instead of calling
-        if invalid_kwargs:
-            return f"Error: Unexpected arguments {list(invalid_kwargs.keys())}. Expected: {list(accepted_args)}"
-
-        # Call the function with only valid arguments
-        return func(*args, **valid_kwargs)
-
     def run(self, payload = {}, action="fetch_and_store", retries=3):
         """
         Execute the tool's actions with automatic retries on failure.
@@ -110,24 +94,8 @@ class GitHubTool(BaseTool):
         for attempt in range(1, retries + 1):
             response = None
 
-            # Map actions to corresponding functions
-            action_map = {
-                "help": self._help,
-                "fetch_and_store": self.fetch_and_store_code,
-                "create_branch": self.create_branch,
-                "create_pull_request": self.create_pull_request,
-                "read_file": self.read_file,
-                "create_file": self.create_file,
-                "update_file": self.update_file,
-                "delete_file": self.delete_file,
-                "set_active_branch": self.set_active_branch,
-                "list_all_files": self.list_all_files,
-                "replace_file": self.replace_file,
-                "list_branches_in_repo": self.list_branches_in_repo,
-            }
-
             # Execute the corresponding action
-            if action in action_map:
+            if self.has_action(action):
                 if isinstance(self.agents, list) and len(self.agents) == 1:
                     # TODO: Implement multi Tool Agents when they exist.
 
@@ -141,8 +109,7 @@ class GitHubTool(BaseTool):
                     elif review['status'] == 'corrected':
                         payload = review.get('payload', payload)
                     
-                #response = action_map[action](**payload)
-                response =  self._safe_call(action_map[action], **payload)
+                response = self._dispatch(action, payload)
             else:
                 return (
                     f"Unsupported action: {action}. Available actions are:\n\n"
@@ -166,6 +133,7 @@ class GitHubTool(BaseTool):
         # If all retries fail, return the last response or an error message
         return response or f"Action '{action}' failed after {retries} retries."
        
+    @action(writes=("*",))
     def set_active_branch(self, branch="main"):
         """
         Set the active branch.
@@ -176,6 +144,7 @@ class GitHubTool(BaseTool):
         # print(action)
         return action
     
+    @action(reads=("branches",))
     def list_branches_in_repo(self):
         """
         List all branches.
@@ -185,6 +154,7 @@ class GitHubTool(BaseTool):
         # print(action)
         return action
     
+    @action(reads=("branch",), writes=("pull_requests",))
     def create_pull_request(self, pr_title, pr_body):
         """
         Makes a pull request from the bot's branch to the base branch
@@ -202,6 +172,7 @@ class GitHubTool(BaseTool):
         # print(action)
         return action
         
+    @action(reads=("file_path",))
     def read_file(self, file_path):
         """
         Read a file from the repository in a case-insensitive manner.
@@ -227,6 +198,7 @@ class GitHubTool(BaseTool):
 
         return 'File not found'
         
+    @action(writes=("file_path", "branch"))
     def create_file(self, file_path, content):
         """
         Creates a new file on the Github repo
@@ -248,6 +220,7 @@ class GitHubTool(BaseTool):
         print("Create file completed", action)
         return action
         
+    @action(writes=("file_path", "branch"))
     def update_file(self, file_path, old_content, new_content):
         """
         Updates a file with new content.
@@ -283,6 +256,7 @@ class GitHubTool(BaseTool):
         print("Update file completed", action)
         return action
     
+    @action(writes=("file_path", "branch"))
     def replace_file(self, file_path, content):
         """
         Updates an entire file in the Github repo
@@ -314,6 +288,7 @@ class GitHubTool(BaseTool):
         print("Replaced file completed", action)
         return action
         
+    @action(writes=("file_path", "branch"))
     def delete_file(self, file_path):
         """
         Deletes a file from the repo
@@ -326,6 +301,7 @@ class GitHubTool(BaseTool):
         print("Delete file completed", action)
         return action
 
+    @action(writes=("*",))
     def create_branch(self, proposed_branch_name):
         """
         Create a new branch, and set it as the active bot branch.
@@ -350,6 +326,7 @@ class GitHubTool(BaseTool):
         print(
             f"Code from {file_path} in {self.github_tool.github_repository} (branch: {branch}) has been processed and stored.")
 
+    @action("fetch_and_store", reads=("file_path",))
     def fetch_and_store_code(self, file_path=None, branch="main"):
         """
         Fetch code from GitHub and store it in the vector database.
@@ -373,6 +350,7 @@ class GitHubTool(BaseTool):
         
         return 'done'
 
+    @action(reads=("*",))
     def list_all_files(self, file_path=None, branch="main"):
         """
         Fetch code from GitHub and store it in the vector database.
@@ -407,6 +385,7 @@ class GitHubTool(BaseTool):
         
         return json.dumps(files)
     
+    @action("help", reads=())
     def _help(self):
         return self.instruction
 
@@ -439,14 +418,17 @@ class GitHubTool(BaseTool):
     def _parse_tool_agent_output(self, response_str):
         """
         Attempts to parse a tool call response from a JSON string.
-        If `json.loads` fails, extracts key values manually.
+        The JSON may have comments, single quotes or trailing commas, and be
+        surrounded by text. If it still does not parse, extracts key values manually.
 
         :param response_str: str - The JSON response as a string.
         :return: dict - Parsed response.
         """
         try:
-            # First, try normal JSON parsing
-            return json.loads(response_str)
+            start, end = response_str.find("{"), response_str.rfind("}")
+            if start < 0 or end < start:
+                raise json.JSONDecodeError("No JSON object found", response_str, 0)
+            return loads_tolerant(response_str[start:end + 1])
 
         except json.JSONDecodeError:
             print("Warning: JSON parsing failed. Attempting backup extraction.")
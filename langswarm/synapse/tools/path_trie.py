@@ -0,0 +1,289 @@
+import sys
+import fnmatch
+import posixpath
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class _Node:
+    """A directory or file in the trie, with aggregated counts for its subtree."""
+
+    __slots__ = ("children", "files", "size")
+
+    def __init__(self, is_file=False):
+        self.children = None if is_file else {}
+        self.files = 1 if is_file else 0
+        self.size = 0
+
+    @property
+    def is_file(self):
+        return self.children is None
+
+
+class PathTrie:
+    """
+    A compact prefix tree of repository paths.
+
+    Paths are split on '/' regardless of the platform ('\\' is accepted as a
+    separator too), and path segments are interned so repeated directory names
+    are stored once. Every directory node aggregates the number of files and
+    the total size of its subtree, so per-directory statistics are O(depth).
+
+    Queries (`subtree`, `glob`, `prefix`) walk only the part of the trie they
+    need and yield results lazily instead of materializing the whole tree.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+
+    @staticmethod
+    def split(path: str) -> Tuple[str, ...]:
+        """Normalize a repository path and split it into segments."""
+        path = posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+        if path in ("", "."):
+            return ()
+        return tuple(sys.intern(part) for part in path.split("/"))
+
+    def _walk(self, parts):
+        """Return the list of nodes from the root along `parts`, or None if missing."""
+        nodes = [self.root]
+        for part in parts:
+            children = nodes[-1].children
+            if children is None or part not in children:
+                return None
+            nodes.append(children[part])
+        return nodes
+
+    def __len__(self):
+        return self.root.files
+
+    def __contains__(self, path):
+        nodes = self._walk(self.split(path))
+        return nodes is not None and nodes[-1].is_file
+
+    def add(self, path: str, size: int = 0) -> bool:
+        """
+        Add a file, or update its size if it is already indexed.
+
+        :return: bool - True if the file was added, False if it was updated or the path is invalid.
+        """
+        parts = self.split(path)
+        if not parts:
+            return False
+
+        nodes = [self.root]
+        for part in parts[:-1]:
+            children = nodes[-1].children
+            if children is None:
+                return False  # A file is in the way of the directory.
+            node = children.get(part)
+            if node is None:
+                node = children[part] = _Node()
+            nodes.append(node)
+
+        children = nodes[-1].children
+        if children is None:
+            return False
+        leaf = children.get(parts[-1])
+        if leaf is not None and not leaf.is_file:
+            return False
+
+        added = leaf is None
+        if added:
+            leaf = children[parts[-1]] = _Node(is_file=True)
+        delta_size = (size or 0) - leaf.size
+        leaf.size = size or 0
+
+        for node in nodes:
+            node.files += 1 if added else 0
+            node.size += delta_size
+        return added
+
+    def remove(self, path: str) -> bool:
+        """
+        Remove a file, or a directory and everything below it.
+
+        Directories left empty are pruned.
+
+        :return: bool - True if something was removed.
+        """
+        parts = self.split(path)
+        nodes = self._walk(parts) if parts else None
+        if nodes is None:
+            return False
+
+        removed = nodes[-1]
+        for node in nodes[:-1]:
+            node.files -= removed.files
+            node.size -= removed.size
+
+        del nodes[-2].children[parts[-1]]
+        for depth in range(len(parts) - 1, 0, -1):
+            if nodes[depth].children:
+                break
+            del nodes[depth - 1].children[parts[depth - 1]]
+        return True
+
+    def move(self, old_path: str, new_path: str, size: Optional[int] = None) -> bool:
+        """
+        Move a file, or a directory with everything below it, keeping its aggregated counts.
+
+        An existing file or directory at the new path is replaced. Directories
+        left empty at the old path are pruned.
+
+        :param size: int - New size of a moved file, unchanged if None.
+        :return: bool - False if nothing is indexed at the old path.
+        :raises ValueError: If one path is inside the other or a file is in the way of the new path.
+        """
+        old_parts, new_parts = self.split(old_path), self.split(new_path)
+        nodes = self._walk(old_parts) if old_parts else None
+        if nodes is None:
+            return False
+        if old_parts == new_parts:
+            return True
+        if not new_parts or old_parts == new_parts[:len(old_parts)] or new_parts == old_parts[:len(new_parts)]:
+            raise ValueError(f"Cannot move '{old_path}' to '{new_path}', one path is inside the other.")
+        parent = self.root
+        for part in new_parts[:-1]:
+            parent = parent.children.get(part)
+            if parent is None:
+                break
+            if parent.is_file:
+                raise ValueError(f"Cannot move '{old_path}' to '{new_path}', a file is in the way.")
+
+        moved = nodes[-1]
+        self.remove(old_path)
+        self.remove(new_path)
+        if size is not None and moved.is_file:
+            moved.size = size or 0
+
+        nodes = [self.root]
+        for part in new_parts[:-1]:
+            children = nodes[-1].children
+            node = children.get(part)
+            if node is None:
+                node = children[part] = _Node()
+            nodes.append(node)
+        nodes[-1].children[new_parts[-1]] = moved
+        for node in nodes:
+            node.files += moved.files
+            node.size += moved.size
+        return True
+
+    def apply_event(self, event: Dict) -> None:
+        """
+        Apply a change event to the index.
+
+        :param event: dict - {"type": "added" | "modified" | "deleted" | "renamed", "path": str,
+                      "size": int (optional), "old_path": str (for renames)}.
+        """
+        kind = event.get("type")
+        if kind in ("added", "modified"):
+            self.add(event["path"], event.get("size", 0))
+        elif kind in ("deleted", "removed"):
+            self.remove(event["path"])
+        elif kind == "renamed":
+            if not self.move(event["old_path"], event["path"], event.get("size")):
+                self.add(event["path"], event.get("size", 0))
+        else:
+            raise ValueError(f"Unsupported event type: {kind}")
+
+    def stats(self, path: str = "") -> Optional[Dict]:
+        """
+        Aggregated statistics of a file or directory.
+
+        :return: dict or None - {"files": int, "size": int, "type": "file" | "directory"}.
+        """
+        nodes = self._walk(self.split(path))
+        if nodes is None:
+            return None
+        node = nodes[-1]
+        return {"files": node.files, "size": node.size, "type": "file" if node.is_file else "directory"}
+
+    def _to_dict(self, node, depth):
+        if node.is_file or depth == 0:
+            return {}
+        return {name: self._to_dict(child, None if depth is None else depth - 1) for name, child in node.children.items()}
+
+    def subtree(self, path: str = "", depth: Optional[int] = None) -> Optional[Dict]:
+        """
+        Materialize the nested {name: {...}} structure below a directory.
+
+        :param path: str - The directory to start from, '' for the repository root.
+        :param depth: int - Maximum number of levels to include, None for all.
+        :return: dict or None - The nested structure, files map to {}.
+        """
+        nodes = self._walk(self.split(path))
+        return None if nodes is None else self._to_dict(nodes[-1], depth)
+
+    def iter_files(self, path: str = "") -> Iterator[Tuple[str, int]]:
+        """Yield (path, size) of every file below a directory."""
+        parts = self.split(path)
+        nodes = self._walk(parts)
+        if nodes is None:
+            return
+        stack = [("/".join(parts), nodes[-1])]
+        while stack:
+            current, node = stack.pop()
+            if node.is_file:
+                yield current, node.size
+                continue
+            for name in sorted(node.children, reverse=True):
+                stack.append((f"{current}/{name}" if current else name, node.children[name]))
+
+    def prefix(self, prefix: str) -> Iterator[str]:
+        """
+        Yield the file paths starting with a string prefix, e.g. 'src/ut' matches 'src/utils.py'.
+        """
+        normalized = prefix.replace("\\", "/").lstrip("/")
+        directory, _, partial = normalized.rpartition("/")
+        nodes = self._walk(self.split(directory))
+        if nodes is None or nodes[-1].is_file:
+            return
+        base = "/".join(self.split(directory))
+        for name in sorted(nodes[-1].children):
+            if name.startswith(partial):
+                yield from (p for p, _ in self.iter_files(f"{base}/{name}" if base else name))
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """
+        Yield the file paths matching a glob pattern, e.g. 'src/**/*.py'.
+
+        Patterns are matched segment by segment, so non-matching directories are
+        never visited. '**' matches any number of directories.
+        """
+        segments = [s for s in pattern.replace("\\", "/").strip("/").split("/") if s]
+
+        def match(node, path, index):
+            if index == len(segments):
+                if node.is_file:
+                    yield path
+                return
+            if node.is_file:
+                return
+
+            segment = segments[index]
+            if segment == "**":
+                # Zero directories, then one more level with the same '**'.
+                yield from match(node, path, index + 1)
+                for name in sorted(node.children):
+                    child = node.children[name]
+                    if not child.is_file:
+                        yield from match(child, f"{path}/{name}" if path else name, index)
+                return
+
+            if not any(c in segment for c in "*?["):
+                child = node.children.get(segment)
+                if child is not None:
+                    yield from match(child, f"{path}/{segment}" if path else segment, index + 1)
+                return
+
+            for name in sorted(node.children):
+                if fnmatch.fnmatchcase(name, segment):
+                    yield from match(node.children[name], f"{path}/{name}" if path else name, index + 1)
+
+        seen = set()
+        for path in match(self.root, "", 0):
+            # '**' can reach the same file along several expansions.
+            if path not in seen:
+                seen.add(path)
+                yield path
@@ -27,6 +27,7 @@ class LangSwarmRoutingTool(Tool):
         super().__init__(
             name="LangSwarm Routing",
             func=self.run,
+            coroutine=self.arun,
             description="A tool to dynamically route tasks to the appropriate agents.",
             routing = LLMRouting(route=route, bots=bots, main_bot=main_bot, **kwargs)
         )
@@ -41,5 +42,16 @@ class LangSwarmRoutingTool(Tool):
         Returns:
         - str: The result from the routed agent.
         """
-        self.routing.query = query
-        return self.routing.run()
+        return self.routing.run(query=query)
+
+    async def arun(self, query):
+        """
+        Asynchronously executes the routing workflow without blocking the event loop.
+
+        Parameters:
+        - query (str): The query to process.
+
+        Returns:
+        - str: The result from the routed agent.
+        """
+        return await self.routing.arun(query)
@@ -0,0 +1,377 @@
+import json
+import re
+
+START_MARKER = "START>>>"
+END_MARKER = "<<<END"
+
+_NUMBER = re.compile(r"-?(?:\d+)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$-]*")
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"', "'": "'"}
+# Characters the block scanner has to look at, everything else is skipped in bulk.
+_SIGNIFICANT = re.compile(r"[\"'{}\[\]/#<]")
+_STRING_END = {'"': re.compile(r'[\\"]'), "'": re.compile(r"[\\']")}
+
+
+class _TolerantParser:
+    """Recursive descent parser for the JSON agents write: comments, single quotes, trailing commas."""
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        raise json.JSONDecodeError(message, self.text, min(self.pos, len(self.text)))
+
+    def skip(self):
+        text, n = self.text, len(self.text)
+        while self.pos < n:
+            char = text[self.pos]
+            if char in " \t\r\n":
+                self.pos += 1
+            elif char == "#" or text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = n if end < 0 else end + 1
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                if end < 0:
+                    self.error("Unterminated comment")
+                self.pos = end + 2
+            else:
+                return
+
+    def value(self):
+        self.skip()
+        if self.pos >= len(self.text):
+            self.error("Expecting value")
+        char = self.text[self.pos]
+        if char == "{":
+            return self.object()
+        if char == "[":
+            return self.array()
+        if char in "\"'":
+            return self.string()
+        match = _NUMBER.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            number = match.group()
+            return float(number) if any(c in number for c in ".eE") else int(number)
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if match and match.group() in _LITERALS:
+            self.pos = match.end()
+            return _LITERALS[match.group()]
+        self.error("Expecting value")
+
+    def string(self):
+        text, quote = self.text, self.text[self.pos]
+        self.pos += 1
+        parts, start = [], self.pos
+        while True:
+            end = self.pos
+            while end < len(text) and text[end] != quote and text[end] != "\\":
+                end += 1
+            if end >= len(text):
+                self.error("Unterminated string")
+            parts.append(text[start:end])
+            if text[end] == quote:
+                self.pos = end + 1
+                return "".join(parts)
+            escaped = text[end + 1:end + 2]
+            if escaped == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[end + 2:end + 6]):
+                parts.append(chr(int(text[end + 2:end + 6], 16)))
+                self.pos = end + 6
+            else:
+                parts.append(_ESCAPES.get(escaped, escaped))
+                self.pos = end + 2
+            start = self.pos
+
+    def key(self):
+        if self.text[self.pos] in "\"'":
+            return self.string()
+        match = _IDENTIFIER.match(self.text, self.pos)
+        if not match:
+            self.error("Expecting property name")
+        self.pos = match.end()
+        return match.group()
+
+    def object(self):
+        self.pos += 1
+        result = {}
+        while True:
+            self.skip()
+            if self.text.startswith("}", self.pos):
+                self.pos += 1
+                return result
+            if self.pos >= len(self.text):
+                self.error("Unterminated object")
+            key = self.key()
+            self.skip()
+            if not self.text.startswith(":", self.pos):
+                self.error("Expecting ':' delimiter")
+            self.pos += 1
+            result[key] = self.value()
+            self.skip()
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+            elif not self.text.startswith("}", self.pos):
+                self.error("Expecting ',' delimiter")
+
+    def array(self):
+        self.pos += 1
+        result = []
+        while True:
+            self.skip()
+            if self.text.startswith("]", self.pos):
+                self.pos += 1
+                return result
+            if self.pos >= len(self.text):
+                self.error("Unterminated array")
+            result.append(self.value())
+            self.skip()
+            if self.text.startswith(",", self.pos):
+                self.pos += 1
+            elif not self.text.startswith("]", self.pos):
+                self.error("Expecting ',' delimiter")
+
+
+def loads_tolerant(text):
+    """
+    Parse JSON as agents write it.
+
+    Accepts comments (`//`, `/* */` and `#`), single-quoted strings,
+    unquoted keys, trailing commas and Python's True/False/None on top of
+    JSON. Valid JSON goes through `json.loads`.
+
+    :param text: str - The JSON text.
+    :return: The parsed value.
+    :raises json.JSONDecodeError: If the text cannot be parsed.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    parser = _TolerantParser(text)
+    result = parser.value()
+    parser.skip()
+    if parser.pos != len(text):
+        parser.error("Extra data")
+    return result
+
+
+class ToolCallStreamParser:
+    """
+    Incrementally extracts tool calls from `START>>> ... <<<END` blocks of a token stream.
+
+    Feed it the chunks of an agent's response as they arrive. Every call of
+    a block's "calls" list is returned by `feed` as soon as its closing
+    brace has been received, so the tool can start while the agent is still
+    generating. A block holding a single call object (without "calls") is
+    returned when the object closes. Each character is scanned once.
+
+    Attributes:
+        calls (int): Calls emitted.
+        errors (list): (message, block text) of blocks or calls that could not be parsed.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = []
+        self._reset()
+        self._outside = ""
+
+    def _reset(self):
+        self._block = ""
+        self._pos = 0
+        self._stack = []
+        self._quote = None
+        self._comment = None
+        self._string_start = None
+        self._last_string = None
+        self._streamed = False
+        self._in_block = False
+        self._closed = False
+
+    def _parse(self, text):
+        try:
+            return loads_tolerant(text)
+        except json.JSONDecodeError as e:
+            self.errors.append((str(e), text))
+            return None
+
+    def _emit(self, call, out):
+        if isinstance(call, dict):
+            self.calls += 1
+            out.append(call)
+
+    def _scan(self, out, final=False):
+        """Scan the unscanned part of the block, returns False if the block was aborted."""
+        block, i, n = self._block, self._pos, len(self._block)
+        stack = self._stack
+        while i < n:
+            if self._comment == "line":
+                end = block.find("\n", i)
+                if end < 0:
+                    i = n
+                    break
+                self._comment, i = None, end + 1
+                continue
+            if self._comment == "block":
+                end = block.find("*/", i)
+                if end < 0:
+                    i = max(i, n - 1)
+                    break
+                self._comment, i = None, end + 2
+                continue
+            if self._quote is not None:
+                match = _STRING_END[self._quote].search(block, i)
+                if match is None:
+                    i = n
+                    break
+                i = match.start()
+                if block[i] == "\\":
+                    if i + 1 >= n:
+                        break
+                    i += 2
+                    continue
+                self._quote = None
+                if len(stack) == 1 and stack[0][0] == "{":
+                    self._last_string = block[self._string_start + 1:i]
+                i += 1
+                continue
+
+            match = _SIGNIFICANT.search(block, i)
+            if match is None:
+                i = n
+                break
+            i = match.start()
+            char = block[i]
+            if char in "\"'":
+                self._quote, self._string_start = char, i
+                i += 1
+            elif char == "#":
+                self._comment = "line"
+                i += 1
+            elif char == "/":
+                if i + 1 >= n and not final:
+                    break
+                following = block[i + 1:i + 2]
+                self._comment = "line" if following == "/" else "block" if following == "*" else None
+                i += 2 if self._comment else 1
+            elif char == "<":
+                if block.startswith(END_MARKER, i):
+                    # The block ended before its value closed.
+                    self.errors.append(("Unterminated tool call block", block[:i]))
+                    self._pos = i + len(END_MARKER)
+                    return False
+                if END_MARKER.startswith(block[i:]) and not final:
+                    break
+                i += 1
+            elif char in "{[":
+                calls = char == "[" and (not stack or (len(stack) == 1 and self._last_string == "calls"))
+                stack.append((char, calls, i))
+                i += 1
+            elif char in "}]":
+                if not stack:
+                    i += 1
+                    continue
+                _, _, start = stack.pop()
+                i += 1
+                if char == "}" and stack and stack[-1][1]:
+                    self._streamed = True
+                    self._emit(self._parse(block[start:i]), out)
+                elif not stack:
+                    self._top_closed(block[start:i], out)
+                    self._pos = i
+                    return True
+            else:
+                i += 1
+        self._pos = i
+        return True
+
+    def _top_closed(self, text, out):
+        """The block's value closed: emit a single call, or the calls not streamed."""
+        self._closed = True
+        if self._streamed:
+            return
+        value = self._parse(text)
+        if isinstance(value, dict) and "calls" not in value:
+            self._emit(value, out)
+        elif isinstance(value, dict) and isinstance(value.get("calls"), list):
+            for call in value["calls"]:
+                self._emit(call, out)
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of the stream.
+
+        :param chunk: str - The next part of the response.
+        :return: list - The tool calls completed by this chunk.
+        """
+        out = []
+        if self._in_block:
+            self._block += chunk
+            self._advance(out)
+        else:
+            self._outside += chunk
+            self._advance(out)
+        return out
+
+    def _advance(self, out, final=False):
+        while True:
+            if not self._in_block:
+                start = self._outside.find(START_MARKER)
+                if start < 0:
+                    # Keep what could be the beginning of a marker split across chunks.
+                    self._outside = self._outside[-(len(START_MARKER) - 1):]
+                    return
+                self._block = self._outside[start + len(START_MARKER):]
+                self._outside = ""
+                self._in_block = True
+
+            if not self._closed:
+                if not self._scan(out, final):
+                    rest = self._block[self._pos:]
+                    self._reset()
+                    self._outside = rest
+                    continue
+                if not self._closed:
+                    return
+
+            end = self._block.find(END_MARKER, self._pos)
+            following = self._block.find(START_MARKER, self._pos)
+            if end < 0 and following < 0:
+                return
+            if end < 0 or 0 <= following < end:
+                rest = self._block[following:]
+            else:
+                rest = self._block[end + len(END_MARKER):]
+            self._reset()
+            self._outside = rest
+
+    def close(self):
+        """
+        End the stream, parsing what a truncated last block holds.
+
+        :return: list - The tool calls completed at the end of the stream.
+        """
+        out = []
+        if self._in_block and not self._closed:
+            self._scan(out, final=True)
+            if not self._closed and self._stack:
+                self.errors.append(("Unterminated tool call block", self._block))
+        self._reset()
+        self._outside = ""
+        return out
+
+
+def iter_tool_calls(chunks):
+    """
+    Yield the tool calls of a stream of response chunks as soon as they are complete.
+
+    :param chunks: Iterable of str.
+    :return: generator - The tool calls, dicts as emitted by the agent.
+    """
+    parser = ToolCallStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -22,8 +22,12 @@ components = SimpleNamespace(
       - Parameters:
         - `task_id` (str): The identifier of the task to delete.
 
-    - `list_tasks`: List all tasks.
-      - No parameters required
+    - `list_tasks`: List tasks in the order they were created.
+      - Parameters:
+        - `completed` (bool | optional): Only list open (false) or finished (true) tasks.
+        - `limit` (int | optional): Maximum number of tasks to list.
+        - `offset` (int | optional): Number of tasks to skip, for paging through long lists.
+        - `order` (str | optional): "priority" to list lower priority numbers first, e.g. with a limit of 5 for the top five.
       
     - help: Get help on how to use the tool.""",
     
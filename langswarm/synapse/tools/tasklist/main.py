@@ -1,20 +1,24 @@
 
-import inspect
 from typing import Type, Optional, List
 
 from langswarm.memory.adapters.database_adapter import DatabaseAdapter
-from ..base import BaseTool
+from ..base import BaseTool, action
 from .config import ToolSettings
+from .store import TaskStore, WriteBehindBuffer
 
 class TaskListTool(BaseTool):
     """
     A quick in-memory task list that optionally stores tasks in a vector database.
+
+    Tasks are indexed on priority and completion state, and adapter writes are
+    buffered and flushed in batches of `batch_size` (call `flush` to force a write).
     """
 
     def __init__(
         self, 
         identifier, 
-        adapter: Optional[Type[DatabaseAdapter]] = None
+        adapter: Optional[Type[DatabaseAdapter]] = None,
+        batch_size: int = 50
     ):
         self.identifier = identifier
         self.brief = (
@@ -33,7 +37,8 @@ class TaskListTool(BaseTool):
         )
         
         self.adapter = adapter  # Optional adapter for storing tasks in a vector database
-        self.tasks = {}  # in-memory store, {task_id: {"description": str, "completed": bool, "priority": int, ...}}
+        self.tasks = TaskStore()  # in-memory store, {task_id: {"description": str, "completed": bool, "priority": int, ...}}
+        self.writes = WriteBehindBuffer(adapter, batch_size=batch_size) if adapter else None
         self.next_id = 1
         
         # Load existing tasks from the adapter if available
@@ -45,33 +50,62 @@ class TaskListTool(BaseTool):
         Load existing tasks from the adapter using the identifier as the key.
         """
         existing_tasks = self.adapter.query(query=self.identifier)
+        loaded = []
         for task in existing_tasks:
-            self.tasks[task["key"]] = {
+            metadata = task.get("metadata") or task
+            loaded.append((task["key"], {
+                "task_id": task["key"],
                 "description": task["text"],
-                "completed": task.get("completed", False),
-                "priority": task.get("priority", 1), # Default priority if not set
-                "notes": task.get("notes", "")
-            }
+                "completed": metadata.get("completed", False),
+                "priority": metadata.get("priority", 1), # Default priority if not set
+                "identifier": self.identifier,
+                "notes": metadata.get("notes", "")
+            }))
             self.next_id = max(self.next_id, int(task["key"].split("-")[1]) + 1)
-    
-    def _safe_call(self, func, *args, **kwargs):
-        """Safely calls a function and detects incorrect arguments."""
-        # ToDo: Now it returns if any argument is invalid, it should only return if
-        # required arguments are missing, else we just skip invalid ones.
 
-        func_signature = inspect.signature(func)
-        accepted_args = func_signature.parameters.keys()  # Valid argument names
+        self.tasks.bulk_load(loaded)
+
+    def flush(self):
+        """
+        Write all buffered task changes to the adapter.
 
-        # Separate valid and invalid arguments
-        valid_kwargs = {k: v for k, v in kwargs.items() if k in accepted_args}
-        invalid_kwargs = {k: v for k, v in kwargs.items() if k not in accepted_args}
+        :return: int - Number of documents written or deleted.
+        """
+        return self.writes.flush() if self.writes is not None else 0
 
-        # If there are invalid arguments, return an error message instead of calling
-        if invalid_kwargs:
-            return f"Error: Unexpected arguments {list(invalid_kwargs.keys())}. Expected: {list(accepted_args)}"
+    def close(self):
+        """
+        Flush buffered task changes and stop flushing them at exit.
 
-        # Call the function with only valid arguments
-        return func(*args, **valid_kwargs)
+        :return: int - Number of documents written or deleted.
+        """
+        return self.writes.close() if self.writes is not None else 0
+
+    @staticmethod
+    def _parse_completed(value):
+        """Read a completion filter given as a bool or as text, e.g. 'false'."""
+        if value is None or isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in ("true", "1", "yes"):
+            return True
+        if text in ("false", "0", "no"):
+            return False
+        if text in ("", "none", "null", "all"):
+            return None
+        raise ValueError(f"completed must be true, false or null, got {value!r}.")
+
+    def _to_document(self, task):
+        return {
+            "key": task["task_id"],
+            "text": task["description"],
+            "metadata": {
+                "completed": task["completed"],
+                "priority": task["priority"],
+                "identifier": self.identifier,
+                "notes": task["notes"]
+            }
+        }
 
     def run(self, payload={}, action="list_tasks"):
         """
@@ -80,25 +114,9 @@ class TaskListTool(BaseTool):
         :param action: str - The action to perform.
         :return: str or List[str] - The result of the action.
         """
-        
-        # Map actions to corresponding functions
-        action_map = {
-            "help": self._help,
-            "create_task": self.create_task,
-            "update_task": self.update_task,
-            "list_tasks": self.list_tasks,
-            "delete_task": self.delete_task
-        }
-
-        # Execute the corresponding action
-        if action in action_map: 
-            return self._safe_call(action_map[action], **payload)
-        else:
-            return (
-                f"Unsupported action: {action}. Available actions are:\n\n"
-                f"{self.instruction}"
-            )
+        return self._dispatch(action, payload)
 
+    @action(writes=("tasks",))
     def create_task(self, description, priority=1):
         """
         Create a new task.
@@ -115,69 +133,71 @@ class TaskListTool(BaseTool):
             "identifier": self.identifier,
             "notes": ""
         }
-        self.tasks[task_id] = task_data
+        self.tasks.add(task_id, task_data)
 
         # Store the task in the adapter if provided
-        if self.adapter:
-            self.adapter.add_documents([{
-                "key": task_id,
-                "text": description,
-                "metadata": {
-                    "completed": False,
-                    "priority": priority,
-                    "identifier": self.identifier,
-                    "notes": ""
-                }
-            }])
+        if self.writes is not None:
+            self.writes.add(self._to_document(task_data))
 
         return f"New task created:   {task_data}"
 
+    @action(writes=("task_id",))
     def update_task(self, task_id, **kwargs):
         """
         Update fields in a task, e.g. 'completed': True or 'description': 'New text'.
         Returns the updated task dict, or None if not found.
         """
-        task = self.tasks.get(task_id)
+        fields = {k: v for k, v in kwargs.items() if k in ["description", "completed", "priority", "notes"]}
+        if "completed" in fields:
+            try:
+                fields["completed"] = bool(self._parse_completed(fields["completed"]))
+            except ValueError as e:
+                return f"Error: {e}"
+        task = self.tasks.update(task_id, fields)
         if not task:
             return None
 
-        for key, value in kwargs.items():
-            if key in ["description", "completed", "priority", "notes"]:
-                task[key] = value
-
         # Update the task in the adapter if provided
-        if self.adapter:
-            self.adapter.update({
-                "key": task_id,
-                "text": task["description"],
-                "metadata": {
-                    "completed": task["completed"],
-                    "priority": task["priority"],
-                    "identifier": self.identifier,
-                    "notes": ""
-                }
-            })
+        if self.writes is not None:
+            self.writes.update(self._to_document(task))
 
         return f"Updated task: {task}"
 
-    def list_tasks(self):
-        """
-        Return all tasks in memory.
-        If using the vector DB, you could query there too for consistency.
+    @action(reads=("*",))
+    def list_tasks(self, completed=None, limit=None, offset=0, order="insertion"):
         """
-        return f"All tasks in list:\n\n {list(self.tasks.values())}"
+        Return tasks in memory, in creation order unless ordered by priority.
 
+        :param completed: bool or None - Only list open (False) or completed (True) tasks.
+        :param limit: int or None - Maximum number of tasks to list.
+        :param offset: int - Number of tasks to skip, for pagination.
+        :param order: str - "insertion", or "priority" to list lower priorities first.
+        :return: str - The listed tasks.
+        """
+        try:
+            completed = self._parse_completed(completed)
+            limit = None if limit is None else int(limit)
+            offset = int(offset or 0)
+            tasks, total = self.tasks.query(completed=completed, limit=limit, offset=offset, order=order)
+        except ValueError as e:
+            return f"Error: {e}"
+        if completed is None and limit is None and not offset:
+            return f"All tasks in list:\n\n {tasks}"
+
+        return f"Tasks {offset + 1}-{offset + len(tasks)} of {total} matching:\n\n {tasks}"
+
+    @action(writes=("task_id",))
     def delete_task(self, task_id):
         """
         Delete a task from memory and optionally from the vector DB.
         Returns True if deleted, False if not found.
         """
-        # ToDo: Delete task from db as well
-
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+        if self.tasks.remove(task_id) is not None:
+            if self.writes is not None:
+                self.writes.delete(task_id)
             return "Task deleted."
         return "The task was not found."
     
+    @action("help", reads=())
     def _help(self):
         return self.instruction
@@ -0,0 +1,276 @@
+import bisect
+import heapq
+import threading
+import weakref
+from itertools import count, islice
+
+
+class TaskStore:
+    """
+    A compact in-memory task store with secondary indexes.
+
+    Tasks are kept in a dict keyed by task_id. Open and completed tasks are
+    additionally indexed in lists sorted by (priority, insertion order), so
+    filtered and paginated listings (e.g. the top-k open tasks) never have to
+    scan or sort the whole store.
+
+    The store behaves like a read-only mapping of {task_id: task} for
+    compatibility with code that used the previous plain dict.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self._keys = {}  # task_id -> index key
+        self._index = {False: [], True: []}
+        self._counter = count()
+
+    @staticmethod
+    def _priority(value):
+        """Coerce a priority to a sortable number, unknown values sort last."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("inf")
+
+    def _index_key(self, task_id, task, seq=None):
+        seq = next(self._counter) if seq is None else seq
+        return (self._priority(task.get("priority", 1)), seq, task_id)
+
+    def _unindex(self, task_id):
+        key = self._keys.pop(task_id)
+        bucket = self._index[bool(self._tasks[task_id].get("completed", False))]
+        del bucket[bisect.bisect_left(bucket, key)]
+        return key
+
+    def add(self, task_id, task):
+        """
+        Add a task to the store.
+
+        :param task_id: str - The identifier of the task.
+        :param task: dict - The task data.
+        """
+        if task_id in self._tasks:
+            self.remove(task_id)
+        key = self._index_key(task_id, task)
+        self._tasks[task_id] = task
+        self._keys[task_id] = key
+        bisect.insort(self._index[bool(task.get("completed", False))], key)
+
+    def update(self, task_id, fields):
+        """
+        Update fields of a task and re-index it if needed.
+
+        :param task_id: str - The identifier of the task.
+        :param fields: dict - The fields to update.
+        :return: dict or None - The updated task, or None if not found.
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+
+        key = self._unindex(task_id)
+        task.update(fields)
+        key = self._index_key(task_id, task, seq=key[1])
+        self._keys[task_id] = key
+        bisect.insort(self._index[bool(task.get("completed", False))], key)
+        return task
+
+    def remove(self, task_id):
+        """
+        Remove a task from the store.
+
+        :param task_id: str - The identifier of the task.
+        :return: dict or None - The removed task, or None if not found.
+        """
+        if task_id not in self._tasks:
+            return None
+        self._unindex(task_id)
+        return self._tasks.pop(task_id)
+
+    def bulk_load(self, tasks):
+        """
+        Load many tasks at once, sorting the indexes a single time.
+
+        :param tasks: iterable of (task_id, task) tuples.
+        """
+        tasks = dict(tasks)
+        for task_id in tasks:
+            if task_id in self._tasks:
+                self.remove(task_id)
+
+        for task_id, task in tasks.items():
+            key = self._index_key(task_id, task)
+            self._tasks[task_id] = task
+            self._keys[task_id] = key
+            self._index[bool(task.get("completed", False))].append(key)
+
+        for bucket in self._index.values():
+            bucket.sort()
+
+    def query(self, completed=None, limit=None, offset=0, order="priority"):
+        """
+        List tasks ordered by priority (lower first), then creation order.
+
+        :param completed: bool or None - Only return open (False) or completed (True) tasks.
+        :param limit: int or None - Maximum number of tasks to return.
+        :param offset: int - Number of tasks to skip.
+        :param order: str - "priority", or "insertion" to list the tasks in creation order.
+        :return: tuple - (list of tasks, total number of matching tasks).
+        :raises ValueError: If `limit` or `offset` is negative, or `order` is unknown.
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("limit and offset must not be negative.")
+        if order not in ("priority", "insertion"):
+            raise ValueError(f"Unknown order '{order}', expected 'priority' or 'insertion'.")
+        total = len(self._tasks) if completed is None else len(self._index[bool(completed)])
+        stop = None if limit is None else offset + limit
+
+        if order == "insertion":
+            # The dict keeps creation order, re-added tasks move to the end like in the index.
+            tasks = iter(self._tasks.values())
+            if completed is not None:
+                tasks = (task for task in tasks if bool(task.get("completed", False)) == bool(completed))
+            return list(islice(tasks, offset, stop)), total
+
+        if completed is None:
+            keys = heapq.merge(self._index[False], self._index[True])
+        else:
+            keys = iter(self._index[bool(completed)])
+        return [self._tasks[key[2]] for key in islice(keys, offset, stop)], total
+
+    def get(self, task_id, default=None):
+        return self._tasks.get(task_id, default)
+
+    def values(self):
+        return self._tasks.values()
+
+    def items(self):
+        return self._tasks.items()
+
+    def __getitem__(self, task_id):
+        return self._tasks[task_id]
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def __len__(self):
+        return len(self._tasks)
+
+
+def _flush_pending(adapter, lock, created, updated, deleted):
+    """
+    Write pending documents to an adapter, putting them back if it fails.
+
+    Updates are written as a delete and a re-add of the documents, batched
+    with the other deletions and creations, so a flush makes at most two
+    adapter calls. The pending dicts are emptied in place, so a finalizer
+    holding them (and not the buffer) always sees the current writes.
+    """
+    with lock:
+        batch = (list(created.values()), list(updated.values()), list(deleted))
+        created.clear()
+        updated.clear()
+        deleted.clear()
+
+    new, changed, removed = batch
+    try:
+        if removed or changed:
+            adapter.delete(removed + [document["key"] for document in changed])
+        if new or changed:
+            adapter.add_documents(new + changed)
+    except Exception:
+        with lock:
+            # Writes queued since the swap are newer and win over the failed batch.
+            for document in new:
+                key = document["key"]
+                if key in updated:
+                    created[key] = updated.pop(key)
+                elif key not in created and key not in deleted:
+                    created[key] = document
+            for document in changed:
+                key = document["key"]
+                if key not in created and key not in updated and key not in deleted:
+                    updated[key] = document
+            for key in removed:
+                if key not in created and key not in updated:
+                    deleted.add(key)
+        raise
+
+    return len(new) + len(changed) + len(removed)
+
+
+class WriteBehindBuffer:
+    """
+    Buffers adapter writes and flushes them in batches.
+
+    Consecutive writes to the same document are coalesced, so a task that is
+    created and updated several times before a flush is written once. A task
+    that is created and deleted before a flush never reaches the adapter.
+    Writes that fail stay buffered for the next flush. Pending writes are
+    flushed by `close`, when the buffer is garbage collected, or at exit.
+
+    Attributes:
+        adapter (DatabaseAdapter): The adapter receiving the writes.
+        batch_size (int): Number of pending documents that triggers a flush.
+    """
+
+    def __init__(self, adapter, batch_size=50):
+        self.adapter = adapter
+        self.batch_size = batch_size
+        self._created = {}  # key -> document, not yet persisted
+        self._updated = {}  # key -> document, persisted before
+        self._deleted = set()
+        self._lock = threading.Lock()
+        # Holds the pending dicts but not the buffer, so the buffer (and its tool) can be collected.
+        self._finalizer = weakref.finalize(
+            self, _flush_pending, adapter, self._lock, self._created, self._updated, self._deleted)
+
+    def __len__(self):
+        return len(self._created) + len(self._updated) + len(self._deleted)
+
+    def add(self, document):
+        """Queue a new document."""
+        with self._lock:
+            self._deleted.discard(document["key"])
+            self._created[document["key"]] = document
+        self._maybe_flush()
+
+    def update(self, document):
+        """Queue an update of a document, coalescing it with pending writes."""
+        with self._lock:
+            key = document["key"]
+            if key in self._created:
+                self._created[key] = document
+            else:
+                self._updated[key] = document
+        self._maybe_flush()
+
+    def delete(self, key):
+        """Queue the deletion of a document."""
+        with self._lock:
+            if self._created.pop(key, None) is None:
+                self._updated.pop(key, None)
+                self._deleted.add(key)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all pending documents to the adapter.
+
+        :return: int - Number of documents written or deleted.
+        :raises Exception: Whatever the adapter raised, the writes stay pending.
+        """
+        return _flush_pending(self.adapter, self._lock, self._created, self._updated, self._deleted)
+
+    def close(self):
+        """Flush the pending writes and detach the buffer from exit handling."""
+        written = self.flush()
+        self._finalizer.detach()
+        return written
@@ -25,6 +25,7 @@ class LangSwarmVotingTool(Tool):
         super().__init__(
             name="LangSwarm Voting",
             func=self.run,
+            coroutine=self.arun,
             description="A tool to enable voting-based decision-making among agents.",
             voting = LLMVoting(clients=agents, **kwargs)
         )
@@ -39,5 +40,16 @@ class LangSwarmVotingTool(Tool):
         Returns:
         - tuple: The consensus result, group size, and list of responses.
         """
-        self.voting.query = query
-        return self.voting.run()
+        return self.voting.run(query=query)
+
+    async def arun(self, query):
+        """
+        Asynchronously executes the voting workflow without blocking the event loop.
+
+        Parameters:
+        - query (str): The query to process.
+
+        Returns:
+        - tuple: The consensus result, group size, and list of responses.
+        """
+        return await self.voting.arun(query)
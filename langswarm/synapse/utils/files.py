@@ -0,0 +1,53 @@
+import os
+import stat
+import tempfile
+
+
+def _umask():
+    """The process umask, read without changing it where /proc allows."""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _umask()
+
+
+def _file_mode(path):
+    """Permissions for a file written over `path`: the replaced file's, or the defaults of a new file."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_atomic(path, write):
+    """
+    Write a file through a temporary file renamed over it.
+
+    Readers see either the old or the new file, never a partial write. The
+    file keeps the permissions of the file it replaces, a new file gets the
+    default ones (0o666 without the umask) rather than the temporary file's 0o600.
+
+    :param path: str - The file to write.
+    :param write: callable - `write(f)` writes the content to a binary file object.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+import tiktoken
+
+
+@lru_cache(maxsize=None)
+def _encoding(encoding_name):
+    return tiktoken.get_encoding(encoding_name)
+
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """Count the tokens of a text with tiktoken."""
+    return len(_encoding(encoding_name).encode(text, disallowed_special=()))
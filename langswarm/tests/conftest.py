@@ -0,0 +1,44 @@
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+
+def make_fake_encoder(embed=None):
+    """A MagicMock with an `encode` method, `embed(text)` is the row of one text, np.ones(2) by default."""
+    embed = embed or (lambda text: np.ones(2))
+
+    def encode(texts):
+        if isinstance(texts, str):
+            return np.asarray(embed(texts))
+        rows = [embed(text) for text in texts]
+        return np.array(rows) if rows else np.zeros((0, np.size(embed(""))))
+
+    return MagicMock(encode=MagicMock(side_effect=encode))
+
+class WordEncoder:
+    """Hashes words into a small vector, counts the texts it embeds and its calls."""
+
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, texts):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        self.calls += 1
+        self.texts += len(texts)
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(rows, texts):
+            for word in text.lower().split():
+                row[sum(map(ord, word)) % self.dim] += 1
+        return rows[0] if single else rows
+
+@pytest.fixture
+def fake_encoder():
+    """Factory of MagicMock encoders for swarms, see `make_fake_encoder`."""
+    return make_fake_encoder
+
+@pytest.fixture
+def word_encoder():
+    """Factory of `WordEncoder` embedding functions for tool registries and catalogs."""
+    return WordEncoder
@@ -0,0 +1,106 @@
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.voting import LLMVoting
+from langswarm.synapse.swarm.sampling import AdaptiveSampler, AgreementHistory, wilson_interval
+from unittest.mock import MagicMock
+import asyncio
+import numpy as np
+import pytest
+
+def paraphrase_row(text):
+    # "a..." answers are paraphrases of each other, every other answer is unique.
+    return [1.0] + [0.0] * 8 if text.startswith("a") else np.eye(9)[1 + len(text) % 8].tolist()
+
+def agents(answers):
+    return [MagicMock(chat=MagicMock(return_value=answer)) for answer in answers]
+
+def test_wilson_interval():
+    low, high = wilson_interval(3, 3, confidence=0.9)
+    assert 0.5 < low < 1.0 and high == 1.0
+    low, high = wilson_interval(5, 10, confidence=0.9)
+    assert low < 0.5 < high
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+@pytest.mark.parametrize("cls", [LLMConsensus, LLMVoting])
+def test_unanimous_answers_stop_after_the_first_round(cls, fake_encoder):
+    clients = agents(["a answer"] * 9)
+    swarm = cls(query="q", clients=clients, model=fake_encoder(paraphrase_row), sampler=AdaptiveSampler(confidence=0.9, initial=3))
+
+    result = swarm.run()
+    assert (result[0] if isinstance(result, tuple) else result) == "a answer"
+    assert sum(c.chat.call_count for c in clients) == 3
+    assert swarm.last_context.results["agents_asked"] == 3
+
+def test_disagreement_asks_more_agents_up_to_the_maximum(fake_encoder):
+    answers = ["a", "bb", "a1", "ccc", "a2", "dddd", "a3", "eeeee", "a4", "ffffff"]
+    clients = agents(answers)
+    swarm = LLMConsensus(query="q", clients=clients, model=fake_encoder(paraphrase_row),
+                         sampler=AdaptiveSampler(confidence=0.9, initial=3, margin=0.05, maximum=7))
+
+    swarm.run()
+    asked = sum(c.chat.call_count for c in clients)
+    assert 3 < asked <= 7
+    assert [c.chat.called for c in clients] == [True] * asked + [False] * (len(clients) - asked)
+
+def test_history_picks_the_starting_size_per_query_class(fake_encoder):
+    history = AgreementHistory()
+    for _ in range(3):
+        history.record("hard", 7, 0.4)
+    sampler = AdaptiveSampler(initial=3, history=history, classifier=lambda q: "hard" if "?" in q else "easy")
+
+    assert sampler.initial_size("why?") == 7
+    assert sampler.initial_size("hello") == 3
+    assert AgreementHistory.from_dict(history.to_dict()).stats("hard")["median_agents"] == 7
+
+    clients = agents(["a answer"] * 9)
+    LLMConsensus(query="why?", clients=clients, model=fake_encoder(paraphrase_row), sampler=sampler).run()
+    assert sum(c.chat.call_count for c in clients) == 7
+
+def test_adaptive_async_run(fake_encoder):
+    clients = agents(["a answer"] * 9)
+    swarm = LLMConsensus(query="q", clients=clients, model=fake_encoder(paraphrase_row), adaptive=True, confidence=0.9, minimum_bots=3)
+
+    assert asyncio.run(swarm.arun()) == "a answer"
+    assert sum(c.chat.call_count for c in clients) == 3
+
+@pytest.mark.parametrize("cls", [LLMConsensus, LLMVoting])
+def test_evaluation_reuses_the_sampling_embeddings(cls, fake_encoder):
+    model = fake_encoder(paraphrase_row)
+    swarm = cls(query="q", clients=agents(["a answer"] * 9), model=model, sampler=AdaptiveSampler(confidence=0.9, initial=3))
+    swarm.run()
+
+    encoded = sum(1 if isinstance(c.args[0], str) else len(c.args[0]) for c in model.encode.call_args_list)
+    assert encoded == 3
+
+def test_clients_from_llm_configs_are_leased_in_rounds(fake_encoder):
+    from langswarm.synapse.swarm.pool import ClientPool
+    from langswarm.synapse.swarm.swarm import Swarm
+
+    pool = ClientPool(factory=lambda config, prompt: MagicMock(chat=MagicMock(return_value="a answer")))
+    swarm = Swarm(query="q", llms=[{"provider": "stub", "model": "stub-1"}], model=fake_encoder(paraphrase_row), client_pool=pool,
+                  requirements=["Answer."], sampler=AdaptiveSampler(confidence=0.9, initial=3, maximum=9))
+    swarm.classify_requirements = lambda requirements: ([], [])
+    swarm.run()
+
+    assert pool.metrics.leases == 3
+    assert swarm.last_context.results["agents_asked"] == 3
+    assert len(swarm.last_context.clients) == 3 and swarm.clients == []
+
+def test_concurrent_adaptive_runs_from_llm_configs_keep_their_clients(fake_encoder):
+    from concurrent.futures import ThreadPoolExecutor
+    from langswarm.synapse.swarm.pool import ClientPool
+    from langswarm.synapse.swarm.swarm import Swarm
+
+    pool = ClientPool(factory=lambda config, prompt: MagicMock(chat=MagicMock(return_value="a answer")))
+    swarm = Swarm(query="q", llms=[{"provider": "stub", "model": "stub-1"}], model=fake_encoder(paraphrase_row),
+                  client_pool=pool, requirements=["Answer."], sampler=AdaptiveSampler(confidence=0.9, initial=3, maximum=9))
+    swarm.classify_requirements = lambda requirements: ([], [])
+
+    def run(i):
+        context = swarm.new_context(f"q{i}")
+        swarm.run(context=context)
+        return context
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        contexts = list(executor.map(run, range(4)))
+    assert all(len(c.clients) == len(c.paragraphs) == 3 for c in contexts)
+    assert swarm.clients == []
@@ -0,0 +1,119 @@
+from langswarm.synapse.swarm.aggregation import LLMAggregation
+from langswarm.synapse.swarm.branching import LLMBranching
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.routing import LLMRouting
+from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch):
+    model = MagicMock()
+    model.encode.side_effect = lambda texts: np.array(
+        [[1.0, 0.0] if "yes" in t else [0.0, 1.0] for t in ([texts] if isinstance(texts, str) else texts)]
+    )
+    monkeypatch.setattr("langswarm.synapse.embeddings.encoders.SentenceTransformer", MagicMock(return_value=model))
+    return model
+
+def slow_agent(answer, delay=0.1):
+    agent = MagicMock()
+    agent.chat.side_effect = lambda q, erase_query=False: time.sleep(delay) or f"{answer}: {q}"
+    return agent
+
+def test_agents_are_called_concurrently():
+    swarm = LLMBranching(query="q", clients=[slow_agent(f"a{i}") for i in range(4)])
+    start = time.perf_counter()
+    responses = asyncio.run(swarm.arun())
+    assert time.perf_counter() - start < 0.3
+    assert responses == ["a0: q", "a1: q", "a2: q", "a3: q"]
+
+def test_overlapping_runs_keep_their_own_queries():
+    swarm = LLMBranching(query="default", clients=[slow_agent("a", 0.05), slow_agent("b", 0.05)])
+
+    async def main():
+        return await asyncio.gather(swarm.arun("first"), swarm.arun("second"))
+
+    first, second = asyncio.run(main())
+    assert first == ["a: first", "b: first"]
+    assert second == ["a: second", "b: second"]
+
+def test_calls_to_one_client_are_serialized():
+    active, overlaps = [], []
+    lock = threading.Lock()
+
+    def chat(q, erase_query=False):
+        with lock:
+            active.append(q)
+            overlaps.append(len(active))
+        time.sleep(0.02)
+        with lock:
+            active.remove(q)
+        return q
+
+    agent = MagicMock()
+    agent.chat.side_effect = chat
+    swarm = LLMBranching(query="q", clients=[agent])
+
+    async def main():
+        return await asyncio.gather(*(swarm.arun(str(i)) for i in range(4)))
+
+    asyncio.run(main())
+    assert max(overlaps) == 1
+
+def test_native_achat_is_awaited():
+    agent = MagicMock()
+    agent.achat = AsyncMock(return_value="yes")
+    swarm = LLMBranching(query="q", clients=[agent])
+    assert asyncio.run(swarm.arun()) == ["yes"]
+    agent.chat.assert_not_called()
+
+def test_consensus_arun():
+    swarm = LLMConsensus(query="q", clients=[slow_agent("yes", 0), slow_agent("yes too", 0), slow_agent("no", 0)])
+    assert asyncio.run(swarm.arun()).startswith("yes")
+
+def test_aggregation_arun_takes_the_helper_bot_first():
+    hb = MagicMock()
+    hb.aggregator_bot.chat.return_value = "merged"
+    agents = [slow_agent("a", 0), slow_agent("b", 0)]
+    swarm = LLMAggregation(query="default", clients=agents)
+    assert asyncio.run(swarm.arun(hb, "q")) == swarm.run(hb, "q") == "merged"
+    assert "a: q" in hb.aggregator_bot.chat.call_args.kwargs["q"]
+
+def test_routing_arun_regular_route():
+    bot = slow_agent("main", 0)
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="default")
+    assert asyncio.run(routing.arun("hello")) == "main: hello"
+    bot.add_response.assert_called_once_with("main: hello")
+
+def test_routing_arun_loads_the_encoder_off_the_event_loop(monkeypatch, encoder):
+    threads = []
+
+    def load(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return encoder
+
+    monkeypatch.setattr("langswarm.synapse.embeddings.encoders.SentenceTransformer", load)
+    agents = [slow_agent("yes", 0), slow_agent("yes too", 0), slow_agent("no", 0)]
+    routing = LLMRouting(route=2, bots=agents, main_bot=None, query="default")
+
+    async def main():
+        return threading.get_ident(), await routing.arun("q"), await routing.arun("q")
+
+    loop_thread, first, second = asyncio.run(main())
+    assert first.startswith("yes") and second.startswith("yes")
+    assert len(threads) == 1 and threads[0] != loop_thread
+    assert routing.model is encoder
+
+def test_chain_and_tool_async_entry_points():
+    from langswarm.synapse.chains.branching_chain import BranchingChain
+    from langswarm.synapse.tools.branching_tool import LangSwarmBranchingTool
+
+    agents = [slow_agent("a", 0), slow_agent("b", 0)]
+    chain = BranchingChain(agents=agents, query="default")
+    assert asyncio.run(chain.ainvoke({"query": "q"}))["responses"] == ["a: q", "b: q"]
+
+    tool = LangSwarmBranchingTool(agents=agents, query="default")
+    assert asyncio.run(tool.arun("q")) == ["a: q", "b: q"]
@@ -0,0 +1,47 @@
+from langswarm.synapse.tools.chunking import FileChunker
+
+def words(text):
+    return len(text.split())
+
+SOURCE = '''import os
+import sys
+
+
+def first(a):
+    return a + 1
+
+
+@decorator
+def second(b):
+    value = b * 2
+    return value
+
+
+class Third:
+    def method(self):
+        return "a b c"
+'''
+
+def test_small_files_are_a_single_chunk():
+    chunks = FileChunker(max_tokens=1000, token_counter=words).chunk(SOURCE, "module.py")
+    assert len(chunks) == 1
+    assert (chunks[0].start_line, chunks[0].end_line) == (1, 17)
+
+def test_python_files_split_on_top_level_statements():
+    chunks = FileChunker(max_tokens=12, token_counter=words).chunk(SOURCE, "module.py")
+    assert "".join(c.text for c in chunks) == SOURCE
+    starts = [c.text.lstrip().split()[0] for c in chunks]
+    assert starts == ["import", "@decorator", "class"]
+    assert chunks[1].start_line == 9
+
+def test_edits_only_change_the_affected_chunk():
+    chunker = FileChunker(max_tokens=12, token_counter=words)
+    before = chunker.chunk(SOURCE, "module.py")
+    after = chunker.chunk(SOURCE.replace("b * 2", "b * 3"), "module.py")
+    assert [a.hash == b.hash for a, b in zip(before, after)] == [True, False, True]
+
+def test_other_files_split_between_lines():
+    text = "".join(f"line {i} of text\n" for i in range(10))
+    chunks = FileChunker(max_tokens=8, token_counter=words).chunk(text, "notes.md")
+    assert [(c.start_line, c.end_line) for c in chunks] == [(1, 2), (3, 4), (5, 6), (7, 8), (9, 10)]
+    assert "".join(c.text for c in chunks) == text
@@ -0,0 +1,142 @@
+from langswarm.synapse.swarm.pool import ClientPool
+from langswarm.synapse.swarm.swarm import Swarm
+from unittest.mock import MagicMock
+import threading
+import time
+import pytest
+
+class StubClient:
+    """A local stub provider, opens its 'HTTP session' on the first call."""
+
+    def __init__(self, llm_config, system_prompt):
+        self.config = llm_config
+        self.system_prompt = system_prompt
+        self.sessions = 0
+        self.in_memory = []
+
+    def chat(self, q="", erase_query=False, **kwargs):
+        if not self.sessions:
+            self.sessions += 1
+        self.in_memory.append(q)
+        return f"{self.config['model']}: {q}"
+
+    def reset(self):
+        self.in_memory = []
+
+CONFIG = {"provider": "stub", "model": "stub-1", "key": None}
+
+def test_swarm_runs_reuse_pooled_clients(fake_encoder):
+    created = []
+    pool = ClientPool(factory=lambda config, prompt: created.append(StubClient(config, prompt)) or created[-1])
+    swarm = Swarm(query="q", llms=[CONFIG], minimum_bots=3, requirements=["Answer."], model=fake_encoder(), client_pool=pool)
+    swarm.classify_requirements = lambda requirements: ([], [])
+
+    swarm.run("first")
+    swarm.run("second")
+
+    assert len(created) == 3
+    assert sum(client.sessions for client in created) == 3
+    assert all(client.in_memory == [] for client in created)
+    assert swarm.paragraphs == ["stub-1: second"] * 3
+    metrics = pool.metrics.to_dict()
+    assert metrics["leases"] == 6 and metrics["hits"] == 3 and metrics["created"] == 3
+    assert pool.idle_count() == 3
+
+def test_concurrent_runs_lease_their_own_clients(fake_encoder):
+    from concurrent.futures import ThreadPoolExecutor
+
+    class SlowClient(StubClient):
+        def chat(self, q="", erase_query=False, **kwargs):
+            time.sleep(0.01)
+            return super().chat(q, erase_query, **kwargs)
+
+    pool = ClientPool(factory=SlowClient)
+    swarm = Swarm(query="q", llms=[CONFIG], minimum_bots=10, requirements=["Answer."], model=fake_encoder(), client_pool=pool)
+    swarm.classify_requirements = lambda requirements: ([], [])
+
+    def run(i):
+        context = swarm.new_context(f"query {i}")
+        swarm.run(context=context)
+        return context
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        contexts = list(executor.map(run, range(4)))
+
+    assert [len(c.paragraphs) for c in contexts] == [10] * 4
+    assert [len(c.clients) for c in contexts] == [10] * 4
+    assert swarm.clients == [] and not any(c.leases for c in contexts)
+
+def test_clients_are_keyed_by_system_prompt():
+    pool = ClientPool(factory=StubClient)
+    client = pool.acquire(CONFIG, "be brief")
+    pool.release(client)
+
+    assert pool.acquire(CONFIG, "be verbose") is not client
+    assert pool.acquire(CONFIG, "be brief") is client
+
+def test_clients_are_keyed_by_api_key():
+    pool = ClientPool(factory=StubClient)
+    client = pool.acquire(dict(CONFIG, key="tenantA"))
+    pool.release(client)
+
+    other = pool.acquire(dict(CONFIG, key="tenantB"))
+    assert other is not client and other.config["key"] == "tenantB"
+    assert pool.acquire(dict(CONFIG, key="tenantA")) is client
+
+def test_leases_wait_for_a_release_beyond_max_per_key():
+    pool = ClientPool(factory=StubClient, max_per_key=1)
+    client = pool.acquire(CONFIG)
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(CONFIG, timeout=0.01)
+
+    threading.Timer(0.05, pool.release, args=(client,)).start()
+    assert pool.acquire(CONFIG, timeout=5) is client
+    assert pool.metrics.waits == 2 and pool.metrics.timeouts == 1 and pool.metrics.wait_time > 0
+
+def test_a_release_wakes_the_waiter_of_its_key():
+    pool = ClientPool(factory=StubClient, max_per_key=1)
+    config_a, config_b = CONFIG, dict(CONFIG, model="stub-2")
+    a, b = pool.acquire(config_a), pool.acquire(config_b)
+    leased = {}
+
+    # A B waiter queues before an A waiter, releasing A must still wake the A waiter.
+    waiter_b = threading.Thread(target=lambda: leased.setdefault("b", pool.acquire(config_b, timeout=2)))
+    waiter_b.start()
+    time.sleep(0.05)
+    waiter_a = threading.Thread(target=lambda: leased.setdefault("a", pool.acquire(config_a, timeout=2)))
+    waiter_a.start()
+    time.sleep(0.05)
+
+    pool.release(a)
+    waiter_a.join(3)
+    assert leased.get("a") is a
+    pool.release(b)
+    waiter_b.join(3)
+    assert leased.get("b") is b
+
+def test_idle_clients_are_evicted_after_the_timeout():
+    now = [0.0]
+    pool = ClientPool(factory=StubClient, idle_timeout=10, clock=lambda: now[0])
+    pool.release(pool.acquire(CONFIG))
+    now[0] = 11.0
+
+    assert pool.evict_idle() == 1
+    assert pool.idle_count() == 0
+    pool.acquire(CONFIG)
+    assert pool.metrics.created == 2 and pool.metrics.evicted == 1
+
+def test_failed_leases_discard_the_client():
+    pool = ClientPool(factory=StubClient, max_per_key=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease(CONFIG):
+            raise RuntimeError("call failed")
+
+    assert pool.idle_count() == 0 and pool.metrics.discarded == 1
+    with pool.lease(CONFIG, timeout=0.1) as client:
+        assert client.in_memory == []
+
+    failing = ClientPool(factory=MagicMock(side_effect=OSError("no network")), max_per_key=1)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            failing.acquire(CONFIG, timeout=0.1)
@@ -0,0 +1,107 @@
+from langswarm.synapse.swarm.conversation import ConversationState, ConversationView
+from langswarm.synapse.swarm.consensus import LLMConsensus
+import time
+import tracemalloc
+import pytest
+
+def messages(n, start=0):
+    return [{"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 20} for i in range(start, start + n)]
+
+class MemoryClient:
+    """A stub client with the memory handling of langswarm-core's LLM."""
+
+    def __init__(self):
+        self.in_memory = [{"role": "system", "content": "Be brief."}]
+        self.seen = None
+
+    def set_memory(self, memory, clear=True):
+        self.in_memory = [self.in_memory[0]] + memory if self.in_memory else memory
+
+    def chat(self, q="", erase_query=False, **kwargs):
+        self.in_memory.append({"role": "user", "content": q})
+        self.seen = list(self.in_memory)
+        if erase_query:
+            del self.in_memory[-1]
+        return "answer"
+
+def test_states_are_persistent_and_share_their_prefix():
+    root = ConversationState(messages(3))
+    left = root.append({"role": "user", "content": "left"})
+    right = root.extend(messages(2, start=3))
+
+    assert len(root) == 3 and len(left) == 4 and len(right) == 5
+    assert list(left)[:3] == list(root) == list(right)[:3]
+    assert left[-1]["content"] == "left" and right[4] == messages(5)[4]
+    assert left.parent is root and right.parent is root
+    assert ConversationState(list(right)).fingerprint == right.fingerprint
+    assert left.fingerprint != right.fingerprint
+
+def test_token_counts_are_cached_per_segment():
+    calls = []
+    counter = lambda text: calls.append(text) or len(text.split())
+    state = ConversationState(messages(4))
+
+    total = state.token_count(counter)
+    assert total == sum(len(m["content"].split()) + 4 for m in messages(4))
+    assert len(calls) == 4
+    grown = state.append({"role": "user", "content": "one two"})
+    assert grown.token_count(counter) == total + 6
+    assert len(calls) == 5
+    assert state.token_count(counter) == total and len(calls) == 5
+
+def test_views_copy_on_write():
+    state = ConversationState(messages(3))
+    view = [{"role": "system", "content": "s"}] + state.view()
+    other = state.view()
+
+    assert isinstance(view, ConversationView) and view.base is state
+    view.append({"role": "user", "content": "q"})
+    assert len(view) == 5 and len(other) == 3 and view.base is state
+    del view[-1]
+    assert view == [{"role": "system", "content": "s"}] + messages(3)
+
+    view[2] = {"role": "user", "content": "edited"}
+    assert view[2]["content"] == "edited" and list(state) == messages(3) and list(other) == messages(3)
+    assert state.view().freeze() is state
+    assert other.freeze() is state and len(state.view().freeze()) == 3
+
+def test_views_scale_with_the_shared_history():
+    state = ConversationState(messages(2000))
+    history = list(state)
+
+    tracemalloc.start()
+    copies = [[{"role": "system", "content": "s"}] + history for _ in range(50)]
+    copied = tracemalloc.get_traced_memory()[0]
+    del copies
+    tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    views = [[{"role": "system", "content": "s"}] + state.view() for _ in range(50)]
+    shared = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    assert len(views) == 50 and shared * 20 < copied
+
+def test_swarm_hands_every_agent_a_view_of_the_state(fake_encoder):
+    clients = [MemoryClient() for _ in range(3)]
+    encoder = fake_encoder()
+    swarm = LLMConsensus(query="q", clients=clients, state=messages(4), model=encoder)
+
+    assert isinstance(swarm.state, ConversationState)
+    swarm.run("question")
+    for client in clients:
+        assert client.in_memory.base is swarm.state
+        assert client.seen == [{"role": "system", "content": "Be brief."}] + messages(4) + [{"role": "user", "content": "question"}]
+    assert list(swarm.state) == messages(4)
+
+def test_long_append_chains_hash_and_index_in_linear_time():
+    state = ConversationState()
+    for i in range(5000):
+        state = state.append({"role": "user", "content": str(i)})
+
+    assert state.fingerprint == ConversationState(list(state)).fingerprint
+    started = time.perf_counter()
+    assert [state[i]["content"] for i in range(len(state))] == [str(i) for i in range(5000)]
+    assert time.perf_counter() - started < 0.5
+    assert state[-1]["content"] == "4999" and state[10:12] == [{"role": "user", "content": "10"}, {"role": "user", "content": "11"}]
+    with pytest.raises(IndexError):
+        state[5000]
@@ -0,0 +1,98 @@
+from langswarm.synapse.tools.files.dirindex import DirectoryIndex
+import os
+import pytest
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hi')")
+    (tmp_path / "src" / "util.py").write_text("")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "index.md").write_text("# Docs")
+    (tmp_path / "notes.txt").write_text("notes")
+    return tmp_path
+
+@pytest.fixture
+def index(tree):
+    return DirectoryIndex(str(tree), ttl=0, watch=False)
+
+def paths(result):
+    return [rel for rel, _ in result[0]]
+
+def test_lists_top_level(index):
+    assert paths(index.list()) == ["docs", "notes.txt", "src"]
+
+def test_recursive_listing_with_sizes(index):
+    entries, total = index.list(recursive=True)
+    assert total == 6
+    sizes = {rel: entry.size for rel, entry in entries}
+    assert sizes[os.path.join("src", "main.py")] == len("print('hi')")
+
+def test_filters_and_pagination(index):
+    assert paths(index.list(recursive=True, extensions=".py")) == [os.path.join("src", "main.py"), os.path.join("src", "util.py")]
+    assert paths(index.list(recursive=True, pattern="*.md")) == [os.path.join("docs", "index.md")]
+    page, total = index.list(recursive=True, include_dirs=False, offset=1, limit=2)
+    assert total == 4
+    assert [rel for rel, _ in page] == ["notes.txt", os.path.join("src", "main.py")]
+
+def test_subdirectory_listing(index):
+    assert paths(index.list("src")) == [os.path.join("src", "main.py"), os.path.join("src", "util.py")]
+    with pytest.raises(FileNotFoundError):
+        index.list("missing")
+
+def test_incremental_refresh_only_rescans_changed_dirs(index, tree, monkeypatch):
+    index.list(recursive=True)
+    (tree / "src" / "new.py").write_text("")
+    (tree / "docs" / "index.md").unlink()
+    (tree / "docs").rmdir()
+
+    scanned = []
+    original = index._scan
+    monkeypatch.setattr(index, "_scan", lambda rel: scanned.append(rel) or original(rel))
+
+    result = paths(index.list(recursive=True))
+    assert os.path.join("src", "new.py") in result
+    assert "docs" not in result
+    assert sorted(scanned) == ["", "src"]
+
+def test_invalidate_marks_directory_dirty(tree):
+    index = DirectoryIndex(str(tree), ttl=3600, watch=False)
+    assert "extra.txt" not in paths(index.list())
+    (tree / "extra.txt").write_text("")
+    index.invalidate(str(tree))
+    assert "extra.txt" in paths(index.list())
+
+def test_directories_past_the_watch_limit_are_polled(tree, monkeypatch):
+    from unittest.mock import MagicMock
+    from langswarm.synapse.tools.files import dirindex
+
+    monkeypatch.setattr(dirindex, "inotify_flags", MagicMock(), raising=False)
+
+    index = DirectoryIndex(str(tree), ttl=0, watch=False)
+    index._inotify = MagicMock()
+    index._inotify.add_watch.side_effect = OSError(28, "No space left on device")
+    index._inotify.read.return_value = []
+    index.list(recursive=True)
+
+    (tree / "src" / "new.py").write_text("")
+    assert os.path.join("src", "new.py") in paths(index.list(recursive=True))
+
+def test_close_releases_inotify(tree, monkeypatch):
+    from unittest.mock import MagicMock
+    from langswarm.synapse.tools.files import dirindex
+
+    monkeypatch.setattr(dirindex, "inotify_flags", MagicMock(), raising=False)
+
+    index = DirectoryIndex(str(tree), ttl=0, watch=False)
+    inotify = index._inotify = MagicMock()
+    inotify.read.return_value = []
+    index.list()
+    index.close()
+    inotify.close.assert_called_once()
+
+    (tree / "extra.txt").write_text("")
+    assert "extra.txt" in paths(index.list())
+
+def test_negative_pagination_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.list(offset=-1)
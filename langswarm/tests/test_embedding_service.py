@@ -0,0 +1,112 @@
+from langswarm.synapse.embeddings.service import EmbeddingService, ProcessEmbeddingService
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import asyncio
+import multiprocessing
+import threading
+import time
+import numpy as np
+import pytest
+
+class LengthEncoder:
+    """Embeds a sentence as [len, 1], records the size of every encode call."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def encode(self, sentences, **kwargs):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(len(sentences))
+        return np.array([[float(len(s)), 1.0] for s in sentences])
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+class DyingEncoder(LengthEncoder):
+    """Kills the encoder process on the first encode call."""
+
+    def encode(self, sentences, **kwargs):
+        import os
+        os._exit(3)
+
+def test_concurrent_requests_are_coalesced():
+    encoder = LengthEncoder(delay=0.01)
+    with EmbeddingService(encoder, max_batch_size=64, max_wait=0.05) as service:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(service.encode, [["a" * i, "b"] for i in range(1, 9)]))
+
+    assert [r[0][0] for r in results] == list(range(1, 9))
+    assert all(r[1].tolist() == [1.0, 1.0] for r in results)
+    metrics = service.metrics.to_dict()
+    assert metrics["requests"] == 8 and metrics["sentences"] == 16
+    assert metrics["batches"] == len(encoder.calls) < 8
+    # "b" is encoded once per batch.
+    assert metrics["encoded"] == sum(encoder.calls) < 16
+    assert sum(size * count for size, count in metrics["batch_sizes"].items()) == 16
+
+def test_batches_are_flushed_at_max_batch_size():
+    encoder = LengthEncoder()
+    with EmbeddingService(encoder, max_batch_size=2, max_wait=10.0) as service:
+        started = time.perf_counter()
+        assert service.encode(["x", "yy"]).shape == (2, 2)
+        assert service.encode(["abc", "d"])[0].tolist() == [3.0, 1.0]
+        assert time.perf_counter() - started < 5.0
+
+def test_errors_are_delivered_to_every_caller_of_the_batch():
+    encoder = MagicMock()
+    encoder.encode.side_effect = ValueError("encoder failed")
+    with EmbeddingService(encoder, max_wait=0.05) as service:
+        futures = [service.submit("a"), service.submit(["b", "c"])]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+def test_fan_out_errors_reach_the_callers():
+    encoder = MagicMock()
+    encoder.encode.return_value = np.zeros((0, 2))  # Too few rows for the batch.
+    with EmbeddingService(encoder, max_wait=0.01) as service:
+        with pytest.raises(IndexError):
+            service.submit(["a", "b"]).result(timeout=5)
+        encoder.encode.return_value = np.ones((1, 2))
+        assert service.encode("a").tolist() == [1.0, 1.0]
+
+def test_async_api_and_swarm_integration():
+    encoder = LengthEncoder()
+    with EmbeddingService(encoder, max_wait=0.02) as service:
+        async def encode_all():
+            return await asyncio.gather(*(service.aencode("a" * i) for i in range(1, 5)))
+
+        assert [e[0] for e in asyncio.run(encode_all())] == [1.0, 2.0, 3.0, 4.0]
+
+        clients = [MagicMock(chat=MagicMock(return_value=p)) for p in ("same answer", "same answer", "other")]
+        swarm = LLMConsensus(query="q", clients=clients, model=service)
+        assert swarm.run() == "same answer"
+
+    with pytest.raises(RuntimeError):
+        service.encode("closed")
+
+def test_process_service_returns_embeddings_through_shared_memory():
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessEmbeddingService(encoder_factory=LengthEncoder, max_wait=0.05, start_method=start_method) as service:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(service.encode, [["a" * i] * 3 for i in range(1, 5)]))
+        assert service.encode("abcd").tolist() == [4.0, 1.0]
+
+    assert [r[:, 0].tolist() for r in results] == [[float(i)] * 3 for i in range(1, 5)]
+    assert service.metrics.to_dict()["sentences"] == 13
+
+def test_process_service_fails_pending_requests_when_the_process_dies():
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    service = ProcessEmbeddingService(encoder_factory=DyingEncoder, max_wait=0.01, start_method=start_method)
+    service.poll_interval = 0.05
+    try:
+        with pytest.raises(RuntimeError, match="exited with code 3"):
+            service.submit(["a"]).result(timeout=10)
+        with pytest.raises(RuntimeError):
+            service.encode("b")
+    finally:
+        service.close()
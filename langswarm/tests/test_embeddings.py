@@ -0,0 +1,107 @@
+from langswarm.synapse.embeddings.storage import cosine_similarity, to_storage
+from langswarm.synapse.registry.tools import ToolRegistry
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+
+PARAGRAPHS = [
+    "Renewable energy comes from sources that are naturally replenished, like sunlight and wind.",
+    "Renewable energy is energy from naturally replenished sources such as wind and sunlight.",
+    "Energy from renewable sources, such as the sun and the wind, is naturally replenished.",
+    "Fossil fuels like coal and oil are the main source of electricity in most countries.",
+    "Nuclear power plants generate electricity through fission of uranium atoms.",
+]
+
+def bag_of_words(texts):
+    vocabulary = sorted({w for t in PARAGRAPHS for w in t.lower().split()})
+    def embed(text):
+        words = text.lower().split()
+        return np.array([words.count(w) for w in vocabulary], dtype=np.float32)
+    return embed(texts) if isinstance(texts, str) else np.stack([embed(t) for t in texts])
+
+def test_to_storage_reduces_memory_and_keeps_similarities():
+    embeddings = np.random.default_rng(0).normal(size=(20, 384)).astype(np.float32)
+    reference = cosine_similarity(embeddings, embeddings)
+
+    for dtype, itemsize, tolerance in (("float16", 2, 1e-3), ("int8", 1, 2e-2)):
+        stored = to_storage(embeddings, dtype)
+        assert stored.dtype.itemsize == itemsize
+        assert np.abs(cosine_similarity(stored, stored) - reference).max() < tolerance
+
+    with pytest.raises(ValueError):
+        to_storage(embeddings, "int4")
+
+def test_cosine_similarity_shapes():
+    assert cosine_similarity([1.0, 0.0], [[1.0, 0.0], [0.0, 2.0]]).tolist() == [[1.0, 0.0]]
+    assert cosine_similarity(np.zeros((0, 2)), [[1.0, 0.0]]).shape == (0, 1)
+    assert cosine_similarity([0.0, 0.0], [1.0, 0.0]).tolist() == [[0.0]]
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_consensus_is_unchanged_by_embedding_dtype(dtype):
+    def agents():
+        return [MagicMock(chat=MagicMock(return_value=p)) for p in PARAGRAPHS]
+
+    encoder = MagicMock(encode=MagicMock(side_effect=bag_of_words))
+    reference = LLMConsensus(query="What is renewable energy?", clients=agents(), model=encoder)
+    compact = LLMConsensus(query="What is renewable energy?", clients=agents(), model=encoder, embedding_dtype=dtype)
+
+    assert compact.run() == reference.run()
+    assert compact.last_context.embeddings.dtype == np.dtype(dtype)
+
+def test_tool_registry_stores_embeddings_in_dtype():
+    registry = ToolRegistry(embedding_model=bag_of_words, embedding_dtype="int8")
+    for i, description in enumerate(PARAGRAPHS[:2] + PARAGRAPHS[3:]):
+        registry.register_tool(MagicMock(identifier=f"tool{i}", description=description, instruction=""))
+
+    assert all(e.dtype == np.int8 for e in registry.embeddings.values())
+    assert registry.search_tools("Nuclear power plants generate electricity", top_k=1)[0]["name"] == "tool3"
+
+def test_onnx_backend_matches_torch_consensus():
+    pytest.importorskip("onnxruntime")
+    from langswarm.synapse.embeddings.encoders import load_encoder
+
+    try:
+        torch_encoder = load_encoder("all-MiniLM-L6-v2", backend="torch")
+        onnx_encoders = [load_encoder("all-MiniLM-L6-v2", backend="onnx", quantize=q) for q in (False, True)]
+    except OSError as e:
+        pytest.skip(f"Model not available: {e}")
+
+    reference = torch_encoder.encode(PARAGRAPHS)
+    for encoder, tolerance in zip(onnx_encoders, (1e-3, 5e-2)):
+        embeddings = encoder.encode(PARAGRAPHS)
+        assert np.abs(cosine_similarity(embeddings, embeddings) - cosine_similarity(reference, reference)).max() < tolerance
+
+        results = []
+        for model in (torch_encoder, encoder):
+            swarm = LLMConsensus(
+                query="What is renewable energy?",
+                clients=[MagicMock(chat=MagicMock(return_value=p)) for p in PARAGRAPHS],
+                model=model,
+            )
+            results.append(swarm.run())
+        assert results[0] == results[1]
+
+@pytest.mark.parametrize("supports_dynamo", [False, True])
+def test_onnx_export_only_passes_dynamo_when_supported(tmp_path, monkeypatch, supports_dynamo):
+    torch = pytest.importorskip("torch")
+    import transformers
+    from langswarm.synapse.embeddings.encoders import OnnxEncoder
+
+    calls = []
+
+    def export(model, args, f, input_names=None, output_names=None, dynamic_axes=None, opset_version=None):
+        calls.append({})
+
+    def export_with_dynamo(model, args, f, input_names=None, output_names=None, dynamic_axes=None, opset_version=None,
+                           dynamo=True):
+        calls.append({"dynamo": dynamo})
+
+    monkeypatch.setattr(torch.onnx, "export", export_with_dynamo if supports_dynamo else export)
+    monkeypatch.setattr(transformers.AutoModel, "from_pretrained", MagicMock())
+    encoder = object.__new__(OnnxEncoder)
+    encoder._repo = "repo"
+    encoder.tokenizer = MagicMock(return_value={"input_ids": None, "attention_mask": None})
+
+    encoder._export(str(tmp_path / "model.onnx"))
+    assert calls == [{"dynamo": False} if supports_dynamo else {}]
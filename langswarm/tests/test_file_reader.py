@@ -0,0 +1,56 @@
+from langswarm.synapse.tools.files.reader import FileReader
+import os
+import pytest
+
+@pytest.fixture
+def reader():
+    return FileReader()
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)), encoding="utf-8")
+    return str(path)
+
+def test_read_lines(reader, log_file):
+    assert reader.read_lines(log_file, 0, 2) == "line 1\nline 2\n"
+    assert reader.read_lines(log_file, 98) == "line 99\nline 100\n"
+    assert reader.read_lines(log_file, 200, 300) == ""
+
+def test_read_bytes(reader, log_file):
+    assert reader.read_bytes(log_file, 0, 4) == "line"
+    assert reader.read_bytes(log_file, 7, 13) == "line 2"
+
+def test_head_and_tail(reader, log_file):
+    assert reader.head(log_file, 2) == "line 1\nline 2\n"
+    assert reader.tail(log_file, 2) == "line 99\nline 100\n"
+    assert reader.tail(log_file, 500).startswith("line 1\n")
+
+def test_read_chunk_iterates_whole_file(reader, log_file):
+    offset, chunks = 0, []
+    while offset is not None:
+        content, offset, _ = reader.read_chunk(log_file, offset, chunk_size=64)
+        assert content.endswith("\n")
+        chunks.append(content)
+    assert len(chunks) > 1
+    assert "".join(chunks) == open(log_file, encoding="utf-8").read()
+
+def test_line_index_cached_and_invalidated(reader, log_file):
+    index = reader.line_index(log_file)
+    assert len(index) == 100
+    assert reader.line_index(log_file) is index
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("line 101")
+    os.utime(log_file, ns=(index.mtime_ns + 10**9, index.mtime_ns + 10**9))
+
+    assert len(reader.line_index(log_file)) == 101
+    assert reader.read_lines(log_file, 100) == "line 101"
+
+def test_empty_file(reader, tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert reader.read_lines(str(path), 0) == ""
+    assert reader.head(str(path)) == ""
+    assert reader.tail(str(path)) == ""
+    assert reader.read_chunk(str(path))[:2] == ("", None)
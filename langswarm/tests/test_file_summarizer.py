@@ -0,0 +1,155 @@
+from langswarm.synapse.tools.file_summarizer import FileSummarizer
+from unittest.mock import MagicMock
+import hashlib
+import threading
+import time
+import pytest
+
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class FakeAdapter:
+    def __init__(self, files):
+        self.files = files
+        self.queries = []
+        self.batches = []
+
+    def query(self, query):
+        self.queries.append(query)
+        ids = query["id"]["$in"] if isinstance(query["id"], dict) else [query["id"]]
+        return [dict(self.files[i], id=i) for i in ids if i in self.files]
+
+    def add_metadata_batch(self, writes):
+        self.batches.append(writes)
+        for file_id, metadata in writes:
+            self.files[file_id].setdefault("metadata", {}).update(metadata)
+
+@pytest.fixture
+def llm_agent():
+    agent = MagicMock()
+    agent.run.side_effect = lambda prompt: f"summary of {prompt.split()[-1]}"
+    return agent
+
+@pytest.fixture
+def adapter():
+    return FakeAdapter({
+        "a": {"text": "alpha", "metadata": {"summary": "old a", "summary_hash": digest("alpha")}},
+        "b": {"text": "beta", "metadata": {"summary": "old b", "summary_hash": digest("stale")}},
+        "c": {"text": "gamma"},
+    })
+
+def test_use_batch_skips_unchanged_files(adapter, llm_agent):
+    results = FileSummarizer(llm_agent).use_batch(adapter, ["a", "b", "c", "missing"])
+
+    assert [r["status"] for r in results] == ["unchanged", "summarized", "summarized", "missing"]
+    assert results[0]["summary"] == "old a"
+    assert llm_agent.run.call_count == 2
+    assert adapter.queries[1:] == [{"id": "missing"}]
+    assert adapter.batches == [[
+        ("b", {"summary": "summary of beta", "summary_hash": digest("beta")}),
+        ("c", {"summary": "summary of gamma", "summary_hash": digest("gamma")}),
+    ]]
+
+    # Nothing changed since the last run.
+    llm_agent.run.reset_mock()
+    statuses = [r["status"] for r in FileSummarizer(llm_agent).use_batch(adapter, ["a", "b", "c"])]
+    assert statuses == ["unchanged"] * 3
+    llm_agent.run.assert_not_called()
+
+def test_use_batch_reports_errors_and_falls_back_to_single_queries(llm_agent):
+    adapter = MagicMock(spec=["query", "add_metadata"])
+    adapter.query.side_effect = lambda q: [{"text": q["id"]}] if isinstance(q["id"], str) else []
+    llm_agent.run.side_effect = lambda prompt: (_ for _ in ()).throw(RuntimeError("boom")) if prompt.endswith("y") else "ok"
+
+    results = FileSummarizer(llm_agent, write_batch_size=1).use_batch(adapter, ["x", "y"])
+
+    assert results[0] == {"file_id": "x", "status": "summarized", "summary": "ok"}
+    assert results[1]["status"] == "error"
+    adapter.add_metadata.assert_called_once_with(file_id="x", metadata={"summary": "ok", "summary_hash": digest("x")})
+
+def test_files_missing_from_a_partial_bulk_result_are_fetched_one_by_one(llm_agent):
+    adapter = FakeAdapter({"a": {"text": "alpha"}, "b": {"text": "beta"}})
+    bulk = adapter.query
+    adapter.query = lambda query: bulk(query)[:1] if isinstance(query["id"], dict) else bulk(query)
+
+    results = FileSummarizer(llm_agent).use_batch(adapter, ["a", "b", "missing"])
+    assert [r["status"] for r in results] == ["summarized", "summarized", "missing"]
+    assert sorted(q["id"] for q in adapter.queries[1:]) == ["b", "missing"]
+
+def test_bulk_query_failures_are_logged(llm_agent, caplog):
+    adapter = MagicMock(spec=["query", "add_metadata"])
+    adapter.query.side_effect = lambda q: [{"text": "x"}] if isinstance(q["id"], str) else 1 / 0
+    with caplog.at_level("WARNING", logger="langswarm.synapse.tools"):
+        results = FileSummarizer(llm_agent).use_batch(adapter, ["x"])
+    assert results[0]["status"] == "summarized"
+    assert "division by zero" in caplog.text
+
+def test_a_failed_single_query_only_loses_its_file(llm_agent, caplog):
+    adapter = FakeAdapter({"a": {"text": "alpha"}, "b": {"text": "beta"}})
+    single = adapter.query
+
+    def query(q):
+        if isinstance(q["id"], dict) or q["id"] == "a":
+            raise ConnectionError(f"lost {q['id']}")
+        return single(q)
+
+    adapter.query = query
+    with caplog.at_level("WARNING", logger="langswarm.synapse.tools"):
+        results = FileSummarizer(llm_agent).use_batch(adapter, ["a", "b"])
+    assert [r["status"] for r in results] == ["missing", "summarized"]
+    assert "lost a" in caplog.text
+
+def test_bulk_results_are_matched_against_every_requested_id(llm_agent):
+    file_ids = [f"f{i}" for i in range(200)]
+    adapter = FakeAdapter({file_id: {"text": file_id} for file_id in file_ids})
+    results = FileSummarizer(llm_agent).use_batch(adapter, file_ids)
+    assert all(r["status"] == "summarized" for r in results)
+    assert len(adapter.queries) == 1
+
+def test_map_reduce_reuses_cached_chunk_summaries(llm_agent):
+    llm_agent.run.side_effect = lambda prompt: f"s{llm_agent.run.call_count}"
+    summarizer = FileSummarizer(llm_agent, chunk_tokens=4, token_counter=lambda t: len(t.split()), reduce_fanout=2)
+    text = "".join(f"word{i} word word\n" for i in range(4))
+
+    summarizer._generate_summary(text, "notes.txt")
+    assert llm_agent.run.call_count == 4 + 2 + 1  # 4 chunks, 2 reduces, 1 final reduce
+
+    llm_agent.run.reset_mock()
+    summarizer._generate_summary(text.replace("word3", "changed"), "notes.txt")
+    assert llm_agent.run.call_count == 3  # The changed chunk and its two ancestors
+
+def test_llm_calls_stay_within_max_workers_across_files_and_chunks():
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def run(prompt):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return f"summary {prompt[-20:]}"
+
+    files = {f"f{i}": {"text": "".join(f"file{i} line{j} word\n" for j in range(8))} for i in range(4)}
+    summarizer = FileSummarizer(MagicMock(run=run), max_workers=3, chunk_tokens=3, token_counter=lambda t: len(t.split()))
+    results = summarizer.use_batch(FakeAdapter(files), list(files))
+
+    assert all(r["status"] == "summarized" for r in results)
+    assert peak[0] <= 3
+
+def test_default_summary_cache_is_bounded(llm_agent):
+    summarizer = FileSummarizer(llm_agent, summary_cache_size=2)
+    for key in ("a", "b", "a", "c"):
+        summarizer._cached_summary(key, f"prompt {key}")
+    assert list(summarizer.summary_cache) == ["a", "c"]
+
+def test_directory_rollups(llm_agent):
+    llm_agent.run.side_effect = lambda prompt: f"rollup of {prompt.split()[3]}"
+    summarizer = FileSummarizer(llm_agent)
+    rollups = summarizer.summarize_directories({"src/a.py": "A", "src/pkg/b.py": "B", "README.md": "R"})
+
+    assert rollups == {"src/pkg": "rollup of 'src/pkg'", "src": "rollup of 'src'", "": "rollup of '.'"}
+    assert "pkg/: rollup of 'src/pkg'" in llm_agent.run.call_args_list[1].args[0]
+
+    summarizer.summarize_directories({"src/a.py": "A", "src/pkg/b.py": "B", "README.md": "R"})
+    assert llm_agent.run.call_count == 3
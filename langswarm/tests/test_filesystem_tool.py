@@ -0,0 +1,91 @@
+import os
+import pytest
+
+pytest.importorskip("langswarm.memory.adapters.database_adapter")
+
+from langswarm.synapse.tools.files.main import FilesystemTool
+
+@pytest.fixture
+def tool(tmp_path):
+    return FilesystemTool("filesystem_tool", directory=str(tmp_path))
+
+def test_batch_applies_operations_in_order(tool, tmp_path):
+    results = tool.run({"operations": [
+        {"action": "create_directory", "path": "data"},
+        {"action": "create_file", "filename": "src/app.py", "content": "x = 1\n"},
+        {"action": "update_file", "filename": "src/app.py", "content": "x = 1\n", "append": False},
+        {"action": "update_file", "filename": "src/app.py", "content": "y = 2\n"},
+        {"action": "delete_file", "filename": "missing.txt"},
+    ]}, action="batch")
+
+    assert [r["status"] for r in results] == ["created", "created", "unchanged", "updated", "error"]
+    assert (tmp_path / "src" / "app.py").read_text() == "x = 1\ny = 2\n"
+    assert not [name for name in os.listdir(tmp_path / "src") if name.endswith(".tmp")]
+
+def test_batch_validates_before_applying(tool, tmp_path):
+    result = tool.run({"operations": [
+        {"action": "create_file", "filename": "ok.txt", "content": ""},
+        {"action": "create_file", "filename": "bad.exe", "content": ""},
+    ]}, action="batch")
+
+    assert result["status"] == "error"
+    assert len(result["errors"]) == 1
+    assert not (tmp_path / "ok.txt").exists()
+
+def test_ranged_reads(tool):
+    tool.run({"filename": "app.log", "content": "".join(f"line {i}\n" for i in range(1, 51))}, action="create_file")
+
+    assert tool.run({"filename": "app.log", "start_line": 2, "end_line": 3}, action="read_range") == "line 2\nline 3\n"
+    assert tool.run({"filename": "app.log", "lines": 1}, action="tail") == "line 50\n"
+
+    chunk = tool.run({"filename": "app.log", "chunk_size": 100}, action="read_chunk")
+    content = chunk["content"]
+    while chunk["next_cursor"]:
+        chunk = tool.run({"filename": "app.log", "cursor": chunk["next_cursor"], "chunk_size": 100}, action="read_chunk")
+        content += chunk["content"]
+    assert content == tool.run({"filename": "app.log"}, action="read_file")
+
+    for chunk_size in (0, -5, "many"):
+        result = tool.run({"filename": "app.log", "chunk_size": chunk_size}, action="read_chunk")
+        assert result["status"] == "error" and "chunk_size" in result["message"]
+
+    for cursor in ("not a cursor", 12, ["x"]):
+        result = tool.run({"filename": "app.log", "cursor": cursor}, action="read_chunk")
+        assert result["status"] == "error" and "Invalid cursor" in result["message"]
+
+def test_listing_reflects_tool_writes(tool):
+    tool.run({"filename": "a.txt", "content": "a"}, action="create_file")
+    assert tool.run({}, action="list_files") == ["a.txt"]
+    tool.run({"filename": "b.md", "content": "b"}, action="create_file")
+    assert tool.run({"extension": ".md"}, action="list_files") == ["b.md"]
+    assert tool.run({"limit": 1}, action="list_files") == {"entries": ["a.txt"], "total": 2, "offset": 0}
+    assert tool.run({"offset": "1", "limit": "1"}, action="list_files") == {"entries": ["b.md"], "total": 2, "offset": 1}
+    assert tool.run({"offset": -1}, action="list_files").startswith("Error")
+
+def test_cached_reads_see_changes_made_outside_the_tool(tmp_path):
+    tool = FilesystemTool("filesystem_tool", directory=str(tmp_path))
+    tool.result_cache_size = 16
+    tool.run({"filename": "notes.txt", "content": "one"}, action="create_file")
+    assert tool.run({"filename": "notes.txt"}, action="read_file") == "one"
+    assert tool.run({"filename": "notes.txt"}, action="read_file") == "one"
+
+    (tmp_path / "notes.txt").write_text("two, rewritten elsewhere")
+    assert tool.run({"filename": "notes.txt"}, action="read_file") == "two, rewritten elsewhere"
+    (tmp_path / "other.txt").write_text("")
+    tool.directory_index.invalidate(str(tmp_path))
+    assert tool.run({}, action="list_files") == ["notes.txt", "other.txt"]
+    assert tool.cache_stats()["hits"] == 1
+
+def test_written_files_keep_their_permissions(tool, tmp_path):
+    tool.run({"filename": "new.txt", "content": "a"}, action="create_file")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert (tmp_path / "new.txt").stat().st_mode & 0o777 == 0o666 & ~umask
+
+    os.chmod(tmp_path / "new.txt", 0o640)
+    tool.run({"filename": "new.txt", "content": "b", "append": False}, action="update_file")
+    assert (tmp_path / "new.txt").stat().st_mode & 0o777 == 0o640
+
+def test_batch_rejects_non_string_paths(tool):
+    result = tool.run({"operations": [{"action": "create_file", "filename": 42, "content": ""}]}, action="batch")
+    assert result["status"] == "error" and "must be a string" in result["errors"][0]
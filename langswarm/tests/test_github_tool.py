@@ -0,0 +1,21 @@
+import pytest
+
+pytest.importorskip("langswarm.memory.adapters.database_adapter")
+pytest.importorskip("langswarm.core.utils.utilities")
+pytest.importorskip("langchain_community.utilities.github")
+
+from langswarm.synapse.tools.github.main import GitHubTool
+
+def test_commits_to_the_branch_are_serialized():
+    tool = object.__new__(GitHubTool)
+    mutations = ("create_file", "update_file", "replace_file", "delete_file")
+    for name in mutations:
+        _, writes = tool._actions[name].resources(tool, {"file_path": f"{name}.py"})
+        assert "branch" in writes
+
+    _, first = tool._actions["create_file"].resources(tool, {"file_path": "a.py"})
+    _, second = tool._actions["delete_file"].resources(tool, {"file_path": "b.py"})
+    assert first & second
+
+    for name in ("set_active_branch", "create_branch"):
+        assert tool._actions[name].resources(tool, {})[1] == {"*"}
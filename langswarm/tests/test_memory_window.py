@@ -0,0 +1,116 @@
+from langswarm.synapse.swarm.memory_window import MemoryWindow, SUMMARY_PREFIX, bot_summarizer
+from langswarm.synapse.swarm.routing import LLMRouting
+from langswarm.synapse.swarm.tracing import Tracer
+import asyncio
+import threading
+import pytest
+
+def words(text):
+    return len(text.split())
+
+class Bot:
+    """A stub client with the memory handling of langswarm-core's LLM."""
+
+    def __init__(self):
+        self.in_memory = [{"role": "system", "content": "Be brief."}]
+        self.calls = 0
+
+    def chat(self, q="", erase_query=False, **kwargs):
+        self.calls += 1
+        self.in_memory.append({"role": "user", "content": q})
+        response = f"answer {self.calls} " * 5
+        if erase_query:
+            del self.in_memory[-1]
+        return response
+
+    def add_response(self, response):
+        self.in_memory.append({"role": "assistant", "content": response})
+
+def test_memory_stays_within_the_budget():
+    bot = Bot()
+    window = MemoryWindow(max_tokens=100, keep_last=2, token_counter=words)
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="q", memory_window=window)
+
+    for turn in range(50):
+        routing.run(f"question {turn} " * 5)
+        assert window.token_count() <= 100
+
+    assert bot.in_memory[0] == {"role": "system", "content": "Be brief."}
+    assert bot.in_memory[-2]["content"].startswith("question 49")
+    assert window.evicted == 101 - len(bot.in_memory)
+    # Every message is counted once, trimming does not recount the history.
+    assert window.counted == 101
+
+def test_keep_last_wins_over_the_budget():
+    bot = Bot()
+    window = MemoryWindow(max_tokens=1, keep_last=2, token_counter=words)
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="q", memory_window=window)
+
+    routing.run("a long question " * 10)
+    routing.run("another one")
+    assert [m["role"] for m in bot.in_memory] == ["system", "user", "assistant"]
+    assert bot.in_memory[1]["content"] == "another one"
+
+def test_memory_changed_elsewhere_is_recounted():
+    bot = Bot()
+    window = MemoryWindow(max_tokens=1000, token_counter=words)
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="q", memory_window=window)
+    routing.run("one two three")
+    bot.in_memory = bot.in_memory[:1]
+    routing.run("four")
+
+    assert window.token_count() == words("Be brief.") + 4 + words("four") + 4 + 10 + 4
+
+def test_evicted_turns_are_summarized_in_the_background():
+    release = threading.Event()
+    seen = []
+
+    def summarizer(summary, messages):
+        release.wait(5)
+        seen.append(len(messages))
+        return f"{summary or ''}+{len(messages)}"
+
+    bot = Bot()
+    window = MemoryWindow(max_tokens=60, keep_last=2, token_counter=words, summarizer=summarizer)
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="q", memory_window=window)
+    for turn in range(6):
+        routing.run(f"question {turn} " * 5)
+    assert window.summary is None
+
+    release.set()
+    window.flush(bot)
+    assert sum(seen) == window.evicted and window.summaries == len(seen)
+    assert bot.in_memory[1]["role"] == "system" and bot.in_memory[1]["content"].startswith(SUMMARY_PREFIX)
+    assert window.token_count() <= 60
+    window.close()
+
+def test_bot_summarizer_leaves_the_summarizing_bot_unchanged():
+    bot = Bot()
+    summary = bot_summarizer(bot)("earlier", [{"role": "user", "content": "hi"}])
+    assert summary.startswith("answer 1") and len(bot.in_memory) == 1
+
+def test_async_calls_keep_the_window_and_count_evictions():
+    bot = Bot()
+    tracer = Tracer()
+    routing = LLMRouting(route=0, bots=None, main_bot=bot, query="q", tracer=tracer,
+                         memory_window=MemoryWindow(max_tokens=40, token_counter=words))
+    for turn in range(5):
+        asyncio.run(routing.arun(f"question {turn} " * 5))
+
+    assert routing.memory_window.token_count() <= 40
+    assert tracer.counters["evicted_messages"] == routing.memory_window.evicted > 0
+
+def test_routing_rejects_summarizing_with_the_main_bot():
+    bot = Bot()
+    with pytest.raises(ValueError):
+        LLMRouting(route=0, bots=None, main_bot=bot, query="q",
+                   memory_window=MemoryWindow(summarizer=bot_summarizer(bot)))
+
+def test_routing_closes_its_memory_window():
+    summarizer_bot = Bot()
+    window = MemoryWindow(max_tokens=20, keep_last=1, token_counter=words, summarizer=bot_summarizer(summarizer_bot))
+    with LLMRouting(route=0, bots=None, main_bot=Bot(), query="q", memory_window=window) as routing:
+        for turn in range(3):
+            routing.run(f"question {turn} " * 5)
+        assert window._executor is not None
+    assert window._executor is None
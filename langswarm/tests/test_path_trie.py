@@ -0,0 +1,77 @@
+from langswarm.synapse.tools.path_trie import PathTrie
+import pytest
+
+@pytest.fixture
+def trie():
+    trie = PathTrie()
+    trie.add("src/main.py", 10)
+    trie.add("src\\utils\\io.py", 20)
+    trie.add("src/utils/text.md", 5)
+    trie.add("README.md", 1)
+    return trie
+
+def test_aggregates_counts_and_sizes(trie):
+    assert len(trie) == 4
+    assert trie.stats("") == {"files": 4, "size": 36, "type": "directory"}
+    assert trie.stats("src/utils") == {"files": 2, "size": 25, "type": "directory"}
+    assert trie.stats("src/main.py")["type"] == "file"
+    assert trie.stats("missing") is None
+
+def test_subtree_with_depth(trie):
+    assert trie.subtree("src") == {"main.py": {}, "utils": {"io.py": {}, "text.md": {}}}
+    assert trie.subtree(depth=1) == {"src": {}, "README.md": {}}
+
+def test_glob_and_prefix(trie):
+    assert list(trie.glob("src/**/*.py")) == ["src/main.py", "src/utils/io.py"]
+    assert list(trie.glob("*.md")) == ["README.md"]
+    assert list(trie.glob("**/*.md")) == ["README.md", "src/utils/text.md"]
+    assert list(trie.prefix("src/ut")) == ["src/utils/io.py", "src/utils/text.md"]
+    assert list(trie.prefix("nope")) == []
+
+def test_incremental_events(trie):
+    trie.apply_event({"type": "modified", "path": "src/main.py", "size": 15})
+    trie.apply_event({"type": "renamed", "old_path": "src/utils/io.py", "path": "lib/io.py"})
+    trie.apply_event({"type": "deleted", "path": "src/utils/text.md"})
+    assert "lib/io.py" in trie and "src/utils/io.py" not in trie
+    assert trie.subtree("src") == {"main.py": {}}
+    assert trie.stats("") == {"files": 3, "size": 36, "type": "directory"}
+    with pytest.raises(ValueError):
+        trie.apply_event({"type": "touched", "path": "x"})
+
+def test_renaming_a_directory_moves_its_subtree(trie):
+    trie.apply_event({"type": "renamed", "old_path": "src/utils", "path": "lib/helpers"})
+    assert trie.subtree() == {"src": {"main.py": {}}, "lib": {"helpers": {"io.py": {}, "text.md": {}}}, "README.md": {}}
+    assert trie.stats("lib") == {"files": 2, "size": 25, "type": "directory"}
+    assert trie.stats("src") == {"files": 1, "size": 10, "type": "directory"}
+    assert trie.stats("") == {"files": 4, "size": 36, "type": "directory"}
+
+    trie.apply_event({"type": "renamed", "old_path": "src", "path": "app"})
+    assert trie.subtree("app") == {"main.py": {}} and trie.stats("src") is None
+    with pytest.raises(ValueError):
+        trie.move("lib", "lib/helpers/inner")
+    with pytest.raises(ValueError):
+        trie.move("lib", "README.md/inner")
+
+def test_indexer_paginates_adapter_results():
+    pytest.importorskip("langswarm.memory.adapters.database_adapter")
+    from unittest.mock import MagicMock, create_autospec
+    from langswarm.memory.adapters.database_adapter import DatabaseAdapter
+    from langswarm.synapse.tools.codebase_indexer import CodebaseIndexer
+
+    records = [{"metadata": {"path": f"pkg/mod_{i}.py", "size": 1}} for i in range(5)]
+
+    def query(query, limit, offset):
+        return records[offset:offset + limit]
+
+    adapter = MagicMock(spec=DatabaseAdapter)
+    adapter.query = create_autospec(query, side_effect=query)
+
+    indexer = CodebaseIndexer(page_size=2)
+    assert indexer.use(adapter, output_format="json").startswith('{"pkg":{')
+    assert adapter.query.call_count == 3
+    assert indexer.stats("pkg") == {"files": 5, "size": 5, "type": "directory"}
+
+    # Adapters taking **kwargs may ignore limit and offset, they are queried once.
+    adapter.query = MagicMock(side_effect=lambda query=None, **kwargs: records)
+    assert indexer.use(adapter, output_format="trie") is indexer.index
+    assert adapter.query.call_count == 1 and len(indexer.index) == 5
@@ -0,0 +1,49 @@
+from langswarm.synapse.swarm.branching import LLMBranching
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.context import RunContext
+from langswarm.synapse.chains.consensus_chain import ConsensusChain
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import time
+import numpy as np
+import pytest
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch):
+    model = MagicMock()
+    model.encode.side_effect = lambda texts: np.array(
+        [[1.0, 0.0] if "a" in t else [0.0, 1.0] for t in ([texts] if isinstance(texts, str) else texts)]
+    )
+    monkeypatch.setattr("langswarm.synapse.embeddings.encoders.SentenceTransformer", MagicMock(return_value=model))
+    return model
+
+def echo_agent(delay=0.0):
+    agent = MagicMock()
+    agent.chat.side_effect = lambda q, erase_query=False: time.sleep(delay) or q
+    return agent
+
+def test_paragraphs_do_not_accumulate_across_runs():
+    swarm = LLMBranching(query="default", clients=[echo_agent(), echo_agent()])
+    assert swarm.run("one") == ["one", "one"]
+    assert swarm.run("two") == ["two", "two"]
+    assert swarm.paragraphs == ["two", "two"]
+    assert swarm.query == "default"
+
+def test_context_holds_intermediate_results():
+    swarm = LLMConsensus(query="default", clients=[echo_agent(), echo_agent()])
+    context = RunContext("a query")
+    assert swarm.run(context=context) == "a query"
+    assert context.paragraphs == ["a query", "a query"]
+    assert context.embeddings.shape == (2, 2)
+    assert context.results["group_size"] == 2
+    assert context.result == "a query"
+
+def test_one_chain_serves_concurrent_threads():
+    chain = ConsensusChain(agents=[echo_agent(0.01) for _ in range(3)], query="default")
+    queries = [f"query {i} " + ("a" if i % 2 else "b") for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda q: chain.invoke({"query": q})["consensus_result"], queries))
+
+    assert results == queries
+    assert chain.consensus.query == "default"
@@ -0,0 +1,143 @@
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.singleflight import SingleFlight
+from langswarm.synapse.swarm.tracing import Tracer
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+import asyncio
+import threading
+import time
+
+def slow_agent(answer, delay=0.2):
+    agent = MagicMock()
+    agent.chat.side_effect = lambda q, erase_query=False: time.sleep(delay) or answer
+    return agent
+
+class DeterministicAgent:
+    deterministic = True
+
+    def __init__(self):
+        self.calls = 0
+        self.in_memory = []
+
+    async def achat(self, q, erase_query=False):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return f"answer to {q}"
+
+def test_concurrent_calls_run_once_and_share_the_result():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return ["result"]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", work) for _ in range(4)]
+        while flight.followers < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert len(calls) == 1
+    assert sorted(leader for _, leader in results) == [False, False, False, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert flight.in_flight() == 0
+    assert flight.do("key", lambda: "again") == ("again", True)
+
+def test_errors_propagate_to_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("agent failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", fail) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert (flight.leaders, flight.followers) == (1, 2)
+
+def test_a_cancelled_leader_hands_the_call_to_a_follower():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(flight.ado("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        return results
+
+    results = asyncio.run(main())
+    assert sorted(leader for _, leader in results) == [False, True]
+    assert all(result == "result" for result, _ in results)
+    assert len(calls) == 2 and flight.in_flight() == 0
+    assert (flight.leaders, flight.followers) == (2, 1)
+
+def test_identical_swarm_runs_are_coalesced(fake_encoder):
+    clients = [slow_agent("same answer"), slow_agent("same answer")]
+    tracer = Tracer()
+    swarm = LLMConsensus(query="q", clients=clients, model=fake_encoder(), single_flight=SingleFlight(), tracer=tracer)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: swarm.run(), range(4)))
+    other = swarm.run("another query")
+
+    assert results == ["same answer"] * 4 and other == "same answer"
+    assert [c.chat.call_count for c in clients] == [2, 2]
+    assert tracer.counters["coalesced_runs"] == 3
+
+def test_identical_async_runs_are_coalesced(fake_encoder):
+    clients = [slow_agent("same answer"), slow_agent("same answer")]
+    swarm = LLMConsensus(query="q", clients=clients, model=fake_encoder(), single_flight=True)
+
+    async def main():
+        return await asyncio.gather(*(swarm.arun() for _ in range(3)))
+
+    assert asyncio.run(main()) == ["same answer"] * 3
+    assert [c.chat.call_count for c in clients] == [1, 1]
+
+def test_calls_to_deterministic_agents_are_coalesced(fake_encoder):
+    agent = DeterministicAgent()
+    other = MagicMock(chat=MagicMock(return_value="answer to q"))
+    tracer = Tracer()
+    swarm = LLMConsensus(query="q", clients=[agent, agent, agent, other, other], model=fake_encoder(),
+                         single_flight=SingleFlight(), tracer=tracer)
+
+    assert asyncio.run(swarm.arun()) == "answer to q"
+    assert agent.calls == 1 and other.chat.call_count == 2
+    assert tracer.counters["coalesced_calls"] == 2
+
+def test_equal_deterministic_clients_share_calls(fake_encoder):
+    class Agent(DeterministicAgent):
+        provider, model = "openai", "gpt-4o"
+
+        def __init__(self, system_prompt):
+            super().__init__()
+            self.system_prompt = system_prompt
+
+    same = [Agent("be brief"), Agent("be brief")]
+    different = Agent("be verbose")
+    swarm = LLMConsensus(query="q", clients=same + [different], model=fake_encoder(), single_flight=SingleFlight())
+
+    assert asyncio.run(swarm.arun()) == "answer to q"
+    assert sum(agent.calls for agent in same) == 1
+    assert different.calls == 1
+
+def test_run_fingerprint_covers_the_shared_state(fake_encoder):
+    clients = [slow_agent("answer")]
+    first = LLMConsensus(query="q", clients=clients, model=fake_encoder(), state=[{"role": "user", "content": "a"}])
+    second = LLMConsensus(query="q", clients=clients, model=fake_encoder(), state=[{"role": "user", "content": "b"}])
+    assert first.agent_fingerprint() != second.agent_fingerprint()
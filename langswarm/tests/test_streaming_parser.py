@@ -0,0 +1,126 @@
+from langswarm.synapse.tools.streaming import ToolCallStreamParser, iter_tool_calls, loads_tolerant
+import json
+import random
+import pytest
+
+ALPHABET = "abc XYZ 019 {}[]\"'\\/#*,:<>\n\t" + "é✓"
+
+def random_text(rng, size=12):
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, size)))
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return random_text(rng)
+    if kind == 1:
+        return rng.choice([rng.randint(-1000, 1000), rng.uniform(-10, 10)])
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return random_text(rng, 30)
+    if kind in (4, 5):
+        return {random_text(rng, 6): random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 3))]
+
+def random_call(rng):
+    return {
+        "type": "tools",
+        "method": rng.choice(["execute", "request"]),
+        "instance_name": random_text(rng, 8),
+        "action": random_text(rng, 8),
+        "parameters": {random_text(rng, 6): random_value(rng) for _ in range(rng.randint(0, 3))},
+    }
+
+def render(value, rng):
+    """Writes a value the way agents do: mixed quotes, comments, trailing commas."""
+    space = lambda: rng.choice(["", " ", "\n  ", "\t"])
+    comment = lambda: rng.choice(["", "", " # note\n", " // note\n", " /* note */ "])
+    if isinstance(value, str):
+        quote = rng.choice(['"', "'"])
+        escaped = value.replace("\\", "\\\\").replace(quote, "\\" + quote).replace("\n", "\\n").replace("\t", "\\t")
+        return quote + escaped + quote
+    if isinstance(value, (bool, type(None))):
+        return rng.choice([json.dumps(value), repr(value)])
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, (int,)):
+        return str(value)
+    if isinstance(value, dict):
+        items = [space() + render(k, rng) + space() + ":" + space() + render(v, rng) + comment() for k, v in value.items()]
+        trailing = "," if items and rng.random() < 0.5 else ""
+        return "{" + ",".join(items) + trailing + space() + "}"
+    items = [space() + render(v, rng) + comment() for v in value]
+    trailing = "," if items and rng.random() < 0.5 else ""
+    return "[" + ",".join(items) + trailing + space() + "]"
+
+def random_response(rng):
+    """An agent response: prose and blocks of calls, with the calls expected from it."""
+    parts, expected = [], []
+    for _ in range(rng.randint(0, 4)):
+        parts.append(random_text(rng, 40).replace("START>>>", ""))
+        calls = [random_call(rng) for _ in range(rng.randint(1, 4))]
+        if len(calls) == 1 and rng.random() < 0.3:
+            body = render(calls[0], rng)
+        else:
+            body = render({"calls": calls}, rng)
+        parts.append(f"START>>>{rng.choice(['', chr(10)])}{body}{rng.choice(['', chr(10)])}<<<END")
+        expected.extend(calls)
+    parts.append(random_text(rng, 40))
+    return "".join(parts), expected
+
+def chunks(text, rng):
+    i = 0
+    while i < len(text):
+        size = rng.choice([1, 2, 3, 4, 7, 16, 64])
+        yield text[i:i + size]
+        i += size
+
+def test_tolerant_json():
+    assert loads_tolerant("{'a': [1, 2,], /* c */ b: True, # c\n 'c': None,}") == {"a": [1, 2], "b": True, "c": None}
+    assert loads_tolerant('{"s": "it\'s \\u00e9 \\"q\\""}') == {"s": "it's é \"q\""}
+    for invalid in ("{", "{'a' 1}", "[1 2]", "{'a': }", "'open"):
+        with pytest.raises(json.JSONDecodeError):
+            loads_tolerant(invalid)
+
+@pytest.mark.parametrize("seed", range(200))
+def test_fuzz_streaming_matches_the_emitted_calls(seed):
+    rng = random.Random(seed)
+    text, expected = random_response(rng)
+
+    parser = ToolCallStreamParser()
+    calls = []
+    for chunk in chunks(text, rng):
+        calls.extend(parser.feed(chunk))
+    calls.extend(parser.close())
+
+    assert calls == expected
+    assert parser.errors == []
+    assert list(iter_tool_calls([text])) == expected
+
+@pytest.mark.parametrize("seed", range(100))
+def test_fuzz_truncated_and_corrupted_streams_do_not_raise(seed):
+    rng = random.Random(seed)
+    text, _ = random_response(rng)
+    if text:
+        cut = rng.randrange(len(text))
+        text = text[:cut] + random_text(rng, 5) + text[cut + rng.randint(0, 5):]
+    parser = ToolCallStreamParser()
+    calls = [call for chunk in chunks(text, rng) for call in parser.feed(chunk)] + parser.close()
+    assert all(isinstance(call, dict) for call in calls)
+
+def test_calls_are_emitted_before_the_block_ends():
+    first = {"type": "tools", "method": "execute", "instance_name": "files", "action": "read_file", "parameters": {"filename": "a.txt"}}
+    head = 'Reading both. START>>>\n{"calls": [' + json.dumps(first)
+    parser = ToolCallStreamParser()
+
+    assert parser.feed(head[:-1]) == []
+    assert parser.feed(head[-1:]) == [first]
+    assert parser.feed(', {"action": "read_file", "parameters": {"filename": "b.txt"}}')[0]["parameters"] == {"filename": "b.txt"}
+    assert parser.feed("]}\n<<<END") == []
+    assert parser.calls == 2
+
+def test_unterminated_blocks_are_reported():
+    parser = ToolCallStreamParser()
+    calls = parser.feed('START>>> {"calls": [{"action": "a"}, {"action": <<<END then START>>> {"action": "b"} <<<END')
+    assert [call["action"] for call in calls] == ["a", "b"]
+    assert parser.errors[0][0] == "Unterminated tool call block"
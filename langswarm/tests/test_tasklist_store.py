@@ -0,0 +1,156 @@
+from langswarm.synapse.tools.tasklist.store import TaskStore, WriteBehindBuffer
+from unittest.mock import MagicMock
+import pytest
+
+@pytest.fixture
+def store():
+    store = TaskStore()
+    store.add("task-1", {"description": "Write docs", "completed": False, "priority": 3})
+    store.add("task-2", {"description": "Fix bug", "completed": False, "priority": 1})
+    store.add("task-3", {"description": "Release", "completed": True, "priority": 2})
+    store.add("task-4", {"description": "Review", "completed": False, "priority": 1})
+    return store
+
+def test_query_orders_by_priority_then_creation(store):
+    tasks, total = store.query()
+    assert [t["description"] for t in tasks] == ["Fix bug", "Review", "Release", "Write docs"]
+    assert total == 4
+
+def test_query_in_insertion_order(store):
+    store.update("task-1", {"priority": 5})
+    store.add("task-2", {"description": "Fix bug again", "completed": False, "priority": 1})
+    tasks, total = store.query(order="insertion")
+    assert [t["description"] for t in tasks] == ["Write docs", "Release", "Review", "Fix bug again"]
+    tasks, total = store.query(completed=False, limit=2, offset=1, order="insertion")
+    assert [t["description"] for t in tasks] == ["Review", "Fix bug again"]
+    assert total == 3
+    with pytest.raises(ValueError):
+        store.query(order="alphabetical")
+
+def test_query_filters_and_paginates(store):
+    tasks, total = store.query(completed=False, limit=2)
+    assert [t["description"] for t in tasks] == ["Fix bug", "Review"]
+    assert total == 3
+
+    tasks, _ = store.query(completed=False, limit=2, offset=2)
+    assert [t["description"] for t in tasks] == ["Write docs"]
+
+def test_update_reindexes(store):
+    store.update("task-1", {"completed": True, "priority": 0})
+    tasks, total = store.query(completed=True)
+    assert [t["description"] for t in tasks] == ["Write docs", "Release"]
+    assert total == 2
+    assert store.update("task-99", {"completed": True}) is None
+
+def test_remove(store):
+    assert store.remove("task-2")["description"] == "Fix bug"
+    assert "task-2" not in store
+    assert len(store) == 3
+    assert store.remove("task-2") is None
+
+def test_bulk_load_matches_incremental_adds(store):
+    bulk = TaskStore()
+    bulk.bulk_load(list(store.items()))
+    assert bulk.query() == store.query()
+
+def test_write_behind_coalesces_writes():
+    adapter = MagicMock()
+    buffer = WriteBehindBuffer(adapter, batch_size=100)
+
+    buffer.add({"key": "task-1", "text": "a"})
+    buffer.update({"key": "task-1", "text": "b"})
+    buffer.add({"key": "task-2", "text": "c"})
+    buffer.delete("task-2")
+    buffer.update({"key": "task-0", "text": "d"})
+    buffer.update({"key": "task-0", "text": "e"})
+    buffer.delete("task-9")
+    adapter.add_documents.assert_not_called()
+
+    assert buffer.flush() == 3
+    adapter.add_documents.assert_called_once_with([{"key": "task-1", "text": "b"}, {"key": "task-0", "text": "e"}])
+    adapter.delete.assert_called_once_with(["task-9", "task-0"])
+    assert len(buffer) == 0
+
+def test_write_behind_flushes_at_batch_size():
+    adapter = MagicMock()
+    buffer = WriteBehindBuffer(adapter, batch_size=2)
+    buffer.add({"key": "task-1", "text": "a"})
+    adapter.add_documents.assert_not_called()
+    buffer.add({"key": "task-2", "text": "b"})
+    adapter.add_documents.assert_called_once()
+
+def test_query_rejects_negative_limit_or_offset(store):
+    with pytest.raises(ValueError):
+        store.query(limit=-1)
+    with pytest.raises(ValueError):
+        store.query(offset=-2)
+
+def test_write_behind_batches_updates():
+    adapter = MagicMock()
+    buffer = WriteBehindBuffer(adapter, batch_size=100)
+    for i in range(3):
+        buffer.update({"key": f"task-{i}", "text": "x"})
+    buffer.delete("task-9")
+
+    assert buffer.flush() == 4
+    adapter.update.assert_not_called()
+    adapter.delete.assert_called_once_with(["task-9", "task-0", "task-1", "task-2"])
+    assert len(adapter.add_documents.call_args.args[0]) == 3
+
+def test_write_behind_keeps_writes_when_the_adapter_fails():
+    adapter = MagicMock()
+    adapter.add_documents.side_effect = [ConnectionError("down"), None]
+    buffer = WriteBehindBuffer(adapter, batch_size=100)
+    buffer.add({"key": "task-1", "text": "a"})
+    buffer.update({"key": "task-0", "text": "b"})
+
+    with pytest.raises(ConnectionError):
+        buffer.flush()
+    assert len(buffer) == 2
+
+    buffer.update({"key": "task-1", "text": "newer"})
+    assert buffer.flush() == 2
+    assert {"key": "task-1", "text": "newer"} in adapter.add_documents.call_args.args[0]
+    assert len(buffer) == 0
+
+def test_write_behind_does_not_keep_the_buffer_alive():
+    import gc
+    import weakref
+
+    adapter = MagicMock()
+    buffer = WriteBehindBuffer(adapter)
+    buffer.add({"key": "task-1", "text": "a"})
+    ref = weakref.ref(buffer)
+    del buffer
+    gc.collect()
+
+    assert ref() is None
+    adapter.add_documents.assert_called_once_with([{"key": "task-1", "text": "a"}])
+
+def test_tool_parses_completed_and_validates_pagination():
+    pytest.importorskip("langswarm.memory.adapters.database_adapter")
+    from langswarm.synapse.tools.tasklist.main import TaskListTool
+
+    tool = TaskListTool("tasks")
+    tool.run({"description": "open"}, "create_task")
+    tool.run({"description": "done"}, "create_task")
+    tool.run({"task_id": "task-2", "completed": "true"}, "update_task")
+
+    listed = tool.run({"completed": "false"}, "list_tasks")
+    assert "'open'" in listed and "'done'" not in listed
+    assert tool.run({"limit": -1}, "list_tasks").startswith("Error")
+    assert tool.run({"completed": "maybe"}, "list_tasks").startswith("Error")
+
+def test_tool_lists_tasks_in_creation_order_by_default():
+    pytest.importorskip("langswarm.memory.adapters.database_adapter")
+    from langswarm.synapse.tools.tasklist.main import TaskListTool
+
+    tool = TaskListTool("tasks")
+    tool.run({"description": "later", "priority": 3}, "create_task")
+    tool.run({"description": "urgent", "priority": 1}, "create_task")
+
+    listed = tool.run({}, "list_tasks")
+    assert listed.index("'later'") < listed.index("'urgent'")
+    by_priority = tool.run({"order": "priority"}, "list_tasks")
+    assert by_priority.index("'urgent'") < by_priority.index("'later'")
+    assert tool.run({"order": "random"}, "list_tasks").startswith("Error")
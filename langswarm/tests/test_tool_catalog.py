@@ -0,0 +1,89 @@
+from langswarm.synapse.registry.catalog import ToolCatalog, ToolView
+from unittest.mock import MagicMock
+import pytest
+import threading
+
+def tool(name, description):
+    return MagicMock(identifier=name, description=description, instruction="", brief=name)
+
+TOOLS = [tool(f"tool{i}", f"topic{i} helper for task number {i}") for i in range(20)]
+
+def test_views_share_the_catalog_embeddings(word_encoder):
+    encoder = word_encoder(32)
+    catalog = ToolCatalog(embedding_model=encoder, model_name="words")
+    views = [catalog.view(TOOLS[i:i + 5]) for i in range(0, 20, 5)] * 25
+
+    assert encoder.texts == 20
+    assert catalog.count_tools() == 20
+    assert all(isinstance(view, ToolView) and view.count_tools() == 5 for view in views)
+    assert views[1].get_tool("tool6") is TOOLS[6] and views[1].get_tool("tool0") is None
+
+def test_searches_are_restricted_to_the_allow_list(word_encoder):
+    catalog = ToolCatalog(embedding_model=word_encoder(32), model_name="words")
+    catalog.register_tools(TOOLS)
+    view = catalog.view(["tool3", "tool4", "tool5"])
+
+    for query in ("topic7 helper", "task number", "tool9"):
+        names = [t["name"] for t in view.search_tools(query, top_k=5)]
+        assert names and set(names) <= {"tool3", "tool4", "tool5"}
+    assert view.search_tools("topic4 helper", top_k=1)[0]["name"] == "tool4"
+    assert catalog.search_tools("topic7 helper", top_k=1)[0]["name"] == "tool7"
+
+def test_view_changes_do_not_leak_into_the_catalog(word_encoder):
+    encoder = word_encoder(32)
+    catalog = ToolCatalog(embedding_model=encoder, model_name="words")
+    view = catalog.view(TOOLS[:2])
+    other = catalog.view(TOOLS[:2])
+
+    view.register_tool(tool("extra", "an extra tool"))
+    view.remove_tool("tool0")
+    assert [t["name"] for t in view.search_tools("extra tool", top_k=5)][0] == "extra"
+    assert sorted(view.tools) == ["extra", "tool1"]
+    assert sorted(other.tools) == ["tool0", "tool1"]
+    assert catalog.count_tools() == 3 and encoder.texts == 3
+
+    with pytest.raises(ValueError):
+        view.register_tool(tool("tool1", "topic1 helper for task number 1"))
+    with pytest.raises(ValueError):
+        other.register_tool(tool("extra", "a different tool with the same name"))
+    with pytest.raises(ValueError):
+        catalog.view(["missing"])
+
+def test_views_keep_their_own_tool_instances(word_encoder):
+    encoder = word_encoder(32)
+    catalog = ToolCatalog(embedding_model=encoder, model_name="words")
+    alice = MagicMock(identifier="github", description="github helper", instruction="", brief="github", token="alice")
+    bob = MagicMock(identifier="github", description="github helper", instruction="", brief="github", token="bob")
+
+    view_a, view_b = catalog.view([alice]), catalog.view([bob])
+    assert view_a.get_tool("github").token == "alice"
+    assert view_b.get_tool("github").token == "bob"
+    assert view_b.tools["github"] is bob and encoder.texts == 1
+    with pytest.raises(ValueError):
+        catalog.view([alice, bob])
+
+def test_searches_embed_queries_outside_the_catalog_lock(word_encoder):
+    started, release = threading.Event(), threading.Event()
+    encoder = word_encoder(32)
+
+    def embed(texts):
+        if texts == "slow query":
+            started.set()
+            release.wait(5)
+        return encoder(texts)
+
+    catalog = ToolCatalog(embedding_model=embed, model_name="words", lexical_margin=None)
+    catalog.register_tools(TOOLS)
+    view = catalog.view(TOOLS[:5])
+    slow = threading.Thread(target=view.search_tools, args=("slow query",))
+    slow.start()
+    assert started.wait(5)
+    try:
+        done = []
+        fast = threading.Thread(target=lambda: done.append(catalog.search_tools("topic3 helper", top_k=1)))
+        fast.start()
+        fast.join(5)
+        assert done and done[0][0]["name"] == "tool3"
+    finally:
+        release.set()
+        slow.join(5)
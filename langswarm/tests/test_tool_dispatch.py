@@ -0,0 +1,166 @@
+from langswarm.synapse.tools.base import BaseTool, action
+import pytest
+
+class EchoTool(BaseTool):
+    def __init__(self):
+        super().__init__(name="EchoTool", description="Echoes input.", instruction="Use echo.")
+
+    def run(self, payload={}, action="echo"):
+        return self._dispatch(action, payload)
+
+    @action()
+    def echo(self, text, times=1):
+        return text * times
+
+    @action("help")
+    def _help(self):
+        return self.instruction
+
+    @action()
+    def update(self, item_id, **kwargs):
+        return item_id, kwargs
+
+class LoudEchoTool(EchoTool):
+    def echo(self, text, times=1, suffix="!"):
+        return (text * times).upper() + suffix
+
+@pytest.fixture
+def tool():
+    return EchoTool()
+
+def test_action_table_compiled_per_class():
+    assert set(EchoTool._actions) == {"echo", "help", "update"}
+    assert EchoTool._actions["echo"].accepted == frozenset({"text", "times"})
+    assert EchoTool._actions["echo"].required == frozenset({"text"})
+    assert BaseTool._actions == {}
+
+def test_dispatch_calls_action(tool):
+    assert tool.run({"text": "ab", "times": 2}, action="echo") == "abab"
+    assert tool.run(action="help") == "Use echo."
+
+def test_dispatch_rejects_unexpected_arguments(tool):
+    result = tool.run({"text": "ab", "colour": "red"}, action="echo")
+    assert result == "Error: Unexpected arguments ['colour']. Expected: ['text', 'times']"
+
+def test_dispatch_reports_missing_arguments(tool):
+    result = tool.run({"times": 2}, action="echo")
+    assert result == "Error: Missing required arguments ['text']. Expected: ['text', 'times']"
+
+def test_dispatch_accepts_var_keyword(tool):
+    assert tool.run({"item_id": "x", "completed": True}, action="update") == ("x", {"completed": True})
+
+def test_dispatch_unsupported_action(tool):
+    assert tool.run({}, action="nope").startswith("Unsupported action: nope.")
+
+def test_overridden_action_is_recompiled():
+    tool = LoudEchoTool()
+    assert tool.run({"text": "ab", "suffix": "?"}, action="echo") == "AB?"
+    assert LoudEchoTool._actions["echo"].accepted == frozenset({"text", "times", "suffix"})
+
+class NotesTool(BaseTool):
+    result_cache_size = 256
+
+    def __init__(self):
+        super().__init__(name="NotesTool", description="Keeps notes.", instruction="")
+        self.notes = {"a": "first", "b": "second"}
+        self.reads = 0
+
+    def run(self, payload={}, action="read_note"):
+        return self._dispatch(action, payload)
+
+    @action(reads=("name",))
+    def read_note(self, name):
+        self.reads += 1
+        return self.notes.get(name)
+
+    @action(reads=("name",))
+    def find_note(self, name):
+        self.reads += 1
+        if name not in self.notes:
+            return f"Error: No note '{name}'."
+        return {"name": name, "lines": self.notes[name].split()}
+
+    @action(reads=("*",))
+    def list_notes(self, options=None):
+        self.reads += 1
+        return sorted(self.notes)
+
+    @action(writes=("name",))
+    def write_note(self, name, text):
+        self.notes[name] = text
+
+    @action()
+    def wipe(self):
+        self.notes.clear()
+
+def test_read_results_are_memoized():
+    tool = NotesTool()
+    for _ in range(3):
+        assert tool.run({"name": "a"}) == "first"
+        assert tool.run({"options": {"sort": True}}, action="list_notes") == ["a", "b"]
+    assert tool.reads == 2
+    assert tool.cache_stats() == {"hits": 4, "misses": 2, "hit_rate": 4 / 6, "invalidations": 0, "evictions": 0, "size": 2}
+
+def test_writes_invalidate_what_they_change():
+    tool = NotesTool()
+    tool.run({"name": "a"})
+    tool.run({"name": "b"})
+    tool.run(action="list_notes")
+
+    tool.run({"name": "b", "text": "changed"}, action="write_note")
+    assert tool.run({"name": "b"}) == "changed"
+    assert tool.run({"name": "a"}) == "first" and tool.reads == 4
+    assert tool.run(action="list_notes") == ["a", "b"] and tool.reads == 5
+
+    tool.run(action="wipe")
+    assert tool.run({"name": "a"}) is None
+    assert tool.cache_stats()["invalidations"] == 5
+
+def test_result_cache_is_bounded_and_expires():
+    tool = NotesTool()
+    tool.result_cache_size = 2
+    for name in "abcab":
+        tool.run({"name": name})
+    assert tool.reads == 5 and tool.cache_stats()["evictions"] == 3
+
+    now = [0.0]
+    expiring = NotesTool()
+    expiring.result_cache_ttl = 10
+    expiring.result_cache._clock = lambda: now[0]
+    expiring.run({"name": "a"})
+    now[0] = 11
+    expiring.run({"name": "a"})
+    assert expiring.reads == 2
+
+def test_reads_overlapping_a_write_are_not_cached():
+    tool = NotesTool()
+    cache = tool.result_cache
+    key = cache.key("read_note", {"name": "a"})
+    _, _, generation = cache.get(key)
+    tool.run({"name": "a", "text": "new"}, action="write_note")
+    cache.put(key, "first", frozenset({"a"}), generation)
+    assert tool.run({"name": "a"}) == "new"
+
+def test_result_cache_is_opt_in():
+    tool = EchoTool()
+    assert EchoTool.result_cache_size == 0
+    tool.run({"text": "a"}, action="echo")
+    assert tool.cache_stats()["misses"] == 0
+
+def test_errors_are_not_cached_and_results_are_copied():
+    tool = NotesTool()
+    assert tool.run({"name": "c"}, action="find_note").startswith("Error")
+    tool.notes["c"] = "third note"
+    found = tool.run({"name": "c"}, action="find_note")
+    found["lines"].append("mutated")
+    assert tool.run({"name": "c"}, action="find_note") == {"name": "c", "lines": ["third", "note"]}
+    assert tool.reads == 2
+
+def test_cached_results_are_checked_against_resource_versions():
+    tool = NotesTool()
+    tool._resource_version = lambda key: tool.notes.get(key)
+    assert tool.run({"name": "a"}) == "first"
+    tool.notes["a"] = "changed elsewhere"
+    assert tool.run({"name": "a"}) == "changed elsewhere"
+    assert tool.run({"name": "a"}) == "changed elsewhere"
+    assert tool.reads == 2 and tool.cache_stats()["invalidations"] == 1
@@ -0,0 +1,109 @@
+from langswarm.synapse.tools.base import BaseTool, action
+from langswarm.synapse.tools.executor import ToolCallExecutor
+import os
+import threading
+import time
+
+class FileStore(BaseTool):
+    """An in-memory file tool whose calls take `delay` seconds."""
+
+    def __init__(self, delay=0.1):
+        super().__init__(name="FileStore", description="Stores files.", instruction="Use read_file and update_file.")
+        self.files = {f"{i}.txt": f"file {i}" for i in range(5)}
+        self.delay = delay
+        self.log = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def run(self, payload={}, action="read_file"):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            return self._dispatch(action, payload)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def _resource_key(self, value):
+        return os.path.normpath(value)
+
+    @action(reads=("filename",))
+    def read_file(self, filename):
+        self.log.append(("read", filename))
+        return self.files[os.path.normpath(filename)]
+
+    @action(writes=("filename",))
+    def update_file(self, filename, content):
+        self.log.append(("update", filename))
+        self.files[filename] += content
+        return "ok"
+
+    @action(reads=("*",))
+    def list_files(self):
+        return sorted(self.files)
+
+    @action()
+    def reset(self):
+        self.files.clear()
+        return "reset"
+
+def call(action, instance_name="files", **parameters):
+    return {"type": "tools", "method": "execute", "instance_name": instance_name, "action": action, "parameters": parameters}
+
+def test_independent_reads_run_in_parallel():
+    tool = FileStore(delay=0.2)
+    executor = ToolCallExecutor({"files": tool})
+
+    started = time.perf_counter()
+    results = executor.execute({"calls": [call("read_file", filename=f"{i}.txt") for i in range(5)]})
+    elapsed = time.perf_counter() - started
+
+    assert results == [f"file {i}" for i in range(5)]
+    assert tool.peak == 5 and elapsed < 0.6
+    executor.close()
+
+def test_writes_keep_their_order_on_the_same_resource():
+    tool = FileStore(delay=0.02)
+    executor = ToolCallExecutor({"files": tool})
+    calls = [
+        call("read_file", filename="0.txt"),
+        call("update_file", filename="0.txt", content=" a"),
+        call("read_file", filename="./0.txt"),
+        call("update_file", filename="0.txt", content=" b"),
+        call("read_file", filename="1.txt"),
+        call("list_files"),
+    ]
+    plan = executor.plan(calls)
+    assert [p.after for p in plan] == [[], [0], [1], [0, 1, 2], [], [1, 3]]
+
+    results = executor.execute(calls)
+    assert results[:5] == ["file 0", "ok", "file 0 a", "ok", "file 1"]
+    assert tool.files["0.txt"] == "file 0 a b"
+
+def test_undeclared_actions_and_other_instances():
+    first, second = FileStore(delay=0), FileStore(delay=0)
+    executor = ToolCallExecutor({"first": first, "second": second})
+    plan = executor.plan([
+        call("read_file", "first", filename="0.txt"),
+        call("reset", "second"),
+        call("read_file", "second", filename="0.txt"),
+        call("read_file", "first", filename="1.txt"),
+    ])
+    assert [p.after for p in plan] == [[], [], [1], []]
+
+def test_failures_and_requests_are_reported_per_call():
+    tool = FileStore(delay=0)
+    executor = ToolCallExecutor({"files": tool})
+    results = executor.execute([
+        call("read_file", filename="missing.txt"),
+        {"type": "tools", "method": "request", "instance_name": "files", "action": "", "parameters": {}},
+        call("read_file", "unknown", filename="0.txt"),
+        call("read_file", filename="2.txt"),
+    ])
+    assert results[0].startswith("Error: KeyError")
+    assert results[1] == tool.instruction
+    assert results[2] == "Error: No tool named 'unknown'."
+    assert results[3] == "file 2"
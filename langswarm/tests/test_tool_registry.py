@@ -0,0 +1,131 @@
+from langswarm.synapse.registry.lexical import BM25Index, reciprocal_rank_fusion, tokenize
+from langswarm.synapse.registry.tools import ToolRegistry
+from unittest.mock import MagicMock
+import json
+import numpy as np
+import pytest
+
+DESCRIPTIONS = {
+    "weather": "Get the weather forecast for a city",
+    "search": "Search the web for pages about a topic",
+    "calendar": "Create and list events in a calendar",
+}
+
+def tool(name, description=None):
+    return MagicMock(identifier=name, description=description or DESCRIPTIONS[name], instruction="", brief="")
+
+def test_register_tools_embeds_in_one_batch(word_encoder):
+    encoder = word_encoder()
+    registry = ToolRegistry(embedding_model=encoder, model_name="words", batch_embeddings=True)
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+
+    assert encoder.calls == 1 and encoder.texts == 3
+    assert registry.search_tools("weather forecast for a city", top_k=1)[0]["name"] == "weather"
+
+    with pytest.raises(ValueError):
+        registry.register_tools([tool("maps", "Show a map"), tool("search")])
+    assert registry.count_tools() == 3 and registry.get_tool("maps") is None
+
+def test_load_reuses_the_snapshot_and_embeds_changed_tools_only(tmp_path, word_encoder):
+    encoder = word_encoder()
+    registry = ToolRegistry(embedding_model=encoder, model_name="words", batch_embeddings=True)
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    registry.save(tmp_path)
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["model"] == "words" and [t["name"] for t in manifest["tools"]] == list(DESCRIPTIONS)
+
+    loader = word_encoder()
+    restored = ToolRegistry(embedding_model=loader, model_name="words", batch_embeddings=True)
+    assert restored.load(tmp_path, [tool(name) for name in DESCRIPTIONS]) == 0
+    assert loader.calls == 0
+    assert isinstance(restored.embeddings["search"], np.memmap)
+    assert restored.search_tools("search the web for pages", top_k=1)[0]["name"] == "search"
+
+    encoder = word_encoder()
+    changed = ToolRegistry(embedding_model=encoder, model_name="words", batch_embeddings=True)
+    tools = [tool("weather"), tool("search", "Look up a word in a dictionary"), tool("notes", "Take notes")]
+    assert changed.load(tmp_path, tools) == 2
+    assert encoder.calls == 1 and encoder.texts == 2
+    assert changed.search_tools("Look up a word in a dictionary", top_k=1)[0]["name"] == "search"
+
+def test_snapshots_of_another_model_or_dtype_are_ignored(tmp_path, word_encoder):
+    registry = ToolRegistry(embedding_model=word_encoder(), model_name="words")
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    registry.save(tmp_path)
+
+    for kwargs in ({"model_name": "other"}, {"model_name": "words", "embedding_dtype": "int8"}):
+        encoder = word_encoder()
+        assert ToolRegistry(embedding_model=encoder, batch_embeddings=True, **kwargs).load(tmp_path, [tool(name) for name in DESCRIPTIONS]) == 3
+        assert encoder.calls == 1
+
+    assert ToolRegistry(embedding_model=word_encoder(), model_name="words").load(tmp_path / "missing", [tool("search")]) == 1
+
+def test_single_text_models_are_called_per_text(tmp_path):
+    registry = ToolRegistry(embedding_model=lambda text: np.array([len(text), 1.0]))
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    assert registry.embeddings["weather"].tolist() == [len(DESCRIPTIONS["weather"]), 1.0]
+
+    with pytest.raises(ValueError):
+        registry.save(tmp_path)
+
+def test_snapshots_not_matching_their_manifest_are_ignored(tmp_path, word_encoder):
+    registry = ToolRegistry(embedding_model=word_encoder(), model_name="words")
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    registry.save(tmp_path)
+
+    # The matrix of a later save landed, its manifest did not.
+    np.save(tmp_path / "embeddings.npy", np.ones((3, 16), dtype=np.float32))
+    encoder = word_encoder()
+    assert ToolRegistry(embedding_model=encoder, model_name="words").load(tmp_path, [tool(name) for name in DESCRIPTIONS]) == 3
+    assert encoder.texts == 3
+
+    registry.save(tmp_path)
+    wider = ToolRegistry(embedding_model=lambda text: np.ones(32), model_name="words")
+    assert wider.load(tmp_path, [tool("weather"), tool("maps", "Show a map")]) == 2
+    assert wider.search_tools("show a map", top_k=1)
+
+def test_bm25_index_is_maintained_incrementally():
+    index = BM25Index()
+    index.add("github_tool", "github_tool Manage GitHub repositories and pull requests")
+    index.add("files", "files Read and write files on disk")
+    index.add("notes", "notes Keep notes about files")
+
+    assert tokenize("github_tool: Pull Requests") == ["github", "tool", "pull", "requests"]
+    assert index.search("github")[0][0] == "github_tool"
+    assert [doc for doc, _, _ in index.search("files")] == ["files", "notes"]
+    index.remove("files")
+    assert [doc for doc, _, _ in index.search("files")] == ["notes"]
+    assert index.search("unknown words") == []
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])
+    assert [doc for doc, _ in fused] == ["b", "a", "c"]
+
+def test_keyword_queries_skip_the_query_embedding(word_encoder):
+    encoder = word_encoder()
+    registry = ToolRegistry(embedding_model=encoder, model_name="words", batch_embeddings=True)
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    encoder.calls = 0
+
+    assert [t["name"] for t in registry.search_tools("forecast")] == ["weather"]
+    assert [t["name"] for t in registry.search_tools("calendar events")] == ["calendar"]
+    assert encoder.calls == 0 and registry.stats["lexical_only"] == 2
+
+    registry.remove_tool("weather")
+    assert "weather" not in [t["name"] for t in registry.search_tools("forecast")]
+
+def test_ambiguous_queries_fuse_rankings_and_cache_the_embedding(word_encoder):
+    encoder = word_encoder()
+    registry = ToolRegistry(embedding_model=encoder, model_name="words", query_cache_size=1)
+    registry.register_tools(tool(name) for name in DESCRIPTIONS)
+    encoder.calls = 0
+
+    for _ in range(3):
+        results = registry.search_tools("city pages", top_k=3)
+    assert len(results) == 3 and encoder.calls == 1
+    assert registry.stats["cache_hits"] == 2 and registry.stats["cache_misses"] == 1
+
+    registry.search_tools("topic city")
+    registry.search_tools("city pages")
+    assert encoder.calls == 3
@@ -0,0 +1,95 @@
+from langswarm.synapse.swarm.consensus import LLMConsensus
+from langswarm.synapse.swarm.tracing import JsonLinesSink, NULL_TRACER, OpenTelemetrySink, RunReport, Tracer, otel_trace
+from unittest.mock import MagicMock
+import asyncio
+import io
+import json
+import logging
+import numpy as np
+import pytest
+
+@pytest.fixture(autouse=True)
+def encoder(monkeypatch):
+    model = MagicMock()
+    model.encode.side_effect = lambda texts: np.array(
+        [[1.0, 0.0] if "yes" in t else [0.0, 1.0] for t in ([texts] if isinstance(texts, str) else texts)]
+    )
+    monkeypatch.setattr("langswarm.synapse.embeddings.encoders.SentenceTransformer", MagicMock(return_value=model))
+    return model
+
+def agents(*answers):
+    result = []
+    for answer in answers:
+        agent = MagicMock()
+        agent.chat.return_value = answer
+        result.append(agent)
+    return result
+
+def test_spans_nest_and_fill_the_report():
+    stream = io.StringIO()
+    tracer = Tracer(sinks=[JsonLinesSink(stream=stream)])
+    report = RunReport()
+
+    with tracer.span("run", report=report):
+        with tracer.span("stage", size=3):
+            tracer.count("cache_hits", 2)
+
+    spans = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [s["name"] for s in spans] == ["stage", "run"]
+    assert spans[0]["parent_id"] == spans[1]["span_id"]
+    assert spans[0]["attributes"] == {"size": 3}
+    assert report.calls == {"stage": 1, "run": 1}
+    assert report.counters == {"cache_hits": 2}
+    assert tracer.counters == {"cache_hits": 2}
+
+def test_swarm_run_report_has_a_stage_breakdown():
+    tracer = Tracer(token_counter=lambda text: len(text.split()))
+    swarm = LLMConsensus(query="is it yes", clients=agents("yes", "yes indeed", "no"), tracer=tracer)
+
+    swarm.run()
+    report = swarm.last_context.report
+
+    assert set(report.stages) >= {"run", "generate", "agent_call", "global_similarity", "threshold",
+                                  "embedding", "paraphrase_grouping", "consensus"}
+    assert report.calls["agent_call"] == 3
+    assert report.counters["agent_calls"] == 3
+    assert report.counters["prompt_tokens"] == 9
+    assert report.counters["completion_tokens"] == 4
+    assert report.total >= report.stages["generate"]
+
+def test_async_agent_calls_are_attributed_to_their_run():
+    tracer = Tracer()
+    swarm = LLMConsensus(query="q", clients=agents("yes", "no"), tracer=tracer)
+
+    async def main():
+        return await asyncio.gather(swarm.arun("first"), swarm.arun("second"))
+
+    asyncio.run(main())
+    assert tracer.counters["agent_calls"] == 4
+    assert swarm.last_context.report.counters["agent_calls"] == 2
+    assert swarm.last_context.report.calls["embedding"] == 1
+
+def test_disabled_tracing_records_nothing():
+    swarm = LLMConsensus(query="q", clients=agents("yes", "no"))
+    assert swarm.tracer is NULL_TRACER
+    swarm.run()
+    assert swarm.last_context.report.stages == {}
+
+def test_verbose_swarms_log_at_info(caplog):
+    with caplog.at_level(logging.INFO, logger="langswarm.synapse.swarm"):
+        LLMConsensus(query="q", clients=agents("yes"), verbose=True).run()
+        LLMConsensus(query="q", clients=agents("yes"), verbose=False).run()
+    assert sum("Consensus Paragraph" in r.getMessage() for r in caplog.records) == 1
+
+def test_opentelemetry_sink():
+    if otel_trace is None:
+        with pytest.raises(ImportError):
+            OpenTelemetrySink()
+        pytest.skip("opentelemetry-api is not installed")
+
+    otel_tracer = MagicMock()
+    tracer = Tracer(sinks=[OpenTelemetrySink(tracer=otel_tracer)])
+    with tracer.span("run", attempt=1):
+        pass
+    otel_tracer.start_span.assert_called_once()
+    otel_tracer.start_span.return_value.end.assert_called_once()